@@ -40,6 +40,7 @@
 *	0: Success
 *	1: not yet implemented
 *	2: not WrapperFactory
+*	3: invalid packed messages
 */
 int parseArgs(PyObject* factobj, ...){
   va_list args;
@@ -61,14 +62,18 @@ int parseArgs(PyObject* factobj, ...){
 	 Function : computeSimilarityMatrix
 	 Parse the wrapper given its format
       */
-      parseLibscoreComputation(factobj,args);
+      if (parseLibscoreComputation(factobj,args)) {
+	return 3;
+      }
     }
     else if(!strcmp(function,"_libNeedleman.alignMessages")){
       /**
 	 Function : alignMessages
 	 Parse the wrapper given its format
       */
-      parseLibNeedleman(factobj,args);
+      if (parseLibNeedleman(factobj,args)) {
+	return 3;
+      }
     }
 
     else{
@@ -84,170 +89,121 @@ int parseArgs(PyObject* factobj, ...){
 
 }
 
-void parseLibscoreComputation(PyObject* factobj, va_list args){
-  unsigned int i;
-  PyObject* pysize = NULL;
+int parseLibscoreComputation(PyObject* factobj, va_list args){
   unsigned int* nbmess = va_arg(args,unsigned int*);
   t_message** messages = va_arg(args,t_message**);
-  unsigned int debugMode = FALSE;
 
-  /**
-     list : which is a list of messages
-  */
-  PyObject* list = PyObject_GetAttr(factobj,PyString_FromString("args"));
-
-  /**
-     Find the number of elements in the list.
-     This number of elements = number of messages (nbmess)
-  */
-  pysize = PyInt_FromSsize_t(PyList_Size(list));
-  *nbmess = (unsigned int) PyInt_AsLong(pysize);
-  Py_XDECREF(pysize);
-
-  /**
-     Reserves an array of [nbmess] t_messages
-  */
-  *messages = (t_message*) malloc((*nbmess)*sizeof(t_message));
-
-  /**
-     Parse each message and store them in the newly allocated array
-  */
-  for(i=0;i<*nbmess;i++){
-    PyObject* item;
-    item = PyList_GetItem(list,(Py_ssize_t)i);
-    parseMessage(item, &((*messages)[i]));
-  }
-
-  // [DEBUG] Display the content of the deserialized messages
-  if (debugMode == TRUE) {
-    unsigned int iMessage;
-    for(iMessage=0;iMessage<*nbmess;iMessage++) {
-      t_message message = (*messages)[iMessage];
-      printf("Message : %d (UID Symbol=%s)\n", iMessage, message.uid);
-      printf("Data : ");
-      for (i=0; i< message.len; i++) {
-	printf("%02x", (unsigned char) message.alignment[i]);
-      }
-      printf("\n");
-      printf("Tags : ");
-      for (i=0; i< message.len; i++) {
-	if (message.semanticTags != NULL && message.semanticTags[i] != NULL && message.semanticTags[i]->name != NULL && strcmp(message.semanticTags[i]->name, "None")!=0) {
-	  printf("!!");
-	} else {
-	  printf("..");
-	}
-      }
-      printf("\n");
-    }
-    // [DEBUG]
-  }
+  return parsePackedMessages(factobj, nbmess, messages);
 }
 
-void parseMessage(PyObject * item, t_message * message) {
-  char * tmp_alignment;
-  unsigned int j;
-  /**
-     message.alignment contains the message.getReducedStringData() in python raw format. Its the content of the message. If its during orphan reduction, this content is reduced to the considered section (sliding window).
-  */
-  tmp_alignment = getstringattr(item,"alignment");
-  message->alignment = (unsigned char*) tmp_alignment;
-
-  /**
-     message->mask will be allocated (no value in it yet) to contain at least ... ?
-  */
-  message->mask = calloc(strlen(tmp_alignment)+1,sizeof(unsigned char*));
-
-  /**
-     message->len contains the size of tmp_alignment
-  **/
-  message->len = (unsigned int) getUnsignedLongAttribute(item,"length");
-
-  /**
-     message->semanticTags contains the list of tags attached to each half-byte of the alignment
-  */
-  message->semanticTags = calloc(message->len, sizeof(t_semanticTag *));
-
-  // retrieve the list of tags
-  PyObject* listOfSemanticTags = PyObject_GetAttr(item,tostring("semanticTags"));
-
-  // verify its a list
-  if (PyList_CheckExact(listOfSemanticTags) && message->len == (unsigned int)PyList_Size(listOfSemanticTags)) {
-    // every half-byte should be tagged (with no-tag or with a real tag)
-    // parse all the tags
-    for (j=0; j<message->len; j++) {
-      PyObject * listItem = PyList_GetItem(listOfSemanticTags,(Py_ssize_t)j);
-      char * tag = PyString_AsString(listItem);
-
-      message->semanticTags[j] = malloc(sizeof(t_semanticTag));
-      message->semanticTags[j]->name = tag;
-    }
-  } else {
-    printf("[C-Extension] Error while parsing semantic tags.\n");
-  }
-  /**
-     message->uid contains the UID of the symbol which contains
-     the message.
-
-     Warning: I though it was message's UID, but its not !!
-  */
-  message->uid = getstringattr(item,"uid");
+int parseLibNeedleman(PyObject* factobj, va_list args){
+  unsigned int* nbmess = va_arg(args,unsigned int*);
+  t_message** messages = va_arg(args,t_message**);
 
+  return parsePackedMessages(factobj, nbmess, messages);
 }
 
-
 /**
-   parseLibNeedlman:
+   getBufferAttribute:
 
-   This function parses the arguments wrapper following a specific format.
-   The definition of this format can be found in the Python function:
-   netzob.Common.C_Extensions.WrapperArgsFactory:WrapperArgsFactory.computeSimilarityMatrix()
-   Once parsed, the wrapper reveal arguments which will be stored in the args parameter.
-   Format:
-   - List<Message> with Message: (alignment, mask, length, uid)
+   Retrieves a read-only pointer on the content of a str or array attribute
+   of the wrapper (the wrapper keeps a reference on it while the C extension runs).
+   @return the size in bytes of the buffer or -1 on error
 */
-void parseLibNeedleman(PyObject* factobj, va_list args){
+static Py_ssize_t getBufferAttribute(PyObject * factobj, const char * name, const void ** buffer) {
+  Py_ssize_t size = -1;
+  PyObject * attr = PyObject_GetAttrString(factobj, name);
+  if (attr == NULL) {
+    return -1;
+  }
+  if (PyObject_AsReadBuffer(attr, buffer, &size) != 0) {
+    size = -1;
+  }
+  Py_DECREF(attr);
+  return size;
+}
 
-  PyObject* pysize = NULL;
-  unsigned int* nbmess = va_arg(args,unsigned int*);
-  t_message** messages = va_arg(args,t_message**);
-  unsigned int debugMode = FALSE;
+int parsePackedMessages(PyObject* factobj, unsigned int* nbmess, t_message** messages){
+  const void * data;
+  const void * offsets;
+  const void * masks;
+  const void * tags;
+  const void * uids;
+  Py_ssize_t sizeData, sizeOffsets, sizeMasks, sizeTags, sizeUids;
+  PyObject * tagNamesList;
+  char ** tagNames;
+  unsigned int nbTagNames;
   unsigned int i;
+  unsigned int debugMode = FALSE;
 
-  /**
-     list : which is a list of messages
-  */
-  PyObject* list = PyObject_GetAttr(factobj,PyString_FromString("args"));
+  sizeData = getBufferAttribute(factobj, "data", &data);
+  sizeOffsets = getBufferAttribute(factobj, "offsets", &offsets);
+  sizeMasks = getBufferAttribute(factobj, "masks", &masks);
+  sizeTags = getBufferAttribute(factobj, "tags", &tags);
+  sizeUids = getBufferAttribute(factobj, "uids", &uids);
+  if (sizeData < 0 || sizeOffsets < 0 || sizeMasks < 0 || sizeTags < 0 || sizeUids < 0) {
+    PyErr_SetString(PyExc_TypeError, "Wrong argument type: the wrapper should provide the packed messages");
+    return 1;
+  }
 
   /**
-     Find the number of elements in the list.
-     This number of elements = number of messages (nbmess)
+     offsets contains the offset of each message in data, followed by the size of data
   */
-  pysize = PyInt_FromSsize_t(PyList_Size(list));
-  *nbmess = (unsigned int) PyInt_AsLong(pysize);
-  Py_XDECREF(pysize);
+  if (sizeOffsets < (Py_ssize_t) sizeof(unsigned int) || sizeOffsets % sizeof(unsigned int) != 0) {
+    PyErr_SetString(PyExc_ValueError, "Invalid offsets of the packed messages");
+    return 1;
+  }
+  *nbmess = (unsigned int) (sizeOffsets / sizeof(unsigned int)) - 1;
+  if (((unsigned int *) offsets)[*nbmess] != (unsigned int) sizeData || sizeMasks != sizeData || sizeTags != sizeData * (Py_ssize_t) sizeof(unsigned int)) {
+    PyErr_SetString(PyExc_ValueError, "Inconsistent sizes of the packed messages");
+    return 1;
+  }
 
   /**
-     Reserves an array of [nbmess] t_messages
+     tagNames contains the names of the distinct semantic tags
   */
-  *messages = (t_message*) malloc((*nbmess)*sizeof(t_message));
+  tagNamesList = PyObject_GetAttrString(factobj, "tagNames");
+  if (tagNamesList == NULL || !PyList_Check(tagNamesList)) {
+    Py_XDECREF(tagNamesList);
+    PyErr_SetString(PyExc_TypeError, "Wrong argument type: tagNames must be a list");
+    return 1;
+  }
+  nbTagNames = (unsigned int) PyList_Size(tagNamesList);
+  tagNames = malloc(nbTagNames * sizeof(char *));
+  for (i=0; i<nbTagNames; i++) {
+    tagNames[i] = PyString_AsString(PyList_GetItem(tagNamesList, (Py_ssize_t) i));
+  }
+  for (i=0; i<(unsigned int) sizeData; i++) {
+    if (((unsigned int *) tags)[i] >= nbTagNames) {
+      free(tagNames);
+      Py_DECREF(tagNamesList);
+      PyErr_SetString(PyExc_ValueError, "Invalid semantic tag in the packed messages");
+      return 1;
+    }
+  }
 
   /**
-     Parse each message and store them in the newly allocated array
+     Reserves an array of [nbmess] t_messages referring to the packed buffers
   */
-  for(i=0;i<*nbmess;i++){
-    PyObject* item;
-    item = PyList_GetItem(list,(Py_ssize_t)i);
-    parseMessage(item, &((*messages)[i]));
+  *messages = (t_message*) malloc(((*nbmess) > 0 ? (*nbmess) : 1)*sizeof(t_message));
+  if (*messages == NULL || deserializePackedMessages(*messages, *nbmess, (unsigned char *) data, (unsigned int *) offsets, (unsigned char *) masks, (unsigned int *) tags, tagNames, nbTagNames, (char *) uids, (unsigned int) sizeUids) != 0) {
+    free(*messages);
+    *messages = NULL;
+    free(tagNames);
+    Py_DECREF(tagNamesList);
+    PyErr_NoMemory();
+    return 1;
   }
+  free(tagNames);
+  Py_DECREF(tagNamesList);
 
   // [DEBUG] Display the content of the deserialized messages
   if (debugMode == TRUE) {
     unsigned int iMessage;
     for(iMessage=0;iMessage<*nbmess;iMessage++) {
-      printf("Message : %d\n", iMessage);
-      printf("Data : ");
       t_message message = (*messages)[iMessage];
-
+      printf("Message : %d (UID Symbol=%s)\n", iMessage, message.uid);
+      printf("Data : ");
       for (i=0; i< message.len; i++) {
 	printf("%02x", (unsigned char) message.alignment[i]);
       }
@@ -264,7 +220,7 @@ void parseLibNeedleman(PyObject* factobj, va_list args){
     }
     // [DEBUG]
   }
-
+  return 0;
 }
 
 
@@ -26,8 +26,9 @@
 //+---------------------------------------------------------------------------+
 #ifndef Interface_H
 #define Interface_H 
-#include "commonLib.h"
+// Python.h must be included before the standard headers
 #include "commonPythonLib.h"
+#include "commonLib.h"
 
 
 /**
@@ -54,6 +55,27 @@ unsigned int serializeSemanticTags(char ** serializedTags, t_semanticTag ** tags
 unsigned int deserializeMessages(t_group *, char *, unsigned char *, unsigned int, Bool);
 unsigned int deserializeGroups(t_groups *, char *, unsigned char *, int, Bool);
 
+/**
+   deserializePackedMessages:
+
+   This function initializes nbMessages messages from contiguous buffers:
+   the messages are concatenated in data, offsets provides the offset of each
+   message (and the size of data), masks the concatenation of their masks,
+   tags the index in tagNames of the semantic tag of each byte and uids the
+   uids of the messages separated by null bytes.
+   Alignments, masks and uids of the messages refer to the provided buffers.
+   @return int: 0 on success, 1 if the memory could not be allocated
+*/
+int deserializePackedMessages(t_message * messages, unsigned int nbMessages, unsigned char * data, unsigned int * offsets, unsigned char * masks, unsigned int * tags, char ** tagNames, unsigned int nbTagNames, char * uids, unsigned int sizeUids);
+
+/**
+   freePackedMessages:
+
+   This function releases the messages initialized by deserializePackedMessages
+   (the memory of the provided buffers is left untouched).
+*/
+void freePackedMessages(t_message * messages, unsigned int nbMessages);
+
 //+---------------------------------------------------------------------------+
 //| hexdump : for debug purposes
 //+---------------------------------------------------------------------------+
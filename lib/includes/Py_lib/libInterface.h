@@ -37,6 +37,10 @@ int callbackIsFinish(void);
 //+---------------------------------------------------------------------------+
 int callbackStatus(int stage, double percent, char* message, ...);
 
+void* callbackSaveThread(void);
+
+void callbackRestoreThread(void* threadState);
+
 //+---------------------------------------------------------------------------+
 //| py_deserializeMessages : Python wrapper for deserializeMessages
 //+---------------------------------------------------------------------------+
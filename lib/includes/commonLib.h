@@ -90,6 +90,8 @@ static const short int MISMATCH = -5;
 
 static const short int GAP = 0;
 static const short int BLEN = 10;
+// Above this number of cells, the alignment matrix is not entirely kept in memory
+static const unsigned long MAX_FULL_MATRIX_CELLS = 4194304;
 // Consts for the definition of a mask
 static const unsigned char END = 2;
 static const unsigned char DIFFERENT = 1;
@@ -31,6 +31,7 @@
 #define FACTORY_H
 #include "commonPythonLib.h"
 #include "commonLib.h"
+#include "Interface.h"
 #include <stdio.h>
 #include <stdarg.h>
 
@@ -44,20 +45,25 @@ int parseArgs(PyObject* factobj, ...);
    netzob.Common.C_Extensions.WrapperArgsFactory:WrapperArgsFactory.computeSimilarityMatrix()
    Once parsed, the wrapper reveal arguments which will be stored in the args parameter.
    Format:
-   - List<Message> with Message: (alignment, mask, length, uid)
+   - packed messages (see parsePackedMessages)
+   @return 0 on success
 */
-void parseLibscoreComputation(PyObject* factobj, va_list args);
+int parseLibscoreComputation(PyObject* factobj, va_list args);
 
-void parseLibNeedleman(PyObject* factobj, va_list args);
+int parseLibNeedleman(PyObject* factobj, va_list args);
 
 /**
-   parseMessage:
+   parsePackedMessages:
 
-   This function parses a python Netzob message to its C representation
-   @param item : the PyObject which host the python representation of the message
-   @param message : the message which should host the python extracted message's information
-   @return void
+   This function parses the messages packed by the python WrapperArgsFactory
+   (data, offsets, masks, tags, tagNames and uids) to their C representation.
+   The alignments, masks and uids of the messages refer to the buffers of the wrapper
+   which must be kept alive as long as the messages are used.
+   @param factobj : the PyObject which hosts the packed messages
+   @param nbmess : the number of parsed messages
+   @param messages : the allocated messages, to release with freePackedMessages
+   @return 0 on success, otherwise a python exception is set
 */
-void parseMessage(PyObject * item, t_message * message);
+int parsePackedMessages(PyObject* factobj, unsigned int* nbmess, t_message** messages);
 
 #endif
@@ -57,6 +57,19 @@ int callbackStatus(int stage, double percent, char* message, ...) {
   return 1;
 
 }
+
+//+---------------------------------------------------------------------------+
+//| callbackSaveThread : no interpreter lock to release when using only C calls
+//+---------------------------------------------------------------------------+
+void* callbackSaveThread(void) {
+  return NULL;
+}
+
+//+---------------------------------------------------------------------------+
+//| callbackRestoreThread : no interpreter lock to acquire when using only C calls
+//+---------------------------------------------------------------------------+
+void callbackRestoreThread(__attribute__((unused))void* threadState) {
+}
 #endif
 
 
@@ -188,6 +201,66 @@ unsigned int deserializeGroups(t_groups * groups, char * format, unsigned char *
   return i_group;
 }
 
+//+---------------------------------------------------------------------------+
+//| deserializePackedMessages : Deserialization of packed messages
+//+---------------------------------------------------------------------------+
+int deserializePackedMessages(t_message * messages, unsigned int nbMessages, unsigned char * data, unsigned int * offsets, unsigned char * masks, unsigned int * tags, char ** tagNames, unsigned int nbTagNames, char * uids, unsigned int sizeUids) {
+  unsigned int i_message = 0;
+  unsigned int i_tag = 0;
+  unsigned int uid_shift = 0;
+  unsigned int totalLen = offsets[nbMessages];
+  t_semanticTag ** messagesTags;
+  t_semanticTag * semanticTags;
+
+  // Nothing is allocated when there is no message
+  if (nbMessages == 0) {
+    return 0;
+  }
+
+  // A single allocation hosts the tag of each byte of the messages
+  // followed by the distinct tags they refer to (an extra byte ensures
+  // empty messages do not lead to a zero-sized allocation)
+  messagesTags = malloc(totalLen * sizeof(t_semanticTag *) + nbTagNames * sizeof(t_semanticTag) + 1);
+  if (messagesTags == NULL) {
+    return 1;
+  }
+  semanticTags = (t_semanticTag *) (messagesTags + totalLen);
+  for (i_tag = 0; i_tag < nbTagNames; i_tag++) {
+    semanticTags[i_tag].name = tagNames[i_tag];
+  }
+  for (i_tag = 0; i_tag < totalLen; i_tag++) {
+    messagesTags[i_tag] = &semanticTags[tags[i_tag]];
+  }
+
+  for (i_message = 0; i_message < nbMessages; i_message++) {
+    // Alignments and masks refer to the packed buffers
+    messages[i_message].len = offsets[i_message + 1] - offsets[i_message];
+    messages[i_message].alignment = data + offsets[i_message];
+    messages[i_message].mask = masks + offsets[i_message];
+    messages[i_message].semanticTags = messagesTags + offsets[i_message];
+    messages[i_message].score = NULL;
+
+    // uids are separated by null bytes
+    messages[i_message].uid = uids + uid_shift;
+    while (uid_shift < sizeUids && uids[uid_shift] != '\0') {
+      uid_shift++;
+    }
+    uid_shift++;
+  }
+  return 0;
+}
+
+//+---------------------------------------------------------------------------+
+//| freePackedMessages : releases messages deserialized by deserializePackedMessages
+//+---------------------------------------------------------------------------+
+void freePackedMessages(t_message * messages, unsigned int nbMessages) {
+  // The tags are only allocated when there are messages
+  if (nbMessages > 0) {
+    free(messages[0].semanticTags);
+  }
+  free(messages);
+}
+
 #define OPL 64
 
 void hexdump(unsigned char *buf, int dlen) {
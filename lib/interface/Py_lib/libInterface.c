@@ -114,6 +114,22 @@ int callbackStatus(int stage, double percent, char* message, ...) {
 	return 0;
 }
 
+//+---------------------------------------------------------------------------+
+//| callbackSaveThread : releases the python interpreter lock so that other
+//| python threads can run while a long computation is executed in C
+//+---------------------------------------------------------------------------+
+void* callbackSaveThread(void) {
+	return (void*) PyEval_SaveThread();
+}
+
+//+---------------------------------------------------------------------------+
+//| callbackRestoreThread : re-acquires the python interpreter lock released
+//| by callbackSaveThread
+//+---------------------------------------------------------------------------+
+void callbackRestoreThread(void* threadState) {
+	PyEval_RestoreThread((PyThreadState*) threadState);
+}
+
 //+---------------------------------------------------------------------------+
 //| py_deserializeMessages : Python wrapper for deserializeMessages
 //+---------------------------------------------------------------------------+
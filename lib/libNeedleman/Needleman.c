@@ -75,7 +75,8 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
     current_message.semanticTags[j]->name = malloc((strlen(messages[0].semanticTags[j]->name)+1) * sizeof(char));
     strcpy(current_message.semanticTags[j]->name, messages[0].semanticTags[j]->name);
   }
-  memset(current_message.mask, 0, messages[0].len);
+  // The provided masks are kept so that previous alignments can be aligned
+  memcpy(current_message.mask, messages[0].mask, messages[0].len);
   current_message.score = &score;
 
   // Prepare for the resMessage
@@ -106,7 +107,7 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
 
     }
 
-    memset(new_message.mask, 0, messages[i_message].len);
+    memcpy(new_message.mask, messages[i_message].mask, messages[i_message].len);
 
     // Align current_message with new_message
     regex = alignTwoMessages(resMessage, doInternalSlick, &current_message, &new_message, debugMode);
@@ -129,15 +130,250 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
   if (callbackStatus(0, status, "The %d messages have sucessfully been aligned.", nbMessages) == -1) {
     printf("Error, error while executing C callback.\n");
   }
+}
+
+
+/**
+   t_alignmentMatrix:
+
+   The Needleman matrix of two messages. When it has less than
+   MAX_FULL_MATRIX_CELLS cells, all its rows are kept in memory. Otherwise
+   only one row every "step" rows (the checkpoints) is kept while the matrix
+   is filled and the rows read by the traceback are recomputed, one band of
+   "step" rows at a time, from the checkpoint above them. With step close to
+   sqrt(len1), the memory drops from O(len1 * len2) to O(sqrt(len1) * len2)
+   for the price of filling the matrix twice. The traceback is the same.
+*/
+typedef struct {
+  unsigned int nbRows;
+  unsigned int nbColumns;
+  short int ** rows;        // all the rows of the matrix, or NULL
+  unsigned int step;        // number of rows between two checkpoints
+  short int ** checkpoints; // rows 0, step, 2*step, ...
+  short int ** band;        // rows iBand*step + k with 0 < k < step
+  int iBand;                // index of the band currently stored, -1 if none
+  Bool semanticScoring;     // FALSE if no semantic match can occur between the messages
+} t_alignmentMatrix;
+
+static short int ** allocMatrixRows(unsigned int nbRows, unsigned int nbColumns) {
+  unsigned int i;
+  short int ** rows = (short int**) calloc(nbRows, sizeof(short int*));
+  if (rows == NULL) {
+    return NULL;
+  }
+  for (i = 0; i < nbRows; i++) {
+    rows[i] = (short int*) calloc(nbColumns, sizeof(short int));
+    if (rows[i] == NULL) {
+      while (i > 0) {
+        free(rows[--i]);
+      }
+      free(rows);
+      return NULL;
+    }
+  }
+  return rows;
+}
+
+static void freeMatrixRows(short int ** rows, unsigned int nbRows) {
+  unsigned int i;
+  if (rows == NULL) {
+    return;
+  }
+  for (i = 0; i < nbRows; i++) {
+    free(rows[i]);
+  }
+  free(rows);
+}
+
+static void freeAlignmentMatrix(t_alignmentMatrix * matrix) {
+  freeMatrixRows(matrix->rows, matrix->nbRows);
+  freeMatrixRows(matrix->checkpoints, (matrix->nbRows - 1) / matrix->step + 1);
+  freeMatrixRows(matrix->band, matrix->step);
+  matrix->rows = NULL;
+  matrix->checkpoints = NULL;
+  matrix->band = NULL;
+}
+
+/**
+   hasSemanticTags:
+
+   Returns TRUE if at least one byte of the message has a semantic tag.
+*/
+static Bool hasSemanticTags(t_message * message) {
+  unsigned int i;
+
+  if (message->semanticTags == NULL) {
+    return FALSE;
+  }
+  for (i = 0; i < message->len; i++) {
+    if (message->semanticTags[i] != NULL && message->semanticTags[i]->name != NULL && strcmp(message->semanticTags[i]->name, "None") != 0) {
+      return TRUE;
+    }
+  }
+  return FALSE;
+}
+
+/**
+   initAlignmentMatrix:
+
+   Allocates the matrix required to align message1 with message2.
+   @return 0 if the matrix was allocated, -1 otherwise.
+*/
+static int initAlignmentMatrix(t_alignmentMatrix * matrix, t_message * message1, t_message * message2) {
+  matrix->nbRows = message1->len + 1;
+  matrix->nbColumns = message2->len + 1;
+  matrix->rows = NULL;
+  matrix->checkpoints = NULL;
+  matrix->band = NULL;
+  matrix->iBand = -1;
+  matrix->step = 1;
+  matrix->semanticScoring = hasSemanticTags(message1) && hasSemanticTags(message2);
+
+  if ((unsigned long) matrix->nbRows * matrix->nbColumns <= MAX_FULL_MATRIX_CELLS) {
+    matrix->rows = allocMatrixRows(matrix->nbRows, matrix->nbColumns);
+    return (matrix->rows == NULL) ? -1 : 0;
+  }
+
+  matrix->step = (unsigned int) ceil(sqrt((double) matrix->nbRows));
+  if (matrix->step < 2) {
+    matrix->step = 2;
+  }
+  matrix->checkpoints = allocMatrixRows((matrix->nbRows - 1) / matrix->step + 1, matrix->nbColumns);
+  matrix->band = allocMatrixRows(matrix->step, matrix->nbColumns);
+  if (matrix->checkpoints == NULL || matrix->band == NULL) {
+    freeAlignmentMatrix(matrix);
+    return -1;
+  }
+  return 0;
+}
+
+/**
+   computeAlignmentRowWithoutSemantic:
+
+   Computes the row i of the matrix given its previous row when no semantic
+   match can occur: the score of a cell only depends on the equality of
+   two bytes. The diagonal and upper moves, which do not depend on the other
+   cells of the row, are computed in a first loop the compiler can vectorize.
+   Gaps along the row are then propagated in a second loop.
+   If maxScore is not NULL, it is updated with the highest score of the row.
+*/
+static void computeAlignmentRowWithoutSemantic(short int * row, short int * previousRow, unsigned int i, t_message * message1, t_message * message2, int * maxScore) {
+  unsigned int j;
+  short int elt1, elt3, elt2;
+  const unsigned char byte1 = message1->alignment[i - 1];
+  // a dynamic byte never matches
+  const unsigned char dynamic1 = (message1->mask[i - 1] != 0);
+  const unsigned char * alignment2 = message2->alignment;
+  const unsigned char * mask2 = message2->mask;
+
+  for (j = 1; j <= message2->len; j++) {
+    elt1 = previousRow[j - 1] + ((!dynamic1 && mask2[j - 1] == 0 && alignment2[j - 1] == byte1) ? MATCH : MISMATCH);
+    elt3 = previousRow[j] + GAP;
+    row[j] = elt1 > elt3 ? elt1 : elt3;
+  }
 
+  row[0] = 0;
+  for (j = 1; j <= message2->len; j++) {
+    elt2 = row[j - 1] + GAP;
+    if (elt2 > row[j]) {
+      row[j] = elt2;
+    }
+    if (maxScore != NULL && row[j] > *maxScore) {
+      *maxScore = row[j];
+    }
+  }
+}
+
+/**
+   computeAlignmentRow:
+
+   Computes the row i of the matrix given its previous row.
+   If maxScore is not NULL, it is updated with the highest score of the row.
+*/
+static void computeAlignmentRow(t_alignmentMatrix * matrix, short int * row, short int * previousRow, unsigned int i, t_message * message1, t_message * message2, int * maxScore) {
+  unsigned int j;
+  short int elt1, elt2, elt3, max;
+
+  if (!matrix->semanticScoring) {
+    computeAlignmentRowWithoutSemantic(row, previousRow, i, message1, message2, maxScore);
+    return;
+  }
+
+  row[0] = 0;
+  for (j = 1; j <= message2->len; j++) {
+    elt1 = previousRow[j - 1];
+    elt1 += getSimilarityScore(message1, message2, i, j);
+    elt2 = row[j - 1] + GAP;
+    elt3 = previousRow[j] + GAP;
+    max = elt1 > elt2 ? elt1 : elt2;
+    max = max > elt3 ? max : elt3;
+    row[j] = max;
+    if (maxScore != NULL && max > *maxScore) {
+      *maxScore = max;
+    }
+  }
+}
+
+/**
+   fillCheckpointedAlignmentMatrix:
+
+   Fills the matrix row by row, only keeping its checkpoints and its last band.
+   @return the highest score of the matrix
+*/
+static int fillCheckpointedAlignmentMatrix(t_alignmentMatrix * matrix, t_message * message1, t_message * message2) {
+  unsigned int i;
+  int maxScoreMatrix = 0;
+  short int * row = NULL;
+  short int * previousRow = matrix->checkpoints[0];
 
-  free(messages);
+  for (i = 1; i < matrix->nbRows; i++) {
+    if (i % matrix->step == 0) {
+      row = matrix->checkpoints[i / matrix->step];
+    } else {
+      row = matrix->band[i % matrix->step];
+    }
+    computeAlignmentRow(matrix, row, previousRow, i, message1, message2, &maxScoreMatrix);
+    previousRow = row;
+  }
+  matrix->iBand = (matrix->nbRows - 1) / matrix->step;
+  return maxScoreMatrix;
 }
 
+/**
+   getAlignmentRow:
+
+   Returns the row i of a filled matrix, recomputing its band if required.
+   The returned row remains valid until a row of another band is requested.
+*/
+static short int * getAlignmentRow(t_alignmentMatrix * matrix, unsigned int i, t_message * message1, t_message * message2) {
+  unsigned int k;
+  unsigned int iBand;
+  short int * previousRow = NULL;
+
+  if (matrix->rows != NULL) {
+    return matrix->rows[i];
+  }
+  if (i % matrix->step == 0) {
+    return matrix->checkpoints[i / matrix->step];
+  }
+
+  iBand = i / matrix->step;
+  if ((int) iBand != matrix->iBand) {
+    previousRow = matrix->checkpoints[iBand];
+    for (k = 1; k < matrix->step && iBand * matrix->step + k < matrix->nbRows; k++) {
+      computeAlignmentRow(matrix, matrix->band[k], previousRow, iBand * matrix->step + k, message1, message2, NULL);
+      previousRow = matrix->band[k];
+    }
+    matrix->iBand = iBand;
+  }
+  return matrix->band[i % matrix->step];
+}
 
 char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, Bool debugMode){
   // local variables
-  short int ** matrix = NULL;
+  t_alignmentMatrix matrix;
+  short int * row = NULL;
+  short int * previousRow = NULL;
   unsigned int i = 0;
   unsigned int j = 0;
 
@@ -180,9 +416,9 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
   //+------------------------------------------------------------------------+
   // Create and initialize the matrix
   //+------------------------------------------------------------------------+
-  matrix = (short int**) malloc( sizeof(short int*) * (message1->len + 1) );
-  for (i = 0; i < (message1->len + 1); i++) {
-    matrix[i] = (short int*) calloc( (message2->len + 1), sizeof(short int) );
+  if (initAlignmentMatrix(&matrix, message1, message2) != 0) {
+    printf("Error while trying to allocate memory for variable : matrix.\n");
+    return NULL;
   }
 
   //+------------------------------------------------------------------------+
@@ -212,6 +448,18 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
   minLen = message1->len+1 <= message2->len+1 ? message1->len+1 : message2->len+1;
   maxLen = message1->len+1 > message2->len+1 ? message1->len+1 : message2->len+1;
 
+  if (matrix.rows == NULL) {
+    // The matrix is too large to be kept in memory, it is filled row by row
+    maxScoreMatrix = fillCheckpointedAlignmentMatrix(&matrix, message1, message2);
+    nbDiag = 0;
+  } else if (!matrix.semanticScoring) {
+    // Without semantic tags, rows are computed by the vectorizable kernel
+    for (i = 1; i < matrix.nbRows; i++) {
+      computeAlignmentRowWithoutSemantic(matrix.rows[i], matrix.rows[i - 1], i, message1, message2, &maxScoreMatrix);
+    }
+    nbDiag = 0;
+  }
+
   // Begin loop over diagonals
   for (diagloop = 0; diagloop < nbDiag; diagloop++){
   	//printf("Diag n %d\n",diagloop);
@@ -227,19 +475,19 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
         for(j = jblock; j < maxLoopj; j++){
           if (i > 0 && j > 0){
-            elt1 = matrix[i - 1][j - 1];
+            elt1 = matrix.rows[i - 1][j - 1];
 
 	    elt1 += getSimilarityScore(message1, message2, i, j);
-            elt2 = matrix[i][j - 1] + GAP;
-            elt3 = matrix[i - 1][j] + GAP;
+            elt2 = matrix.rows[i][j - 1] + GAP;
+            elt3 = matrix.rows[i - 1][j] + GAP;
             max = elt1 > elt2 ? elt1 : elt2;
             max = max > elt3 ? max : elt3;
-	    matrix[i][j] = max;
+	    matrix.rows[i][j] = max;
 	    if (max > maxScoreMatrix) {
 	      maxScoreMatrix = max;
 	    }
 
-	  }//printf("%d,\t",matrix[i][j]);
+	  }//printf("%d,\t",matrix.rows[i][j]);
        }
        //printf("\n");
      }//End for iblock
@@ -316,9 +564,11 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
   // DIAGONAL (almost) TRACEBACK
   while ((i > 0) && (j > 0)) {
-    eltL = matrix[i][j - 1];
-    eltD = matrix[i - 1][j - 1];
-    eltT = matrix[i - 1][j];
+    row = getAlignmentRow(&matrix, i, message1, message2);
+    previousRow = getAlignmentRow(&matrix, i - 1, message1, message2);
+    eltL = row[j - 1];
+    eltD = previousRow[j - 1];
+    eltT = previousRow[j];
 
     if ((eltL > eltD) && (eltL > eltT)) {
       --j;
@@ -480,7 +730,8 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
   // Compute the common alignment
   char hexrepr[3];
-  int sizereg = 100000;//(int)(levcop/10)*2+(int)(levcop/10)+2;
+  // Each position of the alignment adds at most two chars to the regex
+  int sizereg = 2 * (message1->len + message2->len) + 1;
   int regind = 0;
   tmpMessage = calloc(message1->len + message2->len, sizeof(unsigned char));
   tmpMessageMask = malloc((message1->len + message2->len) * sizeof(unsigned char));
@@ -650,14 +901,7 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
 end:
   // Room service
-  if(matrix) {
-    for (i = 0; i < (message1->len + 1); i++) {
-      if(matrix[i]) {
-	free(matrix[i]);
-      }
-    }
-    free(matrix);
-  }
+  freeAlignmentMatrix(&matrix);
   if(contentMessage1) {
     free(contentMessage1);
   }
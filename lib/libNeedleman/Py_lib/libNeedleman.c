@@ -148,7 +148,9 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   }
 
   // Return the serialization of the message
-  return serializeMessage(resMessage);
+  PyObject * result = serializeMessage(resMessage);
+  freePackedMessages(messages, nbMessages);
+  return result;
 }
 
 
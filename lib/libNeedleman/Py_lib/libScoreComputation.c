@@ -60,8 +60,9 @@ PyMODINIT_FUNC init_libScoreComputation(void) {
 PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyObject* args) {
   unsigned int doInternalSlick = 0;
   unsigned int debugMode = 0;
+  unsigned int nbThread = 1;
+  unsigned int nbKnownMessage = 0;
   int i = 0;
-  unsigned int j = 0;
   PyObject *temp_cb;
   PyObject *temp2_cb;
   Bool bool_debugMode;
@@ -72,7 +73,7 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
 
 
   // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hOOhO", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory)) {
+  if (!PyArg_ParseTuple(args, "hOOhO|II", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory, &nbThread, &nbKnownMessage)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_getHighestEquivalentGroup");
     return NULL;
   }
@@ -117,17 +118,22 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
     bool_debugMode = FALSE;
   }
 
-  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix);
+  // Couples of messages among the nbKnownMessage first ones are not computed
+  if (nbKnownMessage > nbmessage) {
+    nbKnownMessage = nbmessage;
+  }
+
+  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix, nbThread, nbKnownMessage);
 
   //Compute the scores recorded in a python list://TODO Return Factory
-  PyObject *recordedScores = PyList_New((nbmessage*(nbmessage-1))/2);
+  PyObject *recordedScores = PyList_New((nbmessage*(nbmessage-1))/2 - ((long) nbKnownMessage*(nbKnownMessage-1))/2);
   if (!recordedScores)
     return NULL;
   int i_record = 0;
   int j_record = 0;
   int current_index = 0;
   for (i_record = 0; i_record < nbmessage; i_record++) {
-      for(j_record = i_record + 1; j_record < nbmessage; j_record++){
+      for(j_record = (i_record < (int) nbKnownMessage) ? (int) nbKnownMessage : i_record + 1; j_record < nbmessage; j_record++){
 
         PyObject *s = PyFloat_FromDouble((double)scoreMatrix[i_record][j_record]);
         PyObject *i_p = PyString_FromString(mesmessages[i_record].uid);
@@ -147,16 +153,10 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
 
   //Free all //TODO: do a freeFactory
   for(i=0; i<nbmessage; i++) {
-    for (j=0; j<mesmessages[i].len; j++) {
-      free(mesmessages[i].semanticTags[j]);
-    }
-    free(mesmessages[i].semanticTags);
-
-    free(mesmessages[i].mask);
     free(scoreMatrix[i]);
   }
   free(scoreMatrix);
-  free(mesmessages);
+  freePackedMessages(mesmessages, nbmessage);
 
   return Py_BuildValue("S", recordedScores);
 }
@@ -37,6 +37,224 @@
 #include <malloc.h>
 #endif
 
+#ifndef _WIN32
+#include <pthread.h>
+#include <sys/time.h>
+#include <errno.h>
+
+// Delay (in milliseconds) between two progress reports of the threaded computation
+#define STATUS_REFRESH_DELAY 100
+
+/**
+   t_similarityJob:
+
+   Shared state between the threads computing the similarity matrix.
+   Rows of the matrix are distributed dynamically: each worker takes the
+   next free row, computes its scores and reports the number of couples done.
+   All the fields are protected by the mutex.
+*/
+typedef struct {
+  int nbMessage;
+  int nbKnownMessage;
+  t_message* messages;
+  Bool debugMode;
+  float** scoreMatrix;
+  int nextRow;
+  long nbDoneCouples;
+  unsigned int nbRunningThreads;
+  Bool stop;
+  pthread_mutex_t mutex;
+  pthread_cond_t cond;
+} t_similarityJob;
+#endif
+
+/**
+   getFirstCoupleOfRow:
+
+   Returns the first message to align with message i, couples of messages
+   among the nbKnownMessage first ones being skipped.
+*/
+static int getFirstCoupleOfRow(int i, int nbKnownMessage) {
+  return (i < nbKnownMessage) ? nbKnownMessage : i + 1;
+}
+
+/**
+   getNbCouples:
+
+   Returns the number of couples of messages to compute.
+*/
+static long getNbCouples(int nbMessage, int nbKnownMessage) {
+  return ((long) nbMessage * (nbMessage - 1)) / 2 - ((long) nbKnownMessage * (nbKnownMessage - 1)) / 2;
+}
+
+/**
+   computeSimilarityRow:
+
+   Computes the similarity scores between message i and all the
+   messages after it (scoreMatrix[i][p] with i < p), except the couples
+   of messages which are both among the nbKnownMessage first ones.
+   This function does not call any callback so it can safely be executed
+   outside the python interpreter lock.
+*/
+static void computeSimilarityRow(int i, int nbMessage, int nbKnownMessage, t_message* messages, Bool debugMode, float** scoreMatrix) {
+  t_message tmpResultMessage;
+  t_score score;
+  int p = 0;
+
+  for (p = getFirstCoupleOfRow(i, nbKnownMessage); p < nbMessage; p++) {
+    /**
+       Computes the NeedlemanScore between messages i and p
+       result is stored in the matrix[i][p]
+    */
+    tmpResultMessage.len = 0;
+    score.s1 = 0;
+    score.s2 = 0;
+    score.s3 = 0;
+    tmpResultMessage.score = &score;
+
+    if (debugMode) {
+      printf("Align two messages (%d, %d)\n", i, p);
+    }
+
+    char * regex = alignTwoMessages(&tmpResultMessage, FALSE, &messages[i], &messages[p], debugMode);
+    if (debugMode) {
+      printf("Regex = %s\n", regex);
+    }
+    free(regex);
+    scoreMatrix[i][p] = computeDistance(tmpResultMessage.score);
+  }
+}
+
+#ifndef _WIN32
+/**
+   computeSimilarityRows:
+
+   Body of a worker thread: computes rows of the matrix until all of them
+   are done or until the stop flag is raised.
+*/
+static void* computeSimilarityRows(void* arg) {
+  t_similarityJob* job = (t_similarityJob*) arg;
+  int i;
+
+  for (;;) {
+    pthread_mutex_lock(&job->mutex);
+    if (job->stop || job->nextRow >= job->nbMessage) {
+      job->nbRunningThreads--;
+      pthread_cond_signal(&job->cond);
+      pthread_mutex_unlock(&job->mutex);
+      return NULL;
+    }
+    i = job->nextRow++;
+    pthread_mutex_unlock(&job->mutex);
+
+    computeSimilarityRow(i, job->nbMessage, job->nbKnownMessage, job->messages, job->debugMode, job->scoreMatrix);
+
+    pthread_mutex_lock(&job->mutex);
+    job->nbDoneCouples += job->nbMessage - getFirstCoupleOfRow(i, job->nbKnownMessage);
+    pthread_mutex_unlock(&job->mutex);
+  }
+}
+
+/**
+   computeSimilarityMatrixThreaded:
+
+   Spreads the rows of the matrix over nbThread worker threads. The calling
+   thread releases the python interpreter lock while the workers are running
+   and wakes up periodically to report the status and to check if the user
+   requested to stop the execution.
+   @return 0 if the threads were executed, -1 if they could not be started.
+*/
+static int computeSimilarityMatrixThreaded(int nbMessage, int nbKnownMessage, t_message* messages, Bool debugMode, float** scoreMatrix, unsigned int nbThread) {
+  t_similarityJob job;
+  pthread_t* threads;
+  unsigned int i_thread;
+  unsigned int nbStartedThreads = 0;
+  long nbDoneCouples = 0;
+  long nbCouples = getNbCouples(nbMessage, nbKnownMessage);
+  Bool finished = FALSE;
+  struct timeval now;
+  struct timespec deadline;
+  void* threadState;
+
+  threads = (pthread_t*) malloc(nbThread * sizeof(pthread_t));
+  if (threads == NULL) {
+    return -1;
+  }
+
+  job.nbMessage = nbMessage;
+  job.nbKnownMessage = nbKnownMessage;
+  job.messages = messages;
+  job.debugMode = debugMode;
+  job.scoreMatrix = scoreMatrix;
+  job.nextRow = 0;
+  job.nbDoneCouples = 0;
+  job.nbRunningThreads = nbThread;
+  job.stop = FALSE;
+  pthread_mutex_init(&job.mutex, NULL);
+  pthread_cond_init(&job.cond, NULL);
+
+  for (i_thread = 0; i_thread < nbThread; i_thread++) {
+    if (pthread_create(&threads[i_thread], NULL, computeSimilarityRows, &job) != 0) {
+      break;
+    }
+    nbStartedThreads++;
+  }
+
+  // Account for the threads that could not be created
+  pthread_mutex_lock(&job.mutex);
+  job.nbRunningThreads -= nbThread - nbStartedThreads;
+  if (nbStartedThreads == 0) {
+    finished = TRUE;
+  }
+  pthread_mutex_unlock(&job.mutex);
+
+  while (!finished) {
+    // Wait for the workers without holding the python interpreter lock
+    threadState = callbackSaveThread();
+    pthread_mutex_lock(&job.mutex);
+    if (job.nbRunningThreads > 0) {
+      gettimeofday(&now, NULL);
+      deadline.tv_sec = now.tv_sec + (now.tv_usec + STATUS_REFRESH_DELAY * 1000) / 1000000;
+      deadline.tv_nsec = ((now.tv_usec + STATUS_REFRESH_DELAY * 1000) % 1000000) * 1000;
+      pthread_cond_timedwait(&job.cond, &job.mutex, &deadline);
+    }
+    nbDoneCouples = job.nbDoneCouples;
+    finished = (job.nbRunningThreads == 0);
+    pthread_mutex_unlock(&job.mutex);
+    callbackRestoreThread(threadState);
+
+    /**
+       Update the current status
+    */
+    double val = (nbCouples > 0) ? (double) 100.0 * nbDoneCouples / nbCouples : 100.0;
+    if (callbackStatus(0,val,"Building Status (%.2lf %%)",(float) val) == -1) {
+      printf("Error, error while executing C callback.\n");
+    }
+
+    /**
+       Stops the execution if user requested so
+    */
+    if (!finished && callbackIsFinish() == 1) {
+      pthread_mutex_lock(&job.mutex);
+      job.stop = TRUE;
+      pthread_mutex_unlock(&job.mutex);
+    }
+  }
+
+  threadState = callbackSaveThread();
+  for (i_thread = 0; i_thread < nbStartedThreads; i_thread++) {
+    pthread_join(threads[i_thread], NULL);
+  }
+  callbackRestoreThread(threadState);
+
+  pthread_cond_destroy(&job.cond);
+  pthread_mutex_destroy(&job.mutex);
+  free(threads);
+
+  return (nbStartedThreads == 0) ? -1 : 0;
+}
+#endif
+
 /**
    computeSimilarityMatrix:
 
@@ -46,14 +264,13 @@
    @param messages: a list containing messages to work with
    @param debug: activate or deactive debug messages
    @param scoreMatrix: a double-dimension array where the matrix score will be stored
+   @param nbThread: the number of threads among which the couples of messages are spread
+   @param nbKnownMessage: the number of first messages whose couples are already known (and not computed)
 */
-void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix) {
+void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix, unsigned int nbThread, int nbKnownMessage) {
   int i;
-  t_message tmpResultMessage;
-  t_score score;
-
-  // local variable
-  int p = 0;
+  long nbDoneCouples = 0;
+  long nbCouples = getNbCouples(nbMessage, nbKnownMessage);
 
   /**
      Stops the execution if user requested so
@@ -62,6 +279,19 @@ void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode,
     return;
   }
 
+#ifndef _WIN32
+  if (nbThread > 1 && nbMessage > 2) {
+    if (nbThread > (unsigned int) nbMessage - 1) {
+      nbThread = nbMessage - 1;
+    }
+    if (computeSimilarityMatrixThreaded(nbMessage, nbKnownMessage, messages, debugMode, scoreMatrix, nbThread) == 0) {
+      return;
+    }
+  }
+#else
+  (void) nbThread;
+#endif
+
   /**
      We loop over each different couple of messages
      messages[i] and messages [p] with i < p
@@ -75,33 +305,13 @@ void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode,
       return;
     }
 
-    for (p = i + 1; p < nbMessage; p++) {
-      /**
-	 Computes the NeedlemanScore between messages i and p
-	 result is stored in the matrix[i][p]
-      */
-      tmpResultMessage.len = 0;
-      score.s1 = 0;
-      score.s2 = 0;
-      score.s3 = 0;
-      tmpResultMessage.score = &score;
-
-      if (debugMode) {
-	printf("Align two messages (%d, %d)\n", i, p);
-      }
-
-      char * regex = alignTwoMessages(&tmpResultMessage, FALSE, &messages[i], &messages[p], debugMode);
-      if (debugMode) {
-	printf("Regex = %s\n", regex);
-      }
-      free(regex);
-      scoreMatrix[i][p] = computeDistance(tmpResultMessage.score);
-    }
+    computeSimilarityRow(i, nbMessage, nbKnownMessage, messages, debugMode, scoreMatrix);
+    nbDoneCouples += nbMessage - getFirstCoupleOfRow(i, nbKnownMessage);
 
     /**
        Update the current status
     */
-    double val = (double) 100.0 * (i * nbMessage + nbMessage - 1) / ((nbMessage - 1) * (nbMessage + 1));
+    double val = (nbCouples > 0) ? (double) 100.0 * nbDoneCouples / nbCouples : 100.0;
     if (callbackStatus(0,val,"Building Status (%.2lf %%)",(float) val) == -1) {
       printf("Error, error while executing C callback.\n");
     }
@@ -101,6 +101,10 @@ elif "release" in compileProfile:
     extraCompileArgs.extend([
         "-O2"])                 # gcc says: "Optimization level 2"
 
+# The similarity matrix is computed by a pool of POSIX threads
+pthreadCompileArgs = extraCompileArgs + ["-pthread"]
+pthreadLinkArgs = ["-pthread"]
+
 # +----------------------------------------------------------------------------
 # | Definition of the extensions
 # +----------------------------------------------------------------------------
@@ -138,7 +142,8 @@ macros = [('BID', '"{0}"'.format(str(uuid.uuid4())))]
 
 # Module Needleman
 moduleLibNeedleman = Extension('netzob._libNeedleman',
-                               extra_compile_args=extraCompileArgs,
+                               extra_compile_args=pthreadCompileArgs,
+                               extra_link_args=pthreadLinkArgs,
                                sources=[opj(interfacePath, "Interface.c"),
                                         opj(pyInterfacePath, "libInterface.c"),
                                         opj(pyNeedlemanPath, "libNeedleman.c"),
@@ -151,7 +156,8 @@ moduleLibNeedleman = Extension('netzob._libNeedleman',
 
 # Module ScoreComputation
 moduleLibScoreComputation = Extension('netzob._libScoreComputation',
-                                      extra_compile_args=extraCompileArgs,
+                                      extra_compile_args=pthreadCompileArgs,
+                                      extra_link_args=pthreadLinkArgs,
                                       sources=[opj(needlemanPath, "scoreComputation.c"),
                                                opj(pyNeedlemanPath, "libScoreComputation.c"),
                                                opj(needlemanPath, "Needleman.c"),
@@ -25,14 +25,11 @@
 #|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
 #+---------------------------------------------------------------------------+
 
-import uuid
+import array
 
-from netzob import _libScoreComputation
 #+---------------------------------------------------------------------------+
 #| Local application imports
 #+---------------------------------------------------------------------------+
-from netzob.Common.C_Extensions.WrapperMessage import WrapperMessage
-from netzob.Common.Models.Vocabulary.Messages.RawMessage import RawMessage
 from netzob.Common.NetzobException import NetzobException
 
 
@@ -41,6 +38,27 @@ class WrapperArgsFactory(object):
     This object will be transfered to the C extensions with its attributes which are:
     - self.typeList : a map between function name and function pointer
     - self.function : the function for which the parameters will be wrapped.
+
+    Messages are packed in a few contiguous buffers the C extensions read
+    without traversing one python object per message:
+    - self.data : the concatenation of the messages
+    - self.offsets : the offset of each message in data (and the total length)
+    - self.masks : the concatenation of the masks of the messages (0: static, 1: dynamic, 2: end of the alignment)
+    - self.tags : the index in tagNames of the semantic tag of each byte of data
+    - self.tagNames : the names of the semantic tags, tagNames[0] being "None"
+    - self.uids : the uids of the messages, separated by null bytes
+
+    >>> from netzob.all import *
+    >>> wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
+    >>> wrapper.alignMessages([("hello", {2: "name", 4: "name"}), ("bye", {})])
+    >>> wrapper.data
+    'hellobye'
+    >>> wrapper.offsets
+    array('I', [0L, 5L, 8L])
+    >>> wrapper.tags
+    array('I', [0L, 1L, 1L, 0L, 0L, 0L, 0L, 0L])
+    >>> wrapper.tagNames
+    ['None', 'name']
     """
 
     def __init__(self, function):
@@ -54,17 +72,49 @@ class WrapperArgsFactory(object):
             raise NetzobException("Function " + str(function) + " not implemented")
 
     def __str__(self):
-        return str(self.args)
+        return str([self.data[self.offsets[i]:self.offsets[i + 1]] for i in xrange(len(self.offsets) - 1)])
 
     def computeSimilarityMatrix(self, symbols):
-        self.args = []
-        for s in symbols:
-            self.args.append(WrapperMessage(s.messages[0], str(s.id)))
+        messages = [s.messages[0] for s in symbols]
+        self._pack([(message.data, message.semanticTags, None) for message in messages], [str(s.id) for s in symbols])
 
     def alignMessages(self, values):
-        self.args = []
-        for (data, tags) in values:
-            message = RawMessage(data=data)
+        """Values are tuples (data, tags) or (alignment, tags, mask) to align
+        a previously computed alignment."""
+        profiles = []
+        for value in values:
+            (data, tags) = value[:2]
+            mask = value[2] if len(value) > 2 else None
+            profiles.append((data, tags, mask))
+        self._pack(profiles, ["Virtual symbol"] * len(profiles))
+
+    def _pack(self, profiles, uids):
+        """Packs the (data, tags, mask) profiles in the buffers read by the C extensions.
+        Tags are indexed by half-byte position as in the semanticTags of a message."""
+        tagIndexes = {"None": 0}
+        self.tagNames = ["None"]
+        self.offsets = array.array('I', [0])
+        self.tags = array.array('I')
+        datas = []
+        masks = []
+        for (data, tags, mask) in profiles:
+            datas.append(data)
+            self.offsets.append(self.offsets[-1] + len(data))
+            if mask is None:
+                mask = '\x00' * len(data)
+            masks.append(mask[:len(data)].ljust(len(data), '\x00'))
+
+            byteTags = [0] * len(data)
             for pos, tag in tags.items():
-                message.addSemanticTag(pos, tag)
-            self.args.append(WrapperMessage(message, "Virtual symbol"))
+                tag = str(tag)
+                if pos % 2 != 0 or not 0 <= pos // 2 < len(data) or tag == "None":
+                    continue
+                if tag not in tagIndexes:
+                    tagIndexes[tag] = len(self.tagNames)
+                    self.tagNames.append(tag)
+                byteTags[pos // 2] = tagIndexes[tag]
+            self.tags.extend(byteTags)
+
+        self.data = ''.join(datas)
+        self.masks = ''.join(masks)
+        self.uids = ''.join(uid + '\x00' for uid in uids)
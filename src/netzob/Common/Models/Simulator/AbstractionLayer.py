@@ -46,6 +46,7 @@ from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Common.Models.Vocabulary.Symbol import Symbol
 from netzob.Common.Models.Vocabulary.EmptySymbol import EmptySymbol
 from netzob.Common.Models.Vocabulary.AbstractField import AbstractField
+from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
 
 
 @NetzobLogger
@@ -72,6 +73,15 @@ class AbstractionLayer(object):
     >>> print receivedMessage
     Hello Zoby !
 
+    Symbols added to the list of the abstraction layer are also considered
+
+    >>> symbolBye = Symbol([Field("Bye Zoby !")], name="Symbol_Bye")
+    >>> abstractionLayerIn.symbols.append(symbolBye)
+    >>> abstractionLayerOut.writeSymbol(symbolBye)
+    >>> (receivedSymbol, receivedMessage) = abstractionLayerIn.readSymbol()
+    >>> print receivedSymbol.name
+    Symbol_Bye
+
     """
 
     def __init__(self, channel, symbols):
@@ -114,7 +124,11 @@ class AbstractionLayer(object):
         data = self.channel.read()
         self._logger.info("Received data: '{0}'".format(repr(data)))
 
-        symbol = AbstractField.abstract(data, self.symbols)
+        indexedSymbols = tuple(id(symbol) for symbol in self.symbols)
+        if self.__symbolIndex is None or indexedSymbols != self.__indexedSymbols:
+            self.__symbolIndex = SymbolIndex(self.symbols)
+            self.__indexedSymbols = indexedSymbols
+        symbol = AbstractField.abstract(data, self.symbols, symbolIndex=self.__symbolIndex)
         if symbol is not None:
             self._logger.info("Received symbol on communication channel: '{0}'".format(symbol.name))
         else:
@@ -131,3 +145,25 @@ class AbstractionLayer(object):
         self._logger.info("Going to close the communication channel...")
         self.channel.close()
         self._logger.info("Communication channel close.")
+
+    def invalidateSymbolIndex(self):
+        """Forces the symbols to be indexed again when the next message is received.
+        It must be called once the definition of a symbol is modified."""
+        self.__symbolIndex = None
+
+    @property
+    def symbols(self):
+        """The symbols in which the received messages are abstracted.
+        They are indexed when the first message is received, the index is
+        computed again if symbols are added, removed or replaced. If the definition
+        of a symbol is modified, :meth:`invalidateSymbolIndex` must be called.
+
+        :type: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.Symbol.Symbol`
+        """
+        return self.__symbols
+
+    @symbols.setter
+    def symbols(self, symbols):
+        self.__symbols = symbols
+        self.__symbolIndex = None
+        self.__indexedSymbols = None
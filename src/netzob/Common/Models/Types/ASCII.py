@@ -36,6 +36,7 @@
 # +---------------------------------------------------------------------------+
 import random
 import string
+import re
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
@@ -84,6 +85,9 @@ class ASCII(AbstractType):
 
     """
 
+    # chars that cannot be encoded in ascii
+    __nonAsciiPattern = re.compile(r"[\x80-\xff]")
+
     def __init__(self, value=None, nbChars=(None, None), unitSize=AbstractType.defaultUnitSize(), endianness=AbstractType.defaultEndianness(), sign=AbstractType.defaultSign()):
         if value is not None and not isinstance(value, bitarray):
             from netzob.Common.Models.Types.TypeConverter import TypeConverter
@@ -252,6 +256,40 @@ class ASCII(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as ASCII.
+        The data is scanned once to find the first non-ascii char.
+
+        >>> from netzob.all import *
+        >>> ASCII().getParsableSizes(TypeConverter.convert("he\xffllo", Raw, BitArray))
+        [16, 8]
+        >>> ASCII(nbChars=(2, 3)).getParsableSizes(TypeConverter.convert("hello", ASCII, BitArray), minSize=20)
+        [24]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        (minChar, maxChar) = self.nbChars
+
+        maxNbChars = maxSize / 8
+        if maxChar is not None:
+            maxNbChars = min(maxNbChars, maxChar)
+        minNbChars = (minSize + 7) / 8
+        if minChar is not None:
+            minNbChars = max(minNbChars, minChar)
+
+        nonAscii = ASCII.__nonAsciiPattern.search(data[:maxNbChars * 8].tobytes())
+        if nonAscii is not None:
+            maxNbChars = nonAscii.start()
+
+        return [nbChars * 8 for nbChars in xrange(maxNbChars, minNbChars - 1, -1)]
+
     @property
     def nbChars(self):
         return self.__nbChars
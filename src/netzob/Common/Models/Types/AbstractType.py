@@ -386,6 +386,44 @@ class AbstractType(object):
         """
         raise NotImplementedError("Internal Error: 'canParse' method not implemented")
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """This method computes the sizes (in bits) of the prefixes of the specified data
+        that can be parsed with the current type. Sizes are returned in decreasing order.
+
+        This default implementation calls :meth:`canParse` on each prefix. Types override it
+        to compute the parsable prefixes with a single scan of the data.
+
+        >>> from netzob.all import *
+        >>> data = TypeConverter.convert("hello", ASCII, BitArray)
+        >>> ASCII(nbChars=(2, 4)).getParsableSizes(data)
+        [32, 24, 16]
+        >>> Raw().getParsableSizes(data, minSize=16, maxSize=33)
+        [32, 24, 16]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :keyword minSize: the minimum size (in bits) of the prefixes
+        :type minSize: :class:`int`
+        :keyword maxSize: the maximum size (in bits) of the prefixes, None means the size of the data
+        :type maxSize: :class:`int`
+        :return: the sizes of the prefixes that can be parsed
+        :rtype: a list of :class:`int`
+        :raise: TypeError if the data is None
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        return [size for size in xrange(maxSize, minSize - 1, -1) if self.canParse(data[:size])]
+
+    def _boundParsableSizes(self, data, minSize, maxSize):
+        """Restricts the sizes of the prefixes to the non-empty prefixes of data."""
+        if minSize is None or minSize < 1:
+            minSize = 1
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        return (minSize, maxSize)
+
     @property
     def value(self):
         """The current value of the instance. This value is represented
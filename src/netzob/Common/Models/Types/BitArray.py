@@ -101,6 +101,30 @@ class BitArray(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as a BitArray,
+        i.e. all the prefixes that respect the size constraints.
+
+        >>> from netzob.all import *
+        >>> BitArray(nbBits=(2, 4)).getParsableSizes(bitarray('010101011'))
+        [4, 3, 2]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        (nbMinBits, nbMaxBits) = self.size
+        if nbMinBits is not None:
+            minSize = max(minSize, nbMinBits)
+        if nbMaxBits is not None:
+            maxSize = min(maxSize, nbMaxBits)
+        return range(maxSize, minSize - 1, -1)
+
     def generate(self, generationStrategy=None):
         """Generates a random bitarray that respects the constraints.
         """
@@ -155,6 +155,25 @@ class Decimal(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as a Decimal,
+        i.e. all the non-empty prefixes.
+
+        >>> from netzob.all import *
+        >>> Decimal().getParsableSizes(TypeConverter.convert(10, Decimal, BitArray), minSize=6)
+        [8, 7, 6]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        return range(maxSize, minSize - 1, -1)
+
     @staticmethod
     def decode(data, unitSize=AbstractType.defaultUnitSize(), endianness=AbstractType.defaultEndianness(), sign=AbstractType.defaultSign()):
         """This method convert the specified data in python raw format.
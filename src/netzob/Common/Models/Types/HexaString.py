@@ -117,6 +117,26 @@ class HexaString(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as an hexastring.
+        An hexastring is represented in bitarray by the bytes it encodes, thus
+        all the prefixes aligned on a byte can be parsed.
+
+        >>> from netzob.all import *
+        >>> HexaString().getParsableSizes(TypeConverter.convert("0a0b0c", HexaString, BitArray), minSize=9)
+        [24, 16]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        return range(maxSize - maxSize % 8, minSize - 1, -8)
+
     @staticmethod
     @typeCheck(str)
     def decode(data, unitSize=AbstractType.defaultUnitSize(), endianness=AbstractType.defaultEndianness(), sign=AbstractType.defaultSign()):
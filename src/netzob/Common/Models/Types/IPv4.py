@@ -205,6 +205,28 @@ class IPv4(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as an IPv4.
+        An IPv4 is encoded on 4 bytes, thus only the prefixes of 25 to 32 bits are checked.
+
+        >>> from netzob.all import *
+        >>> data = TypeConverter.convert("192.168.0.10", IPv4, BitArray)
+        >>> IPv4().getParsableSizes(data + data, minSize=30)
+        [32, 31, 30]
+        >>> IPv4("10.0.0.1").getParsableSizes(data)
+        []
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        return [size for size in xrange(min(maxSize, 32), max(minSize, 25) - 1, -1) if self.canParse(data[:size])]
+
     def _isValidIPv4Network(self, network):
         """Computes if the specified network is a valid IPv4 network.
 
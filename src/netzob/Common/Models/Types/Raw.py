@@ -35,7 +35,6 @@
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
 import random
-import os
 from bitarray import bitarray
 
 # +---------------------------------------------------------------------------+
@@ -124,6 +123,14 @@ class Raw(AbstractType):
         >>> print 10<=len(gen) and 20<=len(gen)
         True
 
+        The generated bytes are drawn from the :mod:`random` module, so seeding it makes the generation reproducible
+
+        >>> import random
+        >>> random.seed(10)
+        >>> gen1 = a.generate()
+        >>> random.seed(10)
+        >>> print gen1 == a.generate()
+        True
 
 
         """
@@ -137,7 +144,8 @@ class Raw(AbstractType):
             minSize = 0
 
         generatedSize = random.randint(minSize, maxSize)
-        return TypeConverter.convert(os.urandom(generatedSize / 8), Raw, BitArray)
+        randomContent = ''.join([chr(random.getrandbits(8)) for i in xrange(generatedSize / 8)])
+        return TypeConverter.convert(randomContent, Raw, BitArray)
 
     @staticmethod
     def decode(data, unitSize=AbstractType.defaultUnitSize(), endianness=AbstractType.defaultEndianness(), sign=AbstractType.defaultSign()):
@@ -176,3 +184,21 @@ class Raw(AbstractType):
             return False
 
         return True
+
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Computes the sizes of the prefixes of data which can be parsed as raw, i.e. all the prefixes aligned on a byte.
+
+        >>> from netzob.all import *
+        >>> Raw().getParsableSizes(TypeConverter.convert("hello", ASCII, BitArray), minSize=1, maxSize=30)
+        [24, 16, 8]
+
+        :param data: the data to check
+        :type data: :class:`bitarray.bitarray`
+        :return: the sizes (in bits) of the parsable prefixes in decreasing order
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+
+        (minSize, maxSize) = self._boundParsableSizes(data, minSize, maxSize)
+        return range(maxSize - maxSize % 8, minSize - 1, -8)
@@ -28,10 +28,13 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
+import binascii
+import string
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
 # +---------------------------------------------------------------------------+
+from bitarray import bitarray
 
 # +---------------------------------------------------------------------------+
 # | Local application imports                                                 |
@@ -52,11 +55,142 @@ class TypeConverter(object):
         """
         return AbstractType.supportedTypes()
 
+    # registry of the functions that directly convert a source type into a destination type
+    __directConverters = None
+
+    # types supported by the converter
+    __supportedTypes = None
+
+    # translation table used to encode a raw in ASCII (non printable chars are replaced by '.')
+    __printableTable = string.maketrans("".join([chr(i) for i in range(0, 0x20) + range(0x7f, 0x100)]), "." * (0x20 + 0x81))
+
+    @staticmethod
+    def registerDirectConverter(sourceType, destinationType, converter):
+        """Registers a function that directly converts data from the sourceType
+        to the destinationType without the intermediary Raw representation.
+
+        The function receives the data to convert and the src_unitSize, src_endianness, src_sign,
+        dst_unitSize, dst_endianness and dst_sign parameters of the conversion.
+
+        >>> from netzob.all import *
+        >>> def decimalToASCII(data, *args):
+        ...     return str(data)
+        >>> TypeConverter.registerDirectConverter(Decimal, ASCII, decimalToASCII)
+        >>> TypeConverter.convert(42, Decimal, ASCII)
+        '42'
+        >>> TypeConverter.unregisterDirectConverter(Decimal, ASCII)
+        >>> TypeConverter.convert(42, Decimal, ASCII)
+        '*'
+
+        :param sourceType: the data source type
+        :type sourceType: :class:`type`
+        :param destinationType: the destination type
+        :type destinationType: :class:`type`
+        :param converter: the conversion function
+        :type converter: a function
+        """
+        TypeConverter.__getDirectConverters()[(sourceType, destinationType)] = converter
+
+    @staticmethod
+    def unregisterDirectConverter(sourceType, destinationType):
+        """Removes the direct conversion function registered for the sourceType and the destinationType."""
+        TypeConverter.__getDirectConverters().pop((sourceType, destinationType), None)
+
+    @staticmethod
+    def __getDirectConverters():
+        if TypeConverter.__directConverters is None:
+            from netzob.Common.Models.Types.ASCII import ASCII
+            from netzob.Common.Models.Types.BitArray import BitArray
+            from netzob.Common.Models.Types.Decimal import Decimal
+            from netzob.Common.Models.Types.HexaString import HexaString
+
+            TypeConverter.__directConverters = {
+                (Raw, BitArray): TypeConverter.__rawToBitArray,
+                (BitArray, Raw): TypeConverter.__bitArrayToRaw,
+                (ASCII, BitArray): TypeConverter.__asciiToBitArray,
+                (BitArray, ASCII): TypeConverter.__bitArrayToASCII,
+                (Raw, HexaString): TypeConverter.__rawToHexaString,
+                (HexaString, Raw): TypeConverter.__hexaStringToRaw,
+                (Raw, Decimal): TypeConverter.__rawToDecimal,
+                (Decimal, Raw): TypeConverter.__decimalToRaw,
+            }
+        return TypeConverter.__directConverters
+
+    @staticmethod
+    def __rawToBitArray(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        if dst_endianness == AbstractType.ENDIAN_BIG:
+            result = bitarray(endian='big')
+        elif dst_endianness == AbstractType.ENDIAN_LITTLE:
+            result = bitarray(endian='little')
+        else:
+            raise ValueError("Invalid endianness value")
+        result.frombytes(data)
+        return result
+
     @staticmethod
-    def __directEncoding():
-        return {
-            # (ASCII,bitarray):TypeConverter.__encodeASCIIToBitarray,
-        }
+    def __bitArrayToRaw(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        return data.tobytes()
+
+    @staticmethod
+    def __asciiToBitArray(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        return TypeConverter.__rawToBitArray(str(data).encode('utf-8'), src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign)
+
+    @staticmethod
+    def __bitArrayToASCII(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        return data.tobytes().translate(TypeConverter.__printableTable)
+
+    @staticmethod
+    def __rawToHexaString(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        return binascii.hexlify(data)
+
+    @staticmethod
+    def __hexaStringToRaw(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        from netzob.Common.Models.Types.HexaString import HexaString
+        return HexaString.decode(data, unitSize=src_unitSize, endianness=src_endianness, sign=src_sign)
+
+    @staticmethod
+    def __rawToDecimal(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        from netzob.Common.Models.Types.Decimal import Decimal
+        return Decimal.encode(data, unitSize=dst_unitSize, endianness=dst_endianness, sign=dst_sign)
+
+    @staticmethod
+    def __decimalToRaw(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+        from netzob.Common.Models.Types.Decimal import Decimal
+        return Decimal.decode(data, unitSize=src_unitSize, endianness=src_endianness, sign=src_sign)
+
+    @staticmethod
+    def __getConverter(sourceType, destinationType):
+        """Returns the function that converts data from the sourceType to the destinationType."""
+
+        # is the two formats supported ?
+        if TypeConverter.__supportedTypes is None:
+            TypeConverter.__supportedTypes = frozenset(TypeConverter.supportedTypes())
+        if sourceType not in TypeConverter.__supportedTypes:
+            raise TypeError("The source type ({0}) is not supported".format(sourceType))
+        if destinationType not in TypeConverter.__supportedTypes:
+            raise TypeError("The destination type ({0}) is not supported".format(destinationType))
+
+        # Do we have a specific source to destination encoding function
+        converter = TypeConverter.__getDirectConverters().get((sourceType, destinationType))
+        if converter is not None:
+            return converter
+
+        def convertThroughRaw(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign):
+            # Convert from source to raw
+            if sourceType is not Raw:
+                binData = sourceType.decode(data, unitSize=src_unitSize, endianness=src_endianness, sign=src_sign)
+            else:
+                binData = data
+
+            # Convert from raw to Destination
+            if destinationType is not Raw:
+                outputData = destinationType.encode(binData, unitSize=dst_unitSize, endianness=dst_endianness, sign=dst_sign)
+            else:
+                outputData = binData
+
+            return outputData
+
+        return convertThroughRaw
 
     @staticmethod
     def convert(data, sourceType, destinationType,
@@ -121,29 +255,44 @@ class TypeConverter(object):
         :raise: TypeError if parameter not valid
 
         """
-        # is the two formats supported ?
-        if sourceType not in TypeConverter.supportedTypes():
-            raise TypeError("The source type ({0}) is not supported".format(sourceType))
-        if destinationType not in TypeConverter.supportedTypes():
-            raise TypeError("The destination type ({0}) is not supported".format(destinationType))
+        converter = TypeConverter.__getConverter(sourceType, destinationType)
         if data is None:
             raise TypeError("Data cannot be None")
 
-        # Do we have a specific source to destination encoding function
-        if (sourceType, destinationType) in TypeConverter.__directEncoding().keys():
-            func = TypeConverter.__directEncoding()[(sourceType, destinationType)]
-            return func(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign)
-        else:
-            # Convert from source to raw
-            if sourceType is not Raw:
-                binData = sourceType.decode(data, unitSize=src_unitSize, endianness=src_endianness, sign=src_sign)
-            else:
-                binData = data
+        return converter(data, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign)
 
-            # Convert from raw to Destination
-            if destinationType is not Raw:
-                outputData = destinationType.encode(binData, unitSize=dst_unitSize, endianness=dst_endianness, sign=dst_sign)
-            else:
-                outputData = binData
+    @staticmethod
+    def convertMany(data, sourceType, destinationType,
+                    src_unitSize=AbstractType.defaultUnitSize(), src_endianness=AbstractType.defaultEndianness(), src_sign=AbstractType.defaultSign(),
+                    dst_unitSize=AbstractType.defaultUnitSize(), dst_endianness=AbstractType.defaultEndianness(), dst_sign=AbstractType.defaultSign()):
+        """Encode a list of data provided as a sourceType to a destinationType.
+        The conversion function is only looked up once for all the data.
 
-            return outputData
+        >>> from netzob.all import *
+        >>> TypeConverter.convertMany(["\\x01\\x02", "hello"], Raw, HexaString)
+        ['0102', '68656c6c6f']
+        >>> TypeConverter.convertMany([1, 2, 3], Decimal, BitArray)
+        [bitarray('00000001'), bitarray('00000010'), bitarray('00000011')]
+
+        :param data: the list of data to convert
+        :type data: :class:`list`
+        :param sourceType: the data source type
+        :type sourceType: :class:`type`
+        :param destinationType: the destination type
+        :type destinationType: :class:`type`
+        :return: the list of converted data
+        :rtype: :class:`list`
+        :raise: TypeError if parameter not valid
+
+        See :meth:`convert` for the other parameters.
+        """
+        converter = TypeConverter.__getConverter(sourceType, destinationType)
+        if data is None:
+            raise TypeError("Data cannot be None")
+
+        result = []
+        for value in data:
+            if value is None:
+                raise TypeError("Data cannot be None")
+            result.append(converter(value, src_unitSize, src_endianness, src_sign, dst_unitSize, dst_endianness, dst_sign))
+        return result
@@ -82,6 +82,15 @@ class AbstractionException(Exception):
     pass
 
 
+class _AlignmentCache(dict):
+    """The memoized alignments of a field. They are dropped when
+    the field is pickled (e.g. to be sent to another process) and
+    an empty cache is recreated when it is unpickled."""
+
+    def __reduce__(self):
+        return (_AlignmentCache, ())
+
+
 @NetzobLogger
 class AbstractField(AbstractMementoCreator):
     """Represents all the different classes which participates in fields definitions of a message format."""
@@ -103,6 +112,8 @@ class AbstractField(AbstractMementoCreator):
 
         self._variable = None
 
+        self.__alignmentCache = _AlignmentCache()
+
     @typeCheck(bool, bool, bool)
     def getCells(self, encoded=True, styled=True, transposed=False):
         """Returns a matrix with a different line for each messages attached to the symbol of the current element.
@@ -242,8 +253,79 @@ class AbstractField(AbstractMementoCreator):
         if len(self.messages) < 1:
             raise ValueError("This symbol does not contain any message.")
 
+        # The alignment is computed (or retrieved from the cache) at the symbol level
+        # and only the columns of the current element leaf fields are returned
+        symbol = self.getSymbol()
+        symbolCells = symbol._getAlignedCells(encoded=encoded, styled=styled)
+
+        symbolLeafFields = symbol._getLeafFields()
+        iColumns = [symbolLeafFields.index(field) for field in self._getLeafFields()]
+
+        from netzob.Common.Utils.MatrixList import MatrixList
+        result = MatrixList()
+        for line in symbolCells:
+            result.append([line[iColumn] for iColumn in iColumns])
+        return result
+
+    def _getAlignedCells(self, encoded=True, styled=True):
+        """Returns the alignment of the messages of the current element over all its leaf fields.
+
+        The computed alignment is memoized: it is reused as long as the leaf fields,
+        their domain, their encoding functions and the messages do not change.
+        Modifications made inside a domain (for instance, the children of an Alt) are not
+        tracked, use :meth:`clearAlignmentCache` after such modifications.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage("hello {0}".format(pseudo)) for pseudo in ['netzob', 'zoby']]
+        >>> f1 = Field("hello ", name="hello")
+        >>> f2 = Field(["netzob", "zoby"], name="pseudo")
+        >>> symbol = Symbol([f1, f2], messages=messages)
+        >>> symbol._getAlignedCells() is symbol._getAlignedCells()
+        True
+        >>> print f2.getValues()
+        ['netzob', 'zoby']
+        >>> symbol.messages.append(RawMessage("hello netzob"))
+        >>> print f2.getValues()
+        ['netzob', 'zoby', 'netzob']
+        >>> f2.domain = ["zoby", "netzob", "lapy"]
+        >>> symbol.messages.append(RawMessage("hello lapy"))
+        >>> print f2.getValues()
+        ['netzob', 'zoby', 'netzob', 'lapy']
+        >>> import pickle
+        >>> symbol2 = pickle.loads(pickle.dumps(symbol))
+        >>> len(symbol2._AbstractField__alignmentCache)
+        0
+        >>> f2.addEncodingFunction(TypeEncodingFunction(HexaString))
+        >>> print f2.getValues()
+        ['6e65747a6f62', '7a6f6279', '6e65747a6f62', '6c617079']
+
+        :keyword encoded: if set to True, encoding functions are applied on returned cells
+        :type encoded: :class:`bool`
+        :keyword styled: if set to True, visualization functions are applied on returned cells
+        :type styled: :class:`bool`
+        :return: a matrix representing the aligned messages, it must not be modified.
+        :rtype: a :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        :raises: :class:`netzob.Common.Models.Vocabulary.AbstractField.AlignmentException` if an error occurs while aligning messages
+        """
+
         # Fetch all the data to align
-        data = [message.data for message in self.messages]
+        data = tuple([message.data for message in self.messages])
+
+        # Objects the alignment depends on. They are kept referenced by the cache
+        # so that their identifiers cannot be reused by other objects.
+        dependencies = []
+        for field in self._getLeafFields():
+            dependencies.append(field)
+            dependencies.append(getattr(field, "domain", None))
+            if encoded:
+                dependencies.extend(field.encodingFunctions.values())
+        signature = tuple([id(dependency) for dependency in dependencies])
+
+        cacheKey = (encoded, styled)
+        if cacheKey in self.__alignmentCache:
+            (cachedSignature, cachedDependencies, cachedData, cachedCells) = self.__alignmentCache[cacheKey]
+            if cachedSignature == signature and cachedData == data:
+                return cachedCells
 
         # [DEBUG] set to false for debug only. A sequential alignment is more simple to debug
         useParallelAlignment = False
@@ -251,11 +333,20 @@ class AbstractField(AbstractMementoCreator):
         if useParallelAlignment:
             # Execute a parallel alignment
             from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
-            return ParallelDataAlignment.align(data, self, encoded=encoded)
+            cells = ParallelDataAlignment.align(list(data), self, encoded=encoded)
         else:
             # Execute a sequential alignment
             from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-            return DataAlignment.align(data, self, encoded=encoded)
+            cells = DataAlignment.align(list(data), self, encoded=encoded)
+
+        self.__alignmentCache[cacheKey] = (signature, dependencies, data, cells)
+        return cells
+
+    def clearAlignmentCache(self):
+        """Remove the memoized alignments of the current element and of its symbol."""
+        self.__alignmentCache.clear()
+        if self.hasParent():
+            self.parent.clearAlignmentCache()
 
     @typeCheck(bool, bool)
     def getValues(self, encoded=True, styled=True):
@@ -485,9 +576,14 @@ class AbstractField(AbstractMementoCreator):
         return
 
     @staticmethod
-    def abstract(data, fields):
+    def abstract(data, fields, symbolIndex=None, parsingStrategy=None):
         """Search in the fields/symbols the first one that can abstract the data.
 
+        The fields/symbols that are tried are first narrowed with a
+        :class:`netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex.SymbolIndex`
+        which should be computed once to abstract many data with the same symbols
+        (it also keeps the parsing plans of the symbols).
+
         >>> from netzob.all import *
         >>> messages = ["{0}, what's up in {1} ?".format(pseudo, city) for pseudo in ['netzob', 'zoby'] for city in ['Paris', 'Berlin']]
 
@@ -511,19 +607,35 @@ class AbstractField(AbstractMementoCreator):
         Symbol-zoby
         Symbol-zoby
 
+        The strategy used to parse the data can be specified
+
+        >>> strategy = DepthFirstParsingStrategy()
+        >>> print AbstractField.abstract(messages[3], [s1, s2], parsingStrategy=strategy).name
+        Symbol-zoby
+        >>> print strategy.nbExploredPaths > 0
+        True
+
         :parameter data: the data that should be abstracted in symbol
         :type data: :class:`str`
         :parameter fields: a list of fields/symbols targeted during the abstraction process
         :type fields: :class:`list` of :class:`netzob.Common.Models.Vocabulary.AbstractField`
+        :keyword symbolIndex: the index computed over the specified fields, computed if not specified
+        :type symbolIndex: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex.SymbolIndex`
+        :keyword parsingStrategy: the strategy used to parse the data, the default strategy of the parser if None
+        :type parsingStrategy: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy.ParsingStrategy`
 
         :return: a field/symbol
         :rtype: :class:`netzob.Common.Models.Vocabulary.AbstractField`
         :raises: :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractionException` if an error occurs while abstracting the data
         """
         from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-        for field in fields:
-            try:                
-                DataAlignment.align([data], field, encoded=False)
+        from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+        if symbolIndex is None:
+            symbolIndex = SymbolIndex(fields)
+
+        for field in symbolIndex.getCandidates(data):
+            try:
+                DataAlignment.align([data], field, encoded=False, parsingPlan=symbolIndex.getParsingPlan(field), parsingStrategy=parsingStrategy)
                 return field
             except:
                 pass
@@ -213,7 +213,7 @@ class FieldParser():
         self._logger.debug("Parses '{0}' with field '{1}' specifications".format(data, self.field.name))
 
         # we assign this data to the field's variable
-        parsingPath.assignDataToVariable(data.copy(), self.field.domain)                
+        parsingPath.assignDataToVariable(data, self.field.domain)                
 
         # we create a first VariableParser and uses it to parse the domain
         variableParser = VariableParser(domain)
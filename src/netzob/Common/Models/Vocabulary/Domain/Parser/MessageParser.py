@@ -47,6 +47,8 @@ from netzob.Common.Models.Types.TypeConverter import TypeConverter
 from netzob.Common.Models.Types.BitArray import BitArray
 from netzob.Common.Models.Types.Raw import Raw
 from netzob.Common.Models.Vocabulary.Domain.Parser.FieldParser import FieldParser
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy import ParsingStrategy, BeamParsingStrategy
 
 
 @NetzobLogger
@@ -149,9 +151,10 @@ class MessageParser(object):
 
     """
 
-    def __init__(self, memory=None):
+    def __init__(self, memory=None, parsingStrategy=None):
         if memory is None:
             self.memory = Memory()
+        self.parsingStrategy = parsingStrategy
 
     @typeCheck(AbstractMessage, Symbol)
     def parseMessage(self, message, symbol):
@@ -171,8 +174,12 @@ class MessageParser(object):
         return self.parseRaw(dataToParse, fields)
 
     @typeCheck(object)
-    def parseRaw(self, dataToParse, fields):
-        """This method parses the specified raw against the specification of the provided symbol."""
+    def parseRaw(self, dataToParse, fields, parsingPlan=None):
+        """This method parses the specified raw against the specification of the provided symbol.
+
+        A :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan.ParsingPlan` computed once
+        for the specified fields can be provided to parse many messages. If not specified, a plan is computed.
+        """
         if dataToParse is None or len(dataToParse) <= 0:
             raise Exception("Specified data to parse is empty (or None)")
         if fields is None:
@@ -182,70 +189,100 @@ class MessageParser(object):
 
         # self._logger.debug("Parse content '{0}' according to symbol {1}".format(dataToParse, symbol.name))
 
+        if parsingPlan is None:
+            parsingPlan = ParsingPlan(fields)
+
         # this variable host the result of the parsing
         parsingResult = None
 
         # we convert the raw into bitarray
         bitArrayToParse = TypeConverter.convert(dataToParse, Raw, BitArray)
 
-        # initiates the parsing process by creating a first parsing path
-        parsingPaths = [ParsingPath(bitArrayToParse.copy(), self.memory)]
-        # assign to the first field of the symbol all the data to parse
-        parsingPaths[0].assignDataToField(bitArrayToParse.copy(), fields[0])
+        # fields which offset is statically known are directly parsed
+        prefixResult = parsingPlan.parsePrefix(bitArrayToParse, self.memory)
+        if prefixResult is None:
+            raise Exception("No parsing path returned while parsing message {0}".format(dataToParse))
+        (prefixValues, memory) = prefixResult
+        nbParsedFields = len(prefixValues)
+        offset = sum([len(value) for value in prefixValues])
 
-        # we successively apply each fields of the symbol to parse the specified data
-        for i_field in xrange(len(fields)):
+        if nbParsedFields == len(fields):
+            if offset != len(bitArrayToParse):
+                raise Exception("No parsing path returned while parsing message {0}".format(dataToParse))
+            self.memory = memory
+            return prefixValues
 
-            current_field = fields[i_field]
+        # initiates the parsing process by creating a first parsing path
+        parsingPath = ParsingPath(bitArrayToParse, memory)
+        for (field, value) in zip(fields, prefixValues):
+            parsingPath.assignDataToVariable(value, field.domain)
+            parsingPath.assignDataToField(value, field)
+        # assign to the first remaining field of the symbol all the data to parse
+        parsingPath.assignDataToField(bitArrayToParse[offset:], fields[nbParsedFields])
+
+        # the strategy successively applies each remaining field of the symbol to parse the specified data
+        fieldParsers = dict()
+
+        def parseField(parsingPath, i_field):
+            if i_field not in fieldParsers:
+                fieldParsers[i_field] = FieldParser(fields[i_field], lastField=(i_field == len(fields) - 1))
+            return self._parseField(fieldParsers[i_field], parsingPath, i_field, fields)
+
+        def isValid(parsingPath):
+            return parsingPath.validForMessage(fields, bitArrayToParse)
+
+        parsingResult = self.parsingStrategy.search(parsingPath, nbParsedFields, fields, parseField, isValid)
+        if parsingResult is None:
+            raise Exception("No parsing path returned while parsing message {0}".format(dataToParse))
 
-            # identify next field
-            if i_field < len(fields) - 1:
-                next_field = fields[i_field + 1]
-            else:
-                next_field = None
+        result = []
+        for field in fields:
+            result.append(parsingResult.getDataAssignedToField(field))
 
-            # build a field parser
-            fp = FieldParser(current_field, lastField=(i_field == len(fields) - 1))
-            newParsingPaths = []
+        self.memory = parsingResult.memory
+        return result
 
-            for parsingPath in parsingPaths:
-                # we remove erroneous paths
-                value_before_parsing = parsingPath.getDataAssignedToField(current_field).copy()
-                resultParsingPaths = fp.parse(parsingPath)
+    def _parseField(self, fieldParser, parsingPath, i_field, fields):
+        """Parses the field at the specified index and returns the parsing paths that
+        successfully parsed it. The data following the parsed value is assigned to the next field."""
 
-                for resultParsingPath in resultParsingPaths:
-                    value_after_parsing = resultParsingPath.getDataAssignedToField(current_field)
-                    remainingValue = value_before_parsing[len(value_after_parsing):].copy()
+        current_field = fields[i_field]
 
-                    if next_field is not None:
-                        resultParsingPath.assignDataToField(remainingValue, next_field)
+        # identify next field
+        if i_field < len(fields) - 1:
+            next_field = fields[i_field + 1]
+        else:
+            next_field = None
 
-                    if resultParsingPath.isDataAvailableForField(current_field):
-                        newParsingPaths.append(resultParsingPath)
+        newParsingPaths = []
 
-            # lets filter
+        # we remove erroneous paths
+        value_before_parsing = parsingPath.getDataAssignedToField(current_field)
+        resultParsingPaths = fieldParser.parse(parsingPath)
 
-            parsingPaths = newParsingPaths[:100]
+        for resultParsingPath in resultParsingPaths:
+            value_after_parsing = resultParsingPath.getDataAssignedToField(current_field)
+            remainingValue = value_before_parsing[len(value_after_parsing):]
 
-        finalParsingPaths = []
-        for parsingPath in parsingPaths:
-            if parsingPath.validForMessage(fields, bitArrayToParse):
-                finalParsingPaths.append(parsingPath)
-        if len(finalParsingPaths) == 0:
-            raise Exception("No parsing path returned while parsing message {0}".format(dataToParse))
+            if next_field is not None:
+                resultParsingPath.assignDataToField(remainingValue, next_field)
 
-        parsingResult = finalParsingPaths[len(finalParsingPaths) - 1]
-        result = []
-        for field in fields:
-            result.append(parsingResult.getDataAssignedToField(field))
+            if resultParsingPath.isDataAvailableForField(current_field):
+                newParsingPaths.append(resultParsingPath)
 
-        test = result[0].copy()
+        return newParsingPaths
 
-        for res in result[1:]:
-            test += res.copy()
+    @property
+    def parsingStrategy(self):
+        """The strategy used to explore the parsing paths.
 
-#        if test != bitArrayToParse:
-#            raise Exception("OUPS")
+        :type: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy.ParsingStrategy`
+        """
+        return self.__parsingStrategy
 
-        self.memory = parsingResult.memory
-        return result
+    @parsingStrategy.setter
+    @typeCheck(ParsingStrategy)
+    def parsingStrategy(self, parsingStrategy):
+        if parsingStrategy is None:
+            parsingStrategy = BeamParsingStrategy()
+        self.__parsingStrategy = parsingStrategy
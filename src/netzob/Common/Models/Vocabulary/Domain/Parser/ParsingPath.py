@@ -49,10 +49,34 @@ from netzob.Common.Models.Vocabulary.Domain.GenericPath import GenericPath
 
 @NetzobLogger
 class ParsingPath(GenericPath):
+    """A parsing path stores the data assigned to fields and variables while
+    a message is parsed.
+
+    Data assigned to a path are never modified once assigned. Thus, a duplicated
+    path shares the data (and the memory, which is copied on write) of the original path
+    and duplicating a path does not depend on the size of the parsed message.
+
+    >>> from netzob.all import *
+    >>> from bitarray import bitarray
+    >>> variable = Data(ASCII())
+    >>> content = TypeConverter.convert("hello", ASCII, BitArray)
+    >>> path = ParsingPath(dataToParse=content, memory=Memory())
+    >>> path.assignDataToVariable(content, variable)
+    >>> path.memory.memorize(variable, content)
+    >>> duplicatedPath = path.duplicate()
+    >>> duplicatedPath.getDataAssignedToVariable(variable) is path.getDataAssignedToVariable(variable)
+    True
+    >>> duplicatedPath.assignDataToVariable(content[:8], variable)
+    >>> duplicatedPath.memory.forget(variable)
+    >>> print TypeConverter.convert(path.getDataAssignedToVariable(variable), BitArray, Raw)
+    hello
+    >>> print path.memory.hasValue(variable), duplicatedPath.memory.hasValue(variable)
+    True False
+    """
 
     def __init__(self, dataToParse, memory, dataAssignedToField=None, dataAssignedToVariable=None, fieldsCallbacks = None, ok = None, parsedData=None):
         super(ParsingPath, self).__init__(memory, dataAssignedToField=dataAssignedToField, dataAssignedToVariable=dataAssignedToVariable, fieldsCallbacks=fieldsCallbacks)        
-        self.originalDataToParse = dataToParse.copy()
+        self.originalDataToParse = dataToParse
         if ok is None:
             self.__ok = True
         else:
@@ -78,17 +102,13 @@ class ParsingPath(GenericPath):
         return parsedMessage == bitArrayMessage
 
     def duplicate(self):
-        dField = {}
-        for key, value in self._dataAssignedToField.iteritems():
-            dField[key] = value.copy()
-
-        dVariable = {}
-        for key, value in self._dataAssignedToVariable.iteritems():
-            dVariable[key] = value.copy()
+        # assigned data are never modified, they can be shared with the new path
+        dField = dict(self._dataAssignedToField)
+        dVariable = dict(self._dataAssignedToVariable)
 
         fCall = [x for x in self._fieldsCallbacks]
 
-        result = ParsingPath(self.originalDataToParse, memory=self.memory.duplicate(), dataAssignedToField = dField, dataAssignedToVariable=dVariable, fieldsCallbacks=fCall, ok=self.ok())
+        result = ParsingPath(self.originalDataToParse, memory=self.memory.duplicate(shareValues=True), dataAssignedToField = dField, dataAssignedToVariable=dVariable, fieldsCallbacks=fCall, ok=self.ok())
         
         return result
         
@@ -0,0 +1,172 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2014 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Models.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Common.Models.Vocabulary.Domain.Variables.SVAS import SVAS
+
+
+@NetzobLogger
+class ParsingPlan(object):
+    """A parsing plan is a precompiled description of how a list of fields
+    parses a message. It is computed once and can be reused to parse many messages
+    with the :class:`netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser.MessageParser`.
+
+    The plan identifies the leading fields which offsets in the message are
+    statically known, i.e. fields which domain is a constant value or a data of a fixed size.
+    These fields are directly parsed by slicing the message while the
+    remaining fields are parsed with the generic parsing paths exploration.
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+    >>> f0 = Field("hello", name="F0")
+    >>> f1 = Field(ASCII(nbChars=3), name="F1")
+    >>> f2 = Field(ASCII(nbChars=(1, 10)), name="F2")
+    >>> f3 = Field("!", name="F3")
+    >>> s = Symbol(fields=[f0, f1, f2, f3])
+    >>> plan = ParsingPlan(s._getLeafFields())
+    >>> print [f.name for f in plan.prefixFields]
+    ['F0', 'F1']
+    >>> mp = MessageParser()
+    >>> for data in ["helloPUTtoto!", "helloGETtiti!"]:
+    ...     print [TypeConverter.convert(v, BitArray, Raw) for v in mp.parseRaw(data, s._getLeafFields(), parsingPlan=plan)]
+    ['hello', 'PUT', 'toto', '!']
+    ['hello', 'GET', 'titi', '!']
+    >>> mp.parseRaw("hallo", s._getLeafFields(), parsingPlan=plan)
+    Traceback (most recent call last):
+      ...
+    Exception: No parsing path returned while parsing message hallo
+
+    .. warning:: the plan is computed from the fields definitions, it must be
+                 computed again if these definitions are modified.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: the leaf fields of a symbol in the order they parse a message
+        :type fields: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.Field.Field`
+        """
+        if fields is None:
+            raise TypeError("Fields cannot be None")
+        self.fields = list(fields)
+        self.__steps = []
+        for field in self.fields:
+            step = self.__compileField(field)
+            if step is None:
+                break
+            self.__steps.append(step)
+
+    def __compileField(self, field):
+        """Computes how the specified field can be parsed at a known offset.
+        It returns a tuple (variable, expectedValue, size, memorize) or None if
+        the field requires the generic parsing process."""
+
+        variable = getattr(field, "domain", None)
+        if not isinstance(variable, Data):
+            return None
+
+        if variable.svas == SVAS.CONSTANT:
+            expectedValue = variable.currentValue
+            if expectedValue is None or len(expectedValue) == 0:
+                return None
+            return (variable, expectedValue, len(expectedValue), False)
+
+        if variable.svas in (SVAS.EPHEMERAL, SVAS.VOLATILE):
+            (minSize, maxSize) = variable.dataType.size
+            if minSize is None or minSize != maxSize or minSize <= 0:
+                return None
+            return (variable, None, minSize, variable.svas == SVAS.EPHEMERAL)
+
+        return None
+
+    def parsePrefix(self, data, memory):
+        """Parses the beginning of the specified data with the fields
+        which offset is statically known.
+
+        It returns a tuple made of the list of values of the parsed fields
+        and of the memory to use for the remaining of the parsing. None is returned
+        if the data cannot be parsed by these fields. The provided memory is never modified.
+
+        :param data: the data to parse
+        :type data: :class:`bitarray`
+        :param memory: the memory used while parsing
+        :type memory: :class:`netzob.Common.Models.Vocabulary.Domain.Variables.Memory.Memory`
+        :rtype: a :class:`tuple` (:class:`list` of :class:`bitarray`, :class:`netzob.Common.Models.Vocabulary.Domain.Variables.Memory.Memory`)
+        """
+        values = []
+        offset = 0
+        duplicatedMemory = False
+        for (variable, expectedValue, size, memorize) in self.__steps:
+            if expectedValue is not None and memory.hasValue(variable):
+                # a memorized value takes the priority over the definition,
+                # the generic parsing process handles this case
+                break
+
+            value = data[offset:offset + size]
+            if len(value) < size:
+                return None
+            if expectedValue is not None:
+                if value != expectedValue:
+                    return None
+            elif not variable.dataType.canParse(value):
+                return None
+
+            if memorize:
+                if not duplicatedMemory:
+                    memory = memory.duplicate()
+                    duplicatedMemory = True
+                memory.memorize(variable, value.copy())
+
+            values.append(value)
+            offset += size
+
+        return (values, memory)
+
+    @property
+    def prefixFields(self):
+        """The leading fields which are parsed at a statically known offset.
+
+        :type: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.Field.Field`
+        """
+        return self.fields[:len(self.__steps)]
@@ -0,0 +1,298 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2014 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Models.Vocabulary.Domain.Variables.Nodes.AbstractVariableNode import AbstractVariableNode
+from netzob.Common.Models.Vocabulary.Domain.Variables.Leafs.AbstractRelationVariableLeaf import AbstractRelationVariableLeaf
+
+
+@NetzobLogger
+class ParsingStrategy(object):
+    """A parsing strategy drives the exploration of the parsing paths
+    while a :class:`netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser.MessageParser`
+    parses a message. Fields are parsed one after the other, each field parser
+    producing the paths (i.e. the possible parsings) of the field.
+
+    A strategy counts the number of paths it explored and the number of paths it pruned.
+    These counters are accumulated over the parsed messages until :meth:`resetCounters` is called.
+
+    >>> from netzob.all import *
+    >>> f1 = Field(ASCII(nbChars=(1, 10)))
+    >>> f2 = Field(ASCII(nbChars=(1, 10)))
+    >>> f3 = Field(";")
+    >>> s = Symbol(fields=[f1, f2, f3])
+    >>> m = RawMessage("helloworld;")
+
+    By default, the parser keeps the 100 first paths after each field (:class:`BeamParsingStrategy`)
+
+    >>> strategy = BeamParsingStrategy()
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(m, s)]
+    ['h', 'elloworld', ';']
+    >>> print strategy.nbExploredPaths, strategy.nbPrunedPaths
+    74 0
+
+    The depth-first strategy stops on the first path that parses the whole message
+
+    >>> strategy = DepthFirstParsingStrategy()
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(m, s)]
+    ['helloworl', 'd', ';']
+    >>> print strategy.nbExploredPaths, strategy.nbPrunedPaths
+    14 8
+
+    """
+
+    def __init__(self):
+        self.resetCounters()
+
+    def resetCounters(self):
+        """Resets the number of explored and pruned paths."""
+        self.nbExploredPaths = 0
+        self.nbPrunedPaths = 0
+
+    def search(self, initialParsingPath, fieldIndex, fields, expandCallback, validityCallback):
+        """Searches a parsing path that parses all the fields starting from
+        the field at the specified index.
+
+        :param initialParsingPath: the parsing path in which the data to parse is assigned to the field at index fieldIndex
+        :param fieldIndex: the index of the first field to parse
+        :param fields: the list of fields to parse
+        :param expandCallback: function(parsingPath, fieldIndex) that returns the parsing paths of the field at fieldIndex
+        :param validityCallback: function(parsingPath) that returns True if the parsing path represents the whole message
+        :return: the selected parsing path or None if no path parses the message
+        """
+        raise NotImplementedError("The search method must be implemented by the parsing strategy")
+
+
+class BeamParsingStrategy(ParsingStrategy):
+    """This strategy parses the fields one after the other and only keeps
+    a limited number of paths (the width of the beam) after each field.
+    Among the paths that parse the whole message, the last one is selected.
+
+    >>> from netzob.all import *
+    >>> f1 = Field(ASCII(nbChars=(1, 10)))
+    >>> f2 = Field(ASCII(nbChars=(1, 10)))
+    >>> s = Symbol(fields=[f1, f2])
+    >>> strategy = BeamParsingStrategy(width=2)
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(RawMessage("helloworld"), s)]
+    ['helloworl', 'd']
+    >>> print strategy.nbExploredPaths, strategy.nbPrunedPaths
+    11 8
+
+    Without limit, all the paths are explored
+
+    >>> strategy = BeamParsingStrategy(width=None)
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(RawMessage("helloworld"), s)]
+    ['h', 'elloworld']
+    >>> print strategy.nbExploredPaths, strategy.nbPrunedPaths
+    55 0
+
+    """
+
+    DEFAULT_WIDTH = 100
+
+    def __init__(self, width=DEFAULT_WIDTH):
+        super(BeamParsingStrategy, self).__init__()
+        if width is not None and width <= 0:
+            raise ValueError("The width of the beam must be strictly positive")
+        self.width = width
+
+    def search(self, initialParsingPath, fieldIndex, fields, expandCallback, validityCallback):
+        parsingPaths = [initialParsingPath]
+        for i_field in xrange(fieldIndex, len(fields)):
+            newParsingPaths = []
+            for parsingPath in parsingPaths:
+                newParsingPaths.extend(expandCallback(parsingPath, i_field))
+            self.nbExploredPaths += len(newParsingPaths)
+            parsingPaths = self._filter(newParsingPaths, i_field, fields)
+            self.nbPrunedPaths += len(newParsingPaths) - len(parsingPaths)
+
+        finalParsingPaths = [parsingPath for parsingPath in parsingPaths if validityCallback(parsingPath)]
+        if len(finalParsingPaths) == 0:
+            return None
+        return finalParsingPaths[-1]
+
+    def _filter(self, parsingPaths, fieldIndex, fields):
+        """Returns the paths to keep after the parsing of the field at the specified index."""
+        if self.width is None:
+            return parsingPaths
+        return parsingPaths[:self.width]
+
+
+class MemoizedParsingStrategy(BeamParsingStrategy):
+    """This strategy merges the paths that reached the same state, i.e. paths that parsed
+    the same number of fields, that have the same remaining data to parse and the same memory.
+    Such paths lead to the same parsings of the remaining fields: only the first one is kept.
+    Paths with pending relation callbacks are never merged as their validity
+    depends on the data assigned to the previous fields. Similarly, the data assigned
+    to the parsed fields a remaining relation variable depends on is part of the state.
+
+    >>> from netzob.all import *
+    >>> f1 = Field(Data(ASCII(nbChars=(0, 4)), svas=SVAS.VOLATILE))
+    >>> f2 = Field(Data(ASCII(nbChars=(0, 4)), svas=SVAS.VOLATILE))
+    >>> f3 = Field(Data(ASCII(nbChars=(1, 4)), svas=SVAS.VOLATILE))
+    >>> s = Symbol(fields=[f1, f2, f3])
+    >>> strategy = MemoizedParsingStrategy()
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(RawMessage("hello"), s)]
+    ['h', '', 'ello']
+    >>> print strategy.nbPrunedPaths > 0
+    True
+
+    Paths that assigned different data to a field referenced by a following relation are not merged
+
+    >>> f1 = Field(Data(ASCII(nbChars=(1, 4)), svas=SVAS.VOLATILE))
+    >>> f2 = Field(Data(ASCII(nbChars=(0, 4)), svas=SVAS.VOLATILE))
+    >>> f3 = Field(Size(f1, dataType=Raw(nbBytes=1)))
+    >>> s = Symbol(fields=[f1, f2, f3])
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=MemoizedParsingStrategy()).parseMessage(RawMessage("abcd\\x02"), s)]
+    ['ab', 'cd', '\\x02']
+    >>> f3 = Field(Value(f1))
+    >>> s = Symbol(fields=[f1, f2, f3])
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=MemoizedParsingStrategy()).parseMessage(RawMessage("abcdab"), s)]
+    ['ab', 'cd', 'ab']
+
+    """
+
+    def __init__(self, width=None):
+        super(MemoizedParsingStrategy, self).__init__(width=width)
+
+    def _filter(self, parsingPaths, fieldIndex, fields):
+        currentField = fields[fieldIndex]
+        if fieldIndex < len(fields) - 1:
+            nextField = fields[fieldIndex + 1]
+        else:
+            nextField = None
+
+        dependencies = self.__getRelationDependencies(fields[fieldIndex + 1:])
+
+        states = set()
+        result = []
+        for parsingPath in parsingPaths:
+            state = self.__computeState(parsingPath, currentField, nextField, dependencies)
+            if state is not None:
+                if state in states:
+                    continue
+                states.add(state)
+            result.append(parsingPath)
+        return super(MemoizedParsingStrategy, self)._filter(result, fieldIndex, fields)
+
+    def __getRelationDependencies(self, fields):
+        """Returns the fields the relation variables of the specified fields depend on."""
+        dependencies = []
+        variables = [field.domain for field in fields if getattr(field, "domain", None) is not None]
+        while len(variables) > 0:
+            variable = variables.pop()
+            if isinstance(variable, AbstractVariableNode):
+                variables.extend(variable.children)
+            elif isinstance(variable, AbstractRelationVariableLeaf):
+                for field in variable.fieldDependencies:
+                    if field not in dependencies:
+                        dependencies.append(field)
+        return dependencies
+
+    def __computeState(self, parsingPath, currentField, nextField, dependencies):
+        """Computes a key that identifies the state of the parsing path
+        or None if the path cannot be merged with other paths."""
+        if len(parsingPath._fieldsCallbacks) > 0:
+            return None
+        if nextField is not None:
+            remaining = len(parsingPath.getDataAssignedToField(nextField))
+        else:
+            remaining = len(parsingPath.getDataAssignedToField(currentField))
+        memory = parsingPath.memory.memory
+        memoryState = frozenset((id(variable), len(value), value.tobytes()) for (variable, value) in memory.iteritems())
+        dependenciesState = []
+        for field in dependencies:
+            if parsingPath.isDataAvailableForField(field):
+                value = parsingPath.getDataAssignedToField(field)
+                dependenciesState.append((len(value), value.tobytes()))
+            else:
+                dependenciesState.append(None)
+        return (remaining, memoryState, tuple(dependenciesState))
+
+
+class DepthFirstParsingStrategy(ParsingStrategy):
+    """This strategy explores the paths depth first and stops as soon as one path
+    parses the whole message. A maximum number of explored paths can be specified:
+    the search stops (and fails) once it is reached.
+
+    >>> from netzob.all import *
+    >>> f1 = Field(ASCII(nbChars=(1, 10)))
+    >>> f2 = Field("!")
+    >>> s = Symbol(fields=[f1, f2])
+    >>> strategy = DepthFirstParsingStrategy(maxExploredPaths=10)
+    >>> print [TypeConverter.convert(v, BitArray, Raw) for v in MessageParser(parsingStrategy=strategy).parseMessage(RawMessage("hello!"), s)]
+    ['hello', '!']
+    >>> MessageParser(parsingStrategy=strategy).parseMessage(RawMessage("hello!!!!!"), s)
+    Traceback (most recent call last):
+    ...
+    Exception: No parsing path returned while parsing message hello!!!!!
+
+    """
+
+    def __init__(self, maxExploredPaths=None):
+        super(DepthFirstParsingStrategy, self).__init__()
+        self.maxExploredPaths = maxExploredPaths
+
+    def search(self, initialParsingPath, fieldIndex, fields, expandCallback, validityCallback):
+        nbExploredPaths = 0
+        stack = [(initialParsingPath, fieldIndex)]
+        while len(stack) > 0:
+            (parsingPath, i_field) = stack.pop()
+            if i_field == len(fields):
+                if validityCallback(parsingPath):
+                    self.nbPrunedPaths += len(stack)
+                    return parsingPath
+                continue
+
+            if self.maxExploredPaths is not None and nbExploredPaths >= self.maxExploredPaths:
+                self.nbPrunedPaths += len(stack) + 1
+                return None
+
+            newParsingPaths = expandCallback(parsingPath, i_field)
+            nbExploredPaths += len(newParsingPaths)
+            self.nbExploredPaths += len(newParsingPaths)
+            # first produced paths are explored first
+            for newParsingPath in reversed(newParsingPaths):
+                stack.append((newParsingPath, i_field + 1))
+        return None
@@ -0,0 +1,304 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2014 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Models.Vocabulary.Symbol import Symbol
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+from netzob.Common.Models.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Common.Models.Vocabulary.Domain.Variables.Leafs.Size import Size
+from netzob.Common.Models.Vocabulary.Domain.Variables.Nodes.Agg import Agg
+from netzob.Common.Models.Vocabulary.Domain.Variables.Nodes.Alt import Alt
+from netzob.Common.Models.Vocabulary.Domain.Variables.Nodes.Repeat import Repeat
+from netzob.Common.Models.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Common.Models.Types.TypeConverter import TypeConverter
+from netzob.Common.Models.Types.BitArray import BitArray
+from netzob.Common.Models.Types.Raw import Raw
+
+
+@NetzobLogger
+class SymbolIndex(object):
+    """A symbol index is a precompiled description of the messages each symbol
+    of a list can abstract. It is computed once and used to narrow the symbols
+    that are tried when abstracting a message with
+    :meth:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField.abstract`.
+
+    For each symbol, the index identifies the static prefix denoted by its leading
+    constant fields, the minimum and maximum sizes of its messages and, if the symbol
+    starts with a size field at a known offset which covers the trailing fields, the
+    expected value of this size field. Symbols are indexed by their static prefixes so
+    a message is only compared with the symbols that share its prefix. The index is
+    conservative: a symbol which is not returned as a candidate cannot abstract the message.
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+    >>> s0 = Symbol([Field("USER "), Field(ASCII(nbChars=(1, 10)))], name="USER")
+    >>> s1 = Symbol([Field("PASS "), Field(ASCII(nbChars=(1, 10)))], name="PASS")
+    >>> s2 = Symbol([Field("QUIT")], name="QUIT")
+    >>> f0 = Field(ASCII(nbChars=(1, 10)))
+    >>> s3 = Symbol([Field(Size(f0)), Field(";"), f0], name="DATA")
+    >>> index = SymbolIndex([s0, s1, s2, s3])
+    >>> for data in ["USER netzob", "PASS zoby", "QUIT", "\\x06;netzob", "\\x03;netzob", "USER this is a long name"]:
+    ...     print repr(data), [s.name for s in index.getCandidates(data)]
+    'USER netzob' ['USER']
+    'PASS zoby' ['PASS']
+    'QUIT' ['QUIT']
+    '\\x06;netzob' ['DATA']
+    '\\x03;netzob' []
+    'USER this is a long name' []
+
+    Fields which are not symbols are always returned as candidates. Repetitions
+    without maximum number of repeats do not bound the size of the messages.
+
+    >>> s4 = Symbol([Field("LIST "), Field(Repeat(ASCII("a"), nbRepeat=(1, None)))], name="LIST")
+    >>> index = SymbolIndex([s0, s4])
+    >>> print [s.name for s in index.getCandidates("LIST " + "a" * 2000)]
+    ['LIST']
+
+    .. warning:: the index is computed from the symbols definitions, it must be
+                 computed again if these definitions are modified.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: the fields/symbols targeted during the abstraction process
+        :type fields: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField`
+        """
+        if fields is None:
+            raise TypeError("Fields cannot be None")
+        self.fields = list(fields)
+
+        # for each field, a tuple (minSize, maxSize, sizeCheck) or None if any message can be abstracted
+        self.__constraints = []
+        # the indexes of the fields per static prefix per length of prefix
+        self.__prefixTable = dict()
+        for i_field, field in enumerate(self.fields):
+            try:
+                (prefix, constraints) = self.__compileField(field)
+            except Exception, e:
+                # the field is not indexed, it is always a candidate
+                self._logger.debug("The field {0} cannot be indexed: {1}".format(field.name, e))
+                (prefix, constraints) = ("", None)
+            self.__constraints.append(constraints)
+            self.__prefixTable.setdefault(len(prefix), dict()).setdefault(prefix, []).append(i_field)
+        self.__prefixLengths = sorted(self.__prefixTable.keys())
+        # the parsing plans of the fields, computed when requested
+        self.__parsingPlans = dict()
+
+    def getCandidates(self, data):
+        """Computes the fields that may abstract the specified data, in the order of the indexed fields.
+
+        :param data: the data to abstract
+        :type data: :class:`str`
+        :return: the fields that may abstract the data
+        :rtype: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField`
+        """
+        indexes = []
+        for prefixLength in self.__prefixLengths:
+            if prefixLength > len(data):
+                break
+            indexes.extend(self.__prefixTable[prefixLength].get(data[:prefixLength], []))
+        indexes.sort()
+
+        nbBits = len(data) * 8
+        bitArrayData = None
+        candidates = []
+        for i_field in indexes:
+            constraints = self.__constraints[i_field]
+            if constraints is not None:
+                (minSize, maxSize, sizeCheck) = constraints
+                if nbBits < minSize or (maxSize is not None and nbBits > maxSize):
+                    continue
+                if sizeCheck is not None:
+                    if bitArrayData is None:
+                        bitArrayData = TypeConverter.convert(data, Raw, BitArray)
+                    if not self.__checkSize(sizeCheck, bitArrayData):
+                        continue
+            candidates.append(self.fields[i_field])
+        return candidates
+
+    def getParsingPlan(self, field):
+        """Returns the parsing plan of the leaf fields of the specified field. It is
+        computed once, so the abstraction of many data does not compute it again.
+
+        >>> from netzob.all import *
+        >>> from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+        >>> s = Symbol([Field("USER "), Field(ASCII(nbChars=(1, 10)))])
+        >>> index = SymbolIndex([s])
+        >>> index.getParsingPlan(s) is index.getParsingPlan(s)
+        True
+
+        :param field: a field returned by :meth:`getCandidates`
+        :type field: :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField`
+        :rtype: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan.ParsingPlan`
+        """
+        parsingPlan = self.__parsingPlans.get(id(field))
+        if parsingPlan is None:
+            parsingPlan = ParsingPlan(field._getLeafFields())
+            self.__parsingPlans[id(field)] = parsingPlan
+        return parsingPlan
+
+    def __compileField(self, field):
+        """Computes the static prefix (as a raw) and the constraints of the messages
+        the specified field can abstract."""
+
+        if not isinstance(field, Symbol):
+            return ("", None)
+
+        leafFields = field._getLeafFields()
+
+        prefix = bitarray()
+        for leafField in leafFields:
+            domain = leafField.domain
+            if not isinstance(domain, Data) or domain.svas != SVAS.CONSTANT or domain.currentValue is None:
+                break
+            prefix += domain.currentValue
+
+        bounds = [self.__computeBounds(leafField.domain) for leafField in leafFields]
+        minSize = sum([b[0] for b in bounds])
+        if None in [b[1] for b in bounds]:
+            maxSize = None
+        else:
+            maxSize = sum([b[1] for b in bounds])
+
+        return (self.__toRaw(prefix), (minSize, maxSize, self.__compileSizeCheck(leafFields, bounds)))
+
+    def __toRaw(self, prefix):
+        """Converts the bytes of the prefix into a raw comparable with the abstracted data"""
+        prefix = prefix[:len(prefix) - len(prefix) % 8]
+        raw = TypeConverter.convert(prefix, BitArray, Raw)
+        if TypeConverter.convert(raw, Raw, BitArray) != prefix:
+            # the endianness of the prefix differs from the one of the abstracted data
+            return ""
+        return raw
+
+    def __computeBounds(self, variable):
+        """Computes the minimum and maximum sizes (in bits) of the data the variable can parse.
+        The maximum size is None if it is not bounded."""
+
+        if isinstance(variable, Data):
+            currentValue = variable.currentValue
+            if variable.svas in (SVAS.CONSTANT, SVAS.PERSISTENT) and currentValue is not None:
+                return (len(currentValue), len(currentValue))
+            (minSize, maxSize) = variable.dataType.size
+            return (minSize or 0, maxSize)
+
+        if isinstance(variable, Size):
+            # the parsed value is the expected value, which cannot exceed the size of the data type
+            return (0, variable.dataType.size[1])
+
+        if isinstance(variable, Agg):
+            bounds = [self.__computeBounds(child) for child in variable.children]
+            minSize = sum([b[0] for b in bounds])
+            if None in [b[1] for b in bounds]:
+                return (minSize, None)
+            return (minSize, sum([b[1] for b in bounds]))
+
+        if isinstance(variable, Alt) and len(variable.children) > 0:
+            bounds = [self.__computeBounds(child) for child in variable.children]
+            minSize = min([b[0] for b in bounds])
+            if None in [b[1] for b in bounds]:
+                return (minSize, None)
+            return (minSize, max([b[1] for b in bounds]))
+
+        if isinstance(variable, Repeat):
+            (minChild, maxChild) = self.__computeBounds(variable.children[0])
+            (minRepeat, maxRepeat) = variable.nbRepeat
+            if maxChild is None or maxRepeat is None:
+                return (minChild * minRepeat, None)
+            delimitorSize = 0
+            if variable.delimitor is not None:
+                delimitorSize = len(variable.delimitor)
+            return (minChild * minRepeat, (maxRepeat - 1) * (maxChild + delimitorSize))
+
+        return (0, None)
+
+    def __compileSizeCheck(self, leafFields, bounds):
+        """Identifies a size field which offset is statically known and which covers
+        the trailing fields. It returns a tuple (sizeVariable, sizeOffset, dependenciesOffset)
+        or None if no such size field exists."""
+
+        offset = 0
+        for (i_leaf, leafField) in enumerate(leafFields):
+            domain = leafField.domain
+            if isinstance(domain, Size):
+                break
+            (minSize, maxSize) = bounds[i_leaf]
+            if minSize != maxSize:
+                return None
+            offset += minSize
+        else:
+            return None
+
+        (minSize, maxSize) = domain.dataType.size
+        if minSize is None or minSize != maxSize:
+            return None
+
+        dependencies = list(domain.fieldDependencies)
+        i_dependency = len(leafFields) - len(dependencies)
+        if i_dependency <= i_leaf or set([id(f) for f in dependencies]) != set([id(f) for f in leafFields[i_dependency:]]):
+            return None
+
+        dependenciesOffset = offset + maxSize
+        for (minSize, maxSize) in bounds[i_leaf + 1:i_dependency]:
+            if minSize != maxSize:
+                return None
+            dependenciesOffset += minSize
+
+        return (domain, offset, dependenciesOffset)
+
+    def __checkSize(self, sizeCheck, data):
+        """Checks the value of the size field of the data matches the size of its dependencies"""
+        (sizeVariable, sizeOffset, dependenciesOffset) = sizeCheck
+        if len(data) < dependenciesOffset:
+            return False
+        try:
+            expectedValue = sizeVariable._computeExpectedValueOfSize(len(data) - dependenciesOffset)
+        except Exception:
+            return True
+        sizeOfValue = sizeVariable.dataType.size[1]
+        if len(expectedValue) != sizeOfValue:
+            # the size field does not parse data of the size of its data type
+            return True
+        return data[sizeOffset:sizeOffset + sizeOfValue] == expectedValue
@@ -114,7 +114,13 @@ class FieldSpecializer():
     @typeCheck(SpecializingPath)
     def specialize(self, specializingPath=None):
         """Execute the specialize operation"""
-        
+        return list(self.iterSpecialize(specializingPath))
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath=None):
+        """Lazily yields the valid paths of the specialize operation,
+        a path is only computed when it is requested."""
+
         if specializingPath is None:
             specializingPath = SpecializingPath(memory=Memory())
 
@@ -135,16 +141,7 @@ class FieldSpecializer():
         if specializingPath is None:
             specializingPath = SpecializingPath(memory=Memory())
 
-        resultPaths = [specializingPath]
-        for child in self.field.fields:
-            fs = FieldSpecializer(child)
-
-            tmpResultPaths = []
-            for path in resultPaths:
-                tmpResultPaths.extend(fs.specialize(path))
-            resultPaths = tmpResultPaths
-        
-        for resultPath in resultPaths:
+        for resultPath in self.__iterSpecializeChildren(specializingPath, 0):
             value = None
             for child in self.field.fields:
                 childResult = resultPath.getDataAssignedToVariable(child.domain)
@@ -155,8 +152,19 @@ class FieldSpecializer():
 
             resultPath.addResult(self.field.domain, value)
             resultPath.addResultToField(self.field, value)
+            yield resultPath
 
-        return resultPaths
+    def __iterSpecializeChildren(self, specializingPath, i_child):
+        """Yields the paths on which the children fields starting at i_child have been specialized"""
+
+        if i_child == len(self.field.fields):
+            yield specializingPath
+            return
+
+        fs = FieldSpecializer(self.field.fields[i_child])
+        for path in fs.iterSpecialize(specializingPath):
+            for resultPath in self.__iterSpecializeChildren(path, i_child + 1):
+                yield resultPath
 
     @typeCheck(SpecializingPath)
     def _specializeField(self, specializingPath=None):
@@ -173,20 +181,18 @@ class FieldSpecializer():
 
         # we create a first VariableParser and uses it to parse the domain
         variableSpecializer = VariableSpecializer(domain)
-        resultSpecializingPaths = variableSpecializer.specialize(specializingPath)
 
-        for resultSpecializingPath in resultSpecializingPaths:
+        for resultSpecializingPath in variableSpecializer.iterSpecialize(specializingPath):
             self._logger.debug("FieldSpecializer Result: {0}".format(resultSpecializingPath.getDataAssignedToVariable(self.field.domain)))
             resultSpecializingPath.addResultToField(self.field, resultSpecializingPath.getDataAssignedToVariable(self.field.domain))
-
-        return resultSpecializingPaths
+            yield resultSpecializingPath
 
     @typeCheck(SpecializingPath)
     def _specializePrismaField(self, specializingPath=None):
         """ applies Rules on the current Field
 
         :param specializingPath: some Netzob deeps
-        :return: the specializingPath with the generated Value
+        :return: the specializingPaths with the generated Value
         """
         # apply rules for field
         self.field.domainUpdate()
@@ -103,65 +103,87 @@ class MessageSpecializer(object):
 
     @typeCheck(Symbol)
     def specializeSymbol(self, symbol):
-        """This method generates a message based on the provided symbol definition."""
+        """This method generates a message based on the provided symbol definition.
+
+        The specialization stops as soon as a first complete path is found."""
+
+        for specializingPath in self.iterSpecializeSymbol(symbol):
+            return specializingPath
+
+        raise Exception("Cannot specialize this symbol.")
+
+    @typeCheck(Symbol)
+    def iterSpecializeSymbol(self, symbol):
+        """This method lazily yields the distinct messages that can be generated
+        from the provided symbol definition. A path is only computed when it is requested
+        and the memory of the specializer is updated with the one of the last yielded path.
+
+        >>> from netzob.all import *
+        >>> f0 = Field(Alt([ASCII("netzob"), ASCII("zoby")]))
+        >>> f1 = Field(ASCII(" "))
+        >>> f2 = Field(Repeat(ASCII("!"), nbRepeat=(1, 3)))
+        >>> s = Symbol(fields=[f0, f1, f2])
+        >>> ms = MessageSpecializer()
+        >>> paths = ms.iterSpecializeSymbol(s)
+        >>> m = TypeConverter.convert(next(paths).generatedContent, BitArray, Raw)
+        >>> m in ["netzob !", "netzob !!", "zoby !", "zoby !!"]
+        True
+        >>> sorted([TypeConverter.convert(p.generatedContent, BitArray, Raw) for p in ms.iterSpecializeSymbol(s)])
+        ['netzob !', 'netzob !!', 'zoby !', 'zoby !!']
+
+        """
         if symbol is None:
             raise Exception("Specified symbol is None")
 
         self._logger.debug("Specifies symbol '{0}'.".format(symbol.name))
 
-        # this variable host all the specialization path
-        # print 'spePaths: '
-        specializingPaths = [SpecializingPath(memory=self.memory)]
-        # print specializingPaths
-
         for field in symbol.fields:
-            self._logger.debug("Specializing field {0}".format(field.name))
+            if field.domain is None:
+                raise Exception("Cannot specialize field '{0}' since it defines no domain".format(field.name))
 
-            fieldDomain = field.domain
-            if fieldDomain is None:
-                raise Exception("Cannot specialize field '{0}' since it defines no domain".format(fieldDomain))
+        for specializingPath in self.__iterSpecializeFields(symbol.fields, SpecializingPath(memory=self.memory), 0):
+            specializingPath.generatedContent = self.__buildGeneratedContent(symbol, specializingPath)
 
-            fs = FieldSpecializer(field)
+            self._logger.debug("Specialized message: {0}".format(TypeConverter.convert(specializingPath.generatedContent, BitArray, ASCII)))
+            self.memory = specializingPath.memory
 
-            newSpecializingPaths = []
-            for specializingPath in specializingPaths:
-                newSpecializingPaths.extend(fs.specialize(specializingPath))
+            yield specializingPath
 
-            specializingPaths = newSpecializingPaths
+    def __iterSpecializeFields(self, fields, specializingPath, i_field):
+        """Yields the paths on which the fields starting at i_field have been specialized"""
 
-        if len(specializingPaths) > 1:
-            self._logger.info("TODO: multiple valid paths found when specializing this message.")
+        if i_field == len(fields):
+            yield specializingPath
+            return
 
-        if len(specializingPaths) == 0:
-            raise Exception("Cannot specialize this symbol.")
+        field = fields[i_field]
+        self._logger.debug("Specializing field {0}".format(field.name))
 
-        retainedPath = specializingPaths[0]
+        fs = FieldSpecializer(field)
+        for path in fs.iterSpecialize(specializingPath):
+            for resultPath in self.__iterSpecializeFields(fields, path, i_field + 1):
+                yield resultPath
+
+    def __buildGeneratedContent(self, symbol, specializingPath):
+        """Concatenates the data assigned to the fields of the symbol"""
 
         generatedContent = None
-        # let's configure the generated content
         for field in symbol.fields:
             # TODO: only support one level of children... must be improved
             if len(field.fields) > 0:
                 d = None
                 for child in field.fields:
                     if d is None:
-                        d = retainedPath.getDataAssignedToVariable(child.domain).copy()
+                        d = specializingPath.getDataAssignedToVariable(child.domain).copy()
                     else:
-                        d += retainedPath.getDataAssignedToVariable(child.domain).copy()
-                
+                        d += specializingPath.getDataAssignedToVariable(child.domain).copy()
+
             else:
-                d = retainedPath.getDataAssignedToVariable(field.domain)
+                d = specializingPath.getDataAssignedToVariable(field.domain)
 
             if generatedContent is None:
                 generatedContent = d.copy()
             else:
                 generatedContent += d.copy()
 
-        retainedPath.generatedContent = generatedContent
-
-        # print retainedPath._dataAssignedToField
-
-        self._logger.debug("Specialized message: {0}".format(TypeConverter.convert(retainedPath.generatedContent, BitArray, ASCII)))
-        self.memory = retainedPath.memory
-
-        return retainedPath
+        return generatedContent
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2014 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import random
+import multiprocessing
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Common.Models.Vocabulary.Domain.Variables.Memory import Memory
+from netzob.Common.Models.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Common.Models.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Common.Models.Vocabulary.Symbol import Symbol
+from netzob.Common.Models.Vocabulary.PrismaField import PrismaField
+from netzob.Common.Models.Vocabulary.Domain.Specializer.FieldSpecializer import FieldSpecializer
+from netzob.Common.Models.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
+
+
+def _specializeMessages((symbol, memory, nbMessages, seed)):
+    """Generates messages of a symbol in a worker process. The random generator
+    is always reseeded so forked workers do not produce the same messages."""
+    random.seed(seed)
+    return SpecializingPlan(symbol, memory=memory).specializeMany(nbMessages)
+
+
+@NetzobLogger
+class SpecializingPlan(object):
+    """Compiles the specialization of a symbol to generate many messages.
+
+    The fields which denote a constant value are specialized once when the plan
+    is compiled, only the other fields are specialized for each generated message.
+    If the other fields are all data which value is regenerated for each message,
+    the messages are directly built from the generated values without any specializing path.
+    If a memory is provided, it is shared by the successive messages as if they were
+    generated by successive calls to :meth:`Symbol.specialize` with this memory, otherwise
+    each message is generated with a new memory.
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.Models.Vocabulary.Domain.Specializer.SpecializingPlan import SpecializingPlan
+    >>> f1 = Field(ASCII(nbChars=5))
+    >>> s = Symbol([Field("hello "), Field(Size(f1)), f1])
+    >>> plan = SpecializingPlan(s)
+    >>> messages = plan.specializeMany(100, seed=10)
+    >>> print len(messages)
+    100
+    >>> print set([m[:7] for m in messages])
+    set(['hello \\x05'])
+    >>> messages == SpecializingPlan(s).specializeMany(100, seed=10)
+    True
+
+    The generation can be distributed among several processes
+
+    >>> messages = plan.specializeMany(2000, seed=10, nbThread=2)
+    >>> print len(messages), len(set(m[:7] for m in messages))
+    2000 1
+    >>> messages == SpecializingPlan(s).specializeMany(2000, seed=10, nbThread=2)
+    True
+
+    .. warning:: the plan is computed from the fields definitions, it must be
+                 computed again if these definitions are modified.
+    """
+
+    # Minimum number of messages generated by each process
+    MIN_MESSAGES_PER_PROCESS = 1000
+
+    @typeCheck(Symbol, Memory)
+    def __init__(self, symbol, memory=None):
+        if symbol is None:
+            raise TypeError("Symbol cannot be None")
+        self.symbol = symbol
+        self.memory = memory
+        self.__compile()
+
+    def __compile(self):
+        """Specializes the constant fields and prepares the specializers of the other ones"""
+
+        self.__staticFields = []
+        self.__fieldSpecializers = []
+        # list of (staticValue, dataType) describing how each field is directly generated
+        self.__directSteps = []
+        for field in self.symbol.fields:
+            if field.domain is None:
+                raise Exception("Cannot specialize field '{0}' since it defines no domain".format(field.name))
+
+            if self.__isStatic(field):
+                self.__staticFields.append((field, field.domain.currentValue))
+                self.__directSteps.append((field.domain.currentValue, None))
+            else:
+                self.__fieldSpecializers.append(FieldSpecializer(field))
+                if self.__directSteps is not None and self.__isRegenerated(field):
+                    self.__directSteps.append((None, field.domain.dataType))
+                else:
+                    self.__directSteps = None
+
+        self._logger.debug("Compiled plan of symbol '{0}': {1} static fields, {2} fields to specialize".format(self.symbol.name, len(self.__staticFields), len(self.__fieldSpecializers)))
+
+    def __isStatic(self, field):
+        """Returns True if the field always specializes to the same value"""
+        domain = field.domain
+        return (len(field.fields) == 0 and not isinstance(field, PrismaField)
+                and isinstance(domain, Data) and domain.svas == SVAS.CONSTANT
+                and domain.currentValue is not None
+                and (self.memory is None or not self.memory.hasValue(domain)))
+
+    def __isRegenerated(self, field):
+        """Returns True if the field is a data which value is generated from its type for each message"""
+        domain = field.domain
+        if len(field.fields) > 0 or isinstance(field, PrismaField) or not isinstance(domain, Data):
+            return False
+        # an ephemeral value is memorized but the memory of each message is discarded
+        return domain.svas == SVAS.VOLATILE or (domain.svas == SVAS.EPHEMERAL and self.memory is None)
+
+    def specialize(self):
+        """Specializes a message following the plan and returns its specializing path.
+        If the plan has a memory, it is updated with the one of this path."""
+
+        if self.memory is not None:
+            memory = self.memory
+        else:
+            memory = Memory()
+
+        specializingPath = SpecializingPath(memory=memory)
+        for field, data in self.__staticFields:
+            specializingPath.addResult(field.domain, data.copy())
+            specializingPath.addResultToField(field, data.copy())
+
+        for resultPath in self.__iterSpecializeFields(specializingPath, 0):
+            resultPath.generatedContent = self.__buildGeneratedContent(resultPath)
+            if self.memory is not None:
+                self.memory = resultPath.memory
+            return resultPath
+
+        raise Exception("Cannot specialize this symbol.")
+
+    def __iterSpecializeFields(self, specializingPath, i_field):
+        """Yields the paths on which the fields to specialize starting at i_field have been specialized"""
+
+        if i_field == len(self.__fieldSpecializers):
+            yield specializingPath
+            return
+
+        for path in self.__fieldSpecializers[i_field].iterSpecialize(specializingPath):
+            for resultPath in self.__iterSpecializeFields(path, i_field + 1):
+                yield resultPath
+
+    def __buildGeneratedContent(self, specializingPath):
+        """Concatenates the data assigned to the fields of the symbol"""
+
+        generatedContent = bitarray()
+        for field in self.symbol.fields:
+            generatedContent += specializingPath.getDataAssignedToVariable(field.domain)
+        return generatedContent
+
+    def specializeMany(self, nbMessages, seed=None, nbThread=1):
+        """Generates nbMessages messages following the plan.
+
+        :parameter nbMessages: the number of messages to generate
+        :type nbMessages: :class:`int`
+        :keyword seed: if set, the random generator is seeded with it so the generation can be reproduced
+        :type seed: :class:`int`
+        :keyword nbThread: the number of processes among which the generation is distributed, all the available cpu if None.
+                           When distributed, each process starts from a copy of the memory and the memory of the plan is not updated.
+        :type nbThread: :class:`int`
+        :return: the generated messages
+        :rtype: a :class:`list` of :class:`str`
+        """
+        if nbMessages < 0:
+            raise ValueError("The number of messages cannot be negative")
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+        nbThread = min(nbThread, max(1, nbMessages / self.MIN_MESSAGES_PER_PROCESS))
+
+        if nbThread > 1:
+            chunks = []
+            for i_chunk in xrange(nbThread):
+                nbChunkMessages = nbMessages / nbThread + (1 if i_chunk < nbMessages % nbThread else 0)
+                chunkSeed = None if seed is None else seed + i_chunk
+                chunks.append((self.symbol, self.memory, nbChunkMessages, chunkSeed))
+
+            pool = multiprocessing.Pool(nbThread)
+            try:
+                chunkMessages = pool.map(_specializeMessages, chunks)
+            finally:
+                pool.terminate()
+                pool.join()
+
+            messages = []
+            for chunk in chunkMessages:
+                messages.extend(chunk)
+            return messages
+
+        if seed is not None:
+            random.seed(seed)
+
+        messages = [None] * nbMessages
+        if self.__directSteps is not None:
+            for i_message in xrange(nbMessages):
+                generatedContent = bitarray()
+                for (staticValue, dataType) in self.__directSteps:
+                    if staticValue is not None:
+                        generatedContent += staticValue
+                    else:
+                        generatedContent += dataType.generate()
+                messages[i_message] = generatedContent.tobytes()
+        else:
+            for i_message in xrange(nbMessages):
+                messages[i_message] = self.specialize().generatedContent.tobytes()
+        return messages
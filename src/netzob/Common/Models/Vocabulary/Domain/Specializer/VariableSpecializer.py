@@ -58,14 +58,20 @@ class VariableSpecializer():
     def specialize(self, specializingPath):
         """Execute the specialize operation"""
 
+        variableSpecializingPaths = list(self.iterSpecialize(specializingPath))
+
+        self._logger.debug("Specializing variable '{0}' generated '{1}' valid paths".format(self.variable, len(variableSpecializingPaths)))
+
+        return variableSpecializingPaths
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath):
+        """Lazily yields the valid paths of the specialize operation"""
+
         if specializingPath is None:
             raise Exception("SpecializingPath path cannot be None")
         if self.variable is None:
             raise Exception("Variable cannot be None")
 
-        # we create the initial parser path
-        variableSpecializingPaths = self.variable.specialize(specializingPath)
-
-        self._logger.debug("Specializing variable '{0}' generated '{1}' valid paths".format(self.variable, len(variableSpecializingPaths)))
-
-        return variableSpecializingPaths
+        for variableSpecializingPath in self.variable.iterSpecialize(specializingPath):
+            yield variableSpecializingPath
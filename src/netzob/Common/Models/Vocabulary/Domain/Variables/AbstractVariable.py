@@ -96,6 +96,14 @@ class AbstractVariable(object):
     def buildRegex(self):
         return NetzobRegex()
 
+    def iterSpecialize(self, specializingPath):
+        """Lazily yields the specializing paths of the variable.
+
+        By default, it relies on the specialize method which computes all of them,
+        node variables override it to only compute a path when it is requested."""
+        for path in self.specialize(specializingPath):
+            yield path
+
     #+---------------------------------------------------------------------------+
     #| Special Functions                                                         |
     #+---------------------------------------------------------------------------+
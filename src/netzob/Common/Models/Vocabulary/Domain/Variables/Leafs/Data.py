@@ -373,14 +373,12 @@ class Data(AbstractVariableLeaf):
         #     minSize = len(content)
         #     maxSize = len(content)
 
-        for size in xrange(min(maxSize, len(content)), minSize -1, -1):
-            # size == 0 : deals with 'optional' data
-            if size == 0 or self.dataType.canParse(content[:size]):
-                # we create a new parsing path and returns it
-                newParsingPath = parsingPath.duplicate()
-
-                newParsingPath.addResult(self, content[:size].copy())
-                results.append(newParsingPath)
+        for size in self.__getParsableSizes(content, minSize, maxSize):
+            # we create a new parsing path and returns it
+            newParsingPath = parsingPath.duplicate()
+
+            newParsingPath.addResult(self, content[:size])
+            results.append(newParsingPath)
             
         return results
         
@@ -438,17 +436,24 @@ class Data(AbstractVariableLeaf):
 #            minSize = len(content)
 #            maxSize = len(content)
             
-        for size in xrange(min(maxSize, len(content)), minSize -1, -1):
-            # size == 0 : deals with 'optional' data
-            if size == 0 or self.dataType.canParse(content[:size]):
-                # we create a new parsing path and returns it
-                newParsingPath = parsingPath.duplicate()
-                newParsingPath.addResult(self, content[:size].copy())
-                newParsingPath.memory.memorize(self, content[:size].copy())
-                results.append(newParsingPath)
+        for size in self.__getParsableSizes(content, minSize, maxSize):
+            # we create a new parsing path and returns it
+            newParsingPath = parsingPath.duplicate()
+            newParsingPath.addResult(self, content[:size])
+            newParsingPath.memory.memorize(self, content[:size])
+            results.append(newParsingPath)
             
         return results
 
+    def __getParsableSizes(self, content, minSize, maxSize):
+        """Computes, in decreasing order, the sizes of the prefixes of content
+        that can be parsed by the type of the data."""
+        sizes = self.dataType.getParsableSizes(content, minSize, maxSize)
+        # size == 0 : deals with 'optional' data
+        if minSize == 0:
+            sizes.append(0)
+        return sizes
+
     @typeCheck(SpecializingPath)
     def use(self, variableSpecializerPath, acceptCallBack=True):
         """This method participates in the specialization proces.
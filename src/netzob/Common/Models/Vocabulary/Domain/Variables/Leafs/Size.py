@@ -268,11 +268,16 @@ class Size(AbstractRelationVariableLeaf):
                     tmpLen = len(fieldValue)
                     size += tmpLen
 
-            size = int(size * self.factor + self.offset)
-            b = TypeConverter.convert(size, Decimal, BitArray)
-            
-#            while len(b)<self.dataType.size[0]:
-#                b.insert(0, False)
+        return self._computeExpectedValueOfSize(size)
+
+    def _computeExpectedValueOfSize(self, size):
+        """Computes the value of the size field when its dependencies
+        have the specified size (in bits)."""
+        size = int(size * self.factor + self.offset)
+        b = TypeConverter.convert(size, Decimal, BitArray)
+
+#        while len(b)<self.dataType.size[0]:
+#            b.insert(0, False)
         return b
 
     @typeCheck(SpecializingPath)
@@ -163,7 +163,7 @@ class Value(AbstractRelationVariableLeaf):
             for size in xrange(min(maxSizeDep, len(content)), minSizeDep -1, -1):
                 # we create a new parsing path and returns it
                 newParsingPath = parsingPath.duplicate()
-                newParsingPath.addResult(self, content[:size].copy())        
+                newParsingPath.addResult(self, content[:size])
                 self._addCallBacksOnUndefinedFields(newParsingPath)
                 results.append(newParsingPath)           
         else:
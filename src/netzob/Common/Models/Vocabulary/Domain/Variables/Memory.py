@@ -54,6 +54,8 @@ class Memory(object):
         """Constructor of Memory"""
         self.memory = dict()
         self.__memoryAccessCB = None
+        # True if the content of the memory is shared with another memory (copy on write)
+        self.__sharedContent = False
 
     @typeCheck(AbstractVariable, bitarray)
     def memorize(self, variable, value):
@@ -67,6 +69,7 @@ class Memory(object):
         Data (ASCII=None ((0, None))): hello
         
         """
+        self.__unshareContent()
         self.memory[variable] = value
 
     @typeCheck(AbstractVariable)
@@ -115,9 +118,16 @@ class Memory(object):
         False
         """
         if variable in self.memory.keys():
+            self.__unshareContent()
             self.memory.pop(variable, None)
 
-    def duplicate(self):
+    def __unshareContent(self):
+        """Copies the content of the memory if it is shared with another memory."""
+        if self.__sharedContent:
+            self.__memory = dict(self.__memory)
+            self.__sharedContent = False
+
+    def duplicate(self, shareValues=False):
         """Duplicates in a new memory
 
         >>> from netzob.all import *
@@ -137,9 +147,30 @@ class Memory(object):
         >>> m2.getValue(d1)
         bitarray('01100100')
 
+        If the memorized values are never modified, they can be shared between both memories.
+        The content of the memory is then only copied when one of the memories is modified.
+
+        >>> m3 = m2.duplicate(shareValues=True)
+        >>> m3.getValue(d1) is m2.getValue(d1)
+        True
+        >>> m3.memorize(d1, TypeConverter.convert(50, Decimal, BitArray))
+        >>> m3.getValue(d1)
+        bitarray('00110010')
+        >>> m2.getValue(d1)
+        bitarray('01100100')
+
+        :keyword shareValues: if True, memorized values are shared with the new memory and must not be modified.
+        :type shareValues: :class:`bool`
         :return: a new memory containing the same entries than current one
         :rtype: :class:`netzob.Common.Models.Vocabulary.Domain.Variables.Memory`
         """
+        if shareValues:
+            duplicatedMemory = Memory()
+            duplicatedMemory.__memory = self.__memory
+            duplicatedMemory.__sharedContent = True
+            self.__sharedContent = True
+            return duplicatedMemory
+
         duplicatedMemory = Memory()
         for k in self.memory.keys():
             duplicatedMemory.memory[k] = self.memory[k].copy()
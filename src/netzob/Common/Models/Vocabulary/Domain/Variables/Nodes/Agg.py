@@ -119,11 +119,11 @@ class Agg(AbstractVariableNode):
     def parse(self, parsingPath, carnivorous=False):
         """Parse the content with the definition domain of the aggregate.
         """
-        dataToParse = parsingPath.getDataAssignedToVariable(self).copy()
+        dataToParse = parsingPath.getDataAssignedToVariable(self)
         self._logger.debug("Parse '{0}' as {1} with parser path '{2}'".format(dataToParse, self, parsingPath))
 
         # initialy, there is a unique path to test (the provided one)
-        parsingPath.assignDataToVariable(dataToParse.copy(), self.children[0])
+        parsingPath.assignDataToVariable(dataToParse, self.children[0])
         parsingPaths = [parsingPath]
 
         # we parse all the children with the parserPaths produced by previous children
@@ -138,7 +138,7 @@ class Agg(AbstractVariableNode):
 
             for parsingPath in parsingPaths:
                 self._logger.debug("Parse {0} with {1}".format(current_child.id, parsingPath))
-                value_before_parsing = parsingPath.getDataAssignedToVariable(current_child).copy()
+                value_before_parsing = parsingPath.getDataAssignedToVariable(current_child)
                 childParsingPaths = current_child.parse(parsingPath, carnivorous=carnivorous)
 
                 if len(childParsingPaths) == 0:
@@ -148,8 +148,8 @@ class Agg(AbstractVariableNode):
 
                     for childParsingPath in childParsingPaths:
                         if childParsingPath.ok():
-                            value_after_parsing = childParsingPath.getDataAssignedToVariable(current_child).copy()
-                            remainingValue = value_before_parsing[len(value_after_parsing):].copy()
+                            value_after_parsing = childParsingPath.getDataAssignedToVariable(current_child)
+                            remainingValue = value_before_parsing[len(value_after_parsing):]
                             if next_child is not None:
                                 childParsingPath.assignDataToVariable(remainingValue, next_child)
 
@@ -170,7 +170,7 @@ class Agg(AbstractVariableNode):
                 if parsedData is None:
                     parsedData = parsingPath.getDataAssignedToVariable(child).copy()
                 else:
-                    parsedData += parsingPath.getDataAssignedToVariable(child).copy()
+                    parsedData += parsingPath.getDataAssignedToVariable(child)
 
             parsingPath.addResult(self, parsedData)
         return parsingPaths
@@ -178,35 +178,14 @@ class Agg(AbstractVariableNode):
     @typeCheck(SpecializingPath)
     def specialize(self, originalSpecializingPath):
         """Specializes an Agg"""
+        return list(self.iterSpecialize(originalSpecializingPath))
 
-        # initialy, there is a unique path to specialize (the provided one)
-        specializingPaths = [originalSpecializingPath]
-
-        # we parse all the children with the specializerPaths produced by previous children
-        for child in self.children:
-            newSpecializingPaths = []
-
-            self._logger.debug("Specializing AGG child with {0} paths".format(len(specializingPaths)))
-
-            for specializingPath in specializingPaths:
-                self._logger.debug("Spcialize {0} with {1}".format(child, specializingPath))
-
-                childSpecializingPaths = child.specialize(specializingPath)
-
-                if len(childSpecializingPaths) > 0:
-                    # at least one child path managed to specialize, we save the valid paths it produced
-                    for childSpecializingPath in childSpecializingPaths:
-                        newSpecializingPaths.append(childSpecializingPath)
-
-            specializingPaths = newSpecializingPaths
-
-        self._logger.debug("Specializing AGG child has produced {0} paths".format(len(specializingPaths)))
-
-        if len(specializingPaths) == 0:
-            self._logger.debug("Children {0} didn't apply to any of the specializer path we have, we stop Agg specializer".format(child))
-            return []  # return no valid paths
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, originalSpecializingPath):
+        """Lazily specializes an Agg: children are specialized depth-first so the
+        first complete path is produced without expanding the alternatives of every child."""
 
-        for specializingPath in specializingPaths:
+        for specializingPath in self.__iterSpecializeChildren(originalSpecializingPath, 0):
             value = None
             for child in self.children:
                 if value is None:
@@ -215,6 +194,18 @@ class Agg(AbstractVariableNode):
                     value += specializingPath.getDataAssignedToVariable(child)
 
             specializingPath.addResult(self, value)
+            yield specializingPath
+
+    def __iterSpecializeChildren(self, specializingPath, i_child):
+        """Yields the paths on which the children starting at i_child have been specialized"""
+
+        if i_child == len(self.children):
+            yield specializingPath
+            return
+
+        child = self.children[i_child]
+        self._logger.debug("Specialize {0} with {1}".format(child, specializingPath))
 
-        # ok we managed to parse all the children, and it produced some valid specializer paths. We return them
-        return specializingPaths
+        for childSpecializingPath in child.iterSpecialize(specializingPath):
+            for path in self.__iterSpecializeChildren(childSpecializingPath, i_child + 1):
+                yield path
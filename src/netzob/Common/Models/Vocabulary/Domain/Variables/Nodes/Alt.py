@@ -117,13 +117,13 @@ class Alt(AbstractVariableNode):
         results = []
         
         parserPaths = [parsingPath]
-        parsingPath.assignDataToVariable(dataToParse.copy(), self.children[0])
+        parsingPath.assignDataToVariable(dataToParse, self.children[0])
         
         # create a path for each child
         if len(self.children)>1:
             for child in self.children[1:]:
                 newParsingPath = parsingPath.duplicate()
-                newParsingPath.assignDataToVariable(dataToParse.copy(), child)
+                newParsingPath.assignDataToVariable(dataToParse, child)
                 parserPaths.append(newParsingPath)
 
         # parse each child according to its definition
@@ -148,36 +148,35 @@ class Alt(AbstractVariableNode):
 
         return results
 
-    @typeCheck(SpecializingPath)        
+    @typeCheck(SpecializingPath)
     def specialize(self, specializingPath):
         """Specializes an Alt"""
+        return list(self.iterSpecialize(specializingPath))
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath):
+        """Lazily specializes an Alt: children are tried in a random order
+        and a child is only specialized once the paths produced by the previous ones
+        have been consumed."""
 
         if specializingPath is None:
             raise Exception("SpecializingPath cannot be None")
 
         if len(self.children) == 0:
             raise Exception("Cannot specialize ALT if its has no children")
-        
-        specializingPaths = []
-        
-        # parse each child according to its definition
-        for i_child, child in enumerate(self.children):
+
+        children = list(enumerate(self.children))
+        random.shuffle(children)
+
+        for i_child, child in children:
             newSpecializingPath = specializingPath.duplicate()
             self._logger.debug("ALT Specialize of {0}/{1} with {2}".format(i_child+1, len(self.children), newSpecializingPath))
 
-            childSpecializingPaths = child.specialize(newSpecializingPath)
-            if len(childSpecializingPaths) == 0:
+            succeed = False
+            for childSpecializingPath in child.iterSpecialize(newSpecializingPath):
+                succeed = True
+                childSpecializingPath.addResult(self, childSpecializingPath.getDataAssignedToVariable(child))
+                yield childSpecializingPath
+
+            if not succeed:
                 self._logger.debug("Path {0} on child {1} didn't succeed.".format(newSpecializingPath, child))
-            else:
-                self._logger.debug("Path {0} on child {1} succeed.".format(newSpecializingPath, child))
-                for childSpecializingPath in childSpecializingPaths:
-                    childSpecializingPath.addResult(self, childSpecializingPath.getDataAssignedToVariable(child))
-                
-                specializingPaths.extend(childSpecializingPaths)
-
-        if len(specializingPaths) == 0:
-            self._logger.debug("No children of {0} successfuly specialized".format(self))
-
-        # lets shuffle this ( :) ) >>> by default we only consider the first valid parsing path.
-        random.shuffle(specializingPaths)
-        return specializingPaths
@@ -119,7 +119,7 @@ class Repeat(AbstractVariableNode):
             raise Exception("Parsing path cannot be None")
 
         # retrieve the data to parse
-        dataToParse = parsingPath.getDataAssignedToVariable(self).copy()
+        dataToParse = parsingPath.getDataAssignedToVariable(self)
 
         # remove any data assigned to this variable
         parsingPath.removeAssignedDataToVariable(self)
@@ -131,7 +131,7 @@ class Repeat(AbstractVariableNode):
         for i_repeat in xrange(self.nbRepeat[0], self.nbRepeat[1]):
 
             newParsingPaths = [parsingPath.duplicate()]
-            newParsingPaths[0].assignDataToVariable(dataToParse.copy(), self.children[0])
+            newParsingPaths[0].assignDataToVariable(dataToParse, self.children[0])
 
             for i in xrange(i_repeat):
                 tmp_result = []
@@ -145,16 +145,16 @@ class Repeat(AbstractVariableNode):
                             newResult = childParsingPath.getDataAssignedToVariable(self.children[0])
 
                         childParsingPath.addResult(self, newResult)
-                        childParsingPath.assignDataToVariable(dataToParse.copy()[len(newResult):], self.children[0])
+                        childParsingPath.assignDataToVariable(dataToParse[len(newResult):], self.children[0])
 
                         if self.delimitor is not None:
                             if i < i_repeat - 1:
                                 # check the delimitor is available
-                                toParse = childParsingPath.getDataAssignedToVariable(self.children[0]).copy()
+                                toParse = childParsingPath.getDataAssignedToVariable(self.children[0])
                                 if toParse[:len(self.delimitor)] == self.delimitor:
                                     newResult = childParsingPath.getDataAssignedToVariable(self).copy() + self.delimitor
                                     childParsingPath.addResult(self, newResult)
-                                    childParsingPath.assignDataToVariable(dataToParse.copy()[len(newResult):], self.children[0])
+                                    childParsingPath.assignDataToVariable(dataToParse[len(newResult):], self.children[0])
                                     tmp_result.append(childParsingPath)
                             else:
                                 tmp_result.append(childParsingPath)
@@ -171,37 +171,42 @@ class Repeat(AbstractVariableNode):
     @typeCheck(SpecializingPath)
     def specialize(self, originalSpecializingPath):
         """Specializes a Repeat"""
+        return list(self.iterSpecialize(originalSpecializingPath))
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, originalSpecializingPath):
+        """Lazily specializes a Repeat: the number of repetitions is tried in a random order
+        and the paths of a number of repetitions are only computed when they are requested."""
 
         if originalSpecializingPath is None:
             raise Exception("Specializing path cannot be None")
 
-        # initialy, there is a unique path to specialize (the provided one)
-        specializingPaths = []
+        nbRepeats = range(self.nbRepeat[0], self.nbRepeat[1])
+        random.shuffle(nbRepeats)
 
-        for i_repeat in xrange(self.nbRepeat[0], self.nbRepeat[1]):
-            newSpecializingPaths = [originalSpecializingPath.duplicate()]
+        for i_repeat in nbRepeats:
+            for path in self.__iterSpecializeRepetitions(originalSpecializingPath.duplicate(), i_repeat):
+                yield path
 
-            for i in xrange(i_repeat):
-                childSpecializingPaths = []
-                for newSpecializingPath in newSpecializingPaths:
-                    for path in self.children[0].specialize(newSpecializingPath):
-                        if path.isDataAvailableForVariable(self):
-                            newResult = path.getDataAssignedToVariable(self).copy()
-                            if self.delimitor is not None:
-                                newResult += self.delimitor
-                            newResult += path.getDataAssignedToVariable(self.children[0])
-                        else:
-                            newResult = path.getDataAssignedToVariable(self.children[0])
-                        path.addResult(self, newResult)
-                        childSpecializingPaths.append(path)
+    def __iterSpecializeRepetitions(self, specializingPath, nbRepetitions):
+        """Yields the paths on which the child has been specialized nbRepetitions times"""
 
-                newSpecializingPaths = childSpecializingPaths
-            specializingPaths.extend(newSpecializingPaths)
+        if nbRepetitions == 0:
+            yield specializingPath
+            return
 
-        # lets shuffle this ( :) ) >>> by default we only consider the first valid parsing path.
-        random.shuffle(specializingPaths)
+        for path in self.children[0].iterSpecialize(specializingPath):
+            if path.isDataAvailableForVariable(self):
+                newResult = path.getDataAssignedToVariable(self).copy()
+                if self.delimitor is not None:
+                    newResult += self.delimitor
+                newResult += path.getDataAssignedToVariable(self.children[0])
+            else:
+                newResult = path.getDataAssignedToVariable(self.children[0])
+            path.addResult(self, newResult)
 
-        return specializingPaths
+            for repeatedPath in self.__iterSpecializeRepetitions(path, nbRepetitions - 1):
+                yield repeatedPath
 
     @property
     def nbRepeat(self):
@@ -83,16 +83,12 @@ class PrismaField(Field):
 
         from netzob.Common.Models.Vocabulary.Domain.Specializer.FieldSpecializer import FieldSpecializer
         fs = FieldSpecializer(self)
-        specializingPaths = fs.specialize()
+        specializingPath = next(fs.iterSpecialize(), None)
 
-        if len(specializingPaths) < 1:
+        if specializingPath is None:
             raise Exception("Cannot specialize this field")
 
-        specializingPath = specializingPaths[0]
-
         self._logger.debug("field specializing done: {0}".format(specializingPath))
-        if specializingPath is None:
-            raise Exception("The specialization of the field {0} returned no result.".format(self.name))
 
         return TypeConverter.convert(specializingPath.getDataAssignedToVariable(self.domain), BitArray, Raw)
 
@@ -29,6 +29,9 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 import uuid
+import hashlib
+import multiprocessing
+from collections import OrderedDict
 
 #+---------------------------------------------------------------------------+
 #| Related third party imports
@@ -39,12 +42,42 @@ import uuid
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Common.Models.Vocabulary.Messages.AbstractMessage import AbstractMessage
+from netzob.Common.Models.Vocabulary.Messages.L4NetworkMessage import L4NetworkMessage
 from netzob.Common.Utils.SortedTypedList import SortedTypedList
 from netzob.Common.Utils.TypedList import TypedList
 from netzob.Common.Models.Vocabulary.ApplicativeData import ApplicativeData
 from netzob.Common.Models.Vocabulary.AbstractField import AbstractField
 
 
+# symbols (and their index) in which the processes of the pool abstract payloads
+_workerSymbols = None
+_workerSymbolIndex = None
+
+
+def _initAbstractionWorker(symbolList):
+    """Initializes a process of the pool with the symbols in which payloads are abstracted."""
+    global _workerSymbols, _workerSymbolIndex
+    from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+    _workerSymbols = symbolList
+    _workerSymbolIndex = SymbolIndex(symbolList)
+
+
+def _abstractPayloads(payloads):
+    """Abstracts payloads in the symbols of the current process of the pool."""
+    return _abstractPayloadsInSymbols(payloads, _workerSymbols, _workerSymbolIndex)
+
+
+def _abstractPayloadsInSymbols(payloads, symbolList, symbolIndex):
+    """Computes, for each payload, the position of the symbol that abstracts it
+    or None if no symbol abstracts it."""
+    positions = dict([(id(symbol), i_symbol) for (i_symbol, symbol) in enumerate(symbolList)])
+    results = []
+    for payload in payloads:
+        symbol = AbstractField.abstract(payload, symbolList, symbolIndex=symbolIndex)
+        results.append(positions.get(id(symbol)))
+    return results
+
+
 @NetzobLogger
 class Session(object):
     """A session includes messages exchanged in the same session. Messages
@@ -202,16 +235,17 @@ class Session(object):
         """
 
         endpointsList = []
+        knownEndpoints = set()
         for message in self.messages.values():
             src = message.source
             dst = message.destination
-            endpoints1 = (src, dst)
-            endpoints2 = (dst, src)
-            if (not endpoints1 in endpointsList) and (not endpoints2 in endpointsList):
-                endpointsList.append(endpoints1)
+            if (src, dst) not in knownEndpoints:
+                knownEndpoints.add((src, dst))
+                knownEndpoints.add((dst, src))
+                endpointsList.append((src, dst))
         return endpointsList
 
-    def getTrueSessions(self):
+    def getTrueSessions(self, l4Flows=False):
         """Retrieve the true sessions embedded in the current
         session. A session is here characterized by a uniq endpoints
         couple.
@@ -231,26 +265,87 @@ class Session(object):
         Session: 'A' - 'B'
         Session: 'A' - 'C'
 
+        :keyword l4Flows: if True, messages of the fourth layer are also characterized by their protocol
+        :type l4Flows: :class:`bool`
         :return: a list containing true sessions embedded in the current session.
         :rtype: a :class:`list`
 
+        """
+        return list(self.iterTrueSessions(l4Flows=l4Flows))
+
+    def iterTrueSessions(self, l4Flows=False):
+        """Iterates over the true sessions embedded in the current session,
+        in the order of the first message of each endpoints couple.
+
+        Messages are split among the endpoints couples in a single pass, the
+        true sessions are only created when they are requested. A message an endpoint
+        sends to itself also pertains to each session of this endpoint.
+
+        If l4Flows is set, messages of the fourth layer are characterized by
+        their 5-tuple (protocol, source address and port, destination address and port).
+
+        >>> from netzob.all import *
+        >>> msg1 = L4NetworkMessage("SYN", date=1, l3SourceAddress="10.0.0.1", l3DestinationAddress="10.0.0.2", l4Protocol="TCP", l4SourceAddress=3000, l4DestinationAddress=80)
+        >>> msg2 = L4NetworkMessage("Q1", date=2, l3SourceAddress="10.0.0.1", l3DestinationAddress="10.0.0.2", l4Protocol="UDP", l4SourceAddress=3000, l4DestinationAddress=80)
+        >>> msg3 = L4NetworkMessage("SYN/ACK", date=3, l3SourceAddress="10.0.0.2", l3DestinationAddress="10.0.0.1", l4Protocol="TCP", l4SourceAddress=80, l4DestinationAddress=3000)
+        >>> msg4 = L4NetworkMessage("R1", date=4, l3SourceAddress="10.0.0.2", l3DestinationAddress="10.0.0.1", l4Protocol="UDP", l4SourceAddress=80, l4DestinationAddress=3000)
+        >>> session = Session([msg1, msg2, msg3, msg4])
+        >>> for trueSession in session.iterTrueSessions():
+        ...    print trueSession.name, [m.data for m in trueSession.messages.values()]
+        Session: '10.0.0.1:3000' - '10.0.0.2:80' ['SYN', 'Q1', 'SYN/ACK', 'R1']
+        >>> for trueSession in session.iterTrueSessions(l4Flows=True):
+        ...    print trueSession.name, [m.data for m in trueSession.messages.values()]
+        Session: '10.0.0.1:3000' - '10.0.0.2:80' ['SYN', 'SYN/ACK']
+        Session: '10.0.0.1:3000' - '10.0.0.2:80' ['Q1', 'R1']
+
+        :keyword l4Flows: if True, messages of the fourth layer are also characterized by their protocol
+        :type l4Flows: :class:`bool`
+        :return: an iterator over the true sessions embedded in the current session.
+        :rtype: an iterator of :class:`netzob.Common.Models.Vocabulary.Session.Session`
         """
 
-        trueSessions = []
-        for endpoints in self.getEndpointsList():
-            trueSessionMessages = []
+        # the messages (and their position) of each endpoints couple
+        flows = OrderedDict()
+        couples = dict()
+        # the couples of distinct endpoints and the messages sent to itself by each endpoint
+        endpointCouples = dict()
+        endpointMessages = dict()
+        for (i_message, message) in enumerate(self.messages.values()):
+            protocol = None
+            if l4Flows and isinstance(message, L4NetworkMessage):
+                protocol = message.l4Protocol
+            src = (protocol, message.source)
+            dst = (protocol, message.destination)
+
+            couple = couples.get((src, dst))
+            if couple is None:
+                couple = (src, dst)
+                couples[(src, dst)] = couple
+                couples[(dst, src)] = couple
+                flows[couple] = []
+                if src != dst:
+                    endpointCouples.setdefault(src, []).append(couple)
+                    endpointCouples.setdefault(dst, []).append(couple)
+            flows[couple].append((i_message, message))
+            if src == dst:
+                endpointMessages.setdefault(src, []).append((i_message, message))
+
+        for (endpoint, messages) in endpointMessages.iteritems():
+            for couple in endpointCouples.get(endpoint, []):
+                flows[couple] = sorted(flows[couple] + messages)
+
+        for trueSessionMessages in flows.itervalues():
+            trueSessionMessages = [message for (i_message, message) in trueSessionMessages]
             src = None
             dst = None
-            for message in self.messages.values():
-                if message.source in endpoints and message.destination in endpoints:
-                    trueSessionMessages.append(message)
-                    if src is None:
-                        src = message.source
-                    if dst is None:
-                        dst = message.destination
-            trueSession = Session(messages=trueSessionMessages, applicativeData=self.applicativeData, name="Session: '" + str(src) + "' - '" + str(dst) + "'")
-            trueSessions.append(trueSession)
-        return trueSessions
+            for message in trueSessionMessages:
+                if src is None:
+                    src = message.source
+                if dst is None:
+                    dst = message.destination
+                if src is not None and dst is not None:
+                    break
+            yield Session(messages=trueSessionMessages, applicativeData=self.applicativeData, name="Session: '" + str(src) + "' - '" + str(dst) + "'")
 
     def isTrueSession(self):
         """Tell if the current session is true. A session is said to
@@ -270,13 +365,11 @@ class Session(object):
 
         """
 
-        if len(self.getTrueSessions()) == 1:
-            return True
-        else:
-            return False
+        # a true session is computed for each couple of endpoints
+        return len(self.getEndpointsList()) == 1
 
     @typeCheck(list)
-    def abstract(self, symbolList):
+    def abstract(self, symbolList, nbThread=1):
         """This method abstract each message of the current session
         into symbols according to a list of symbols given as
         parameter.
@@ -299,16 +392,108 @@ class Session(object):
         B - A : Symbol_SYNACK
         A - B : Symbol_ACK
 
+        :keyword nbThread: the number of processes among which the messages are abstracted (1 by default), all the available cpu if None
+        :type nbThread: :class:`int`
         :return: a list of tuples containing the following elements : (source, destination, symbol).
         :rtype: a :class:`list`
 
         """
+        return Session.abstractSessions([self], symbolList, nbThread=nbThread)[0]
 
-        abstractSession = []
-        if not self.isTrueSession():
-            self._logger.warn("The current session cannot be abstracted as it not a true session (i.e. it may contain inner true sessions).")
-            return abstractSession
-        for message in self.messages.values():
-            symbol = AbstractField.abstract(message.data, symbolList)
-            abstractSession.append((message.source, message.destination, symbol))
-        return abstractSession
+    # Minimum number of distinct payloads abstracted by each process of the pool
+    MIN_PAYLOADS_PER_PROCESS = 50
+
+    @staticmethod
+    def abstractSessions(sessions, symbolList, nbThread=1):
+        """This method abstracts the messages of each of the specified
+        sessions into symbols according to a list of symbols given as parameter.
+
+        Identical payloads are abstracted in the same symbol, so each distinct
+        payload (identified by its digest) is only abstracted once. The distinct
+        payloads can be shared among a pool of processes.
+
+        >>> from netzob.all import *
+        >>> symbolSYN = Symbol([Field(ASCII("SYN"))], name="Symbol_SYN")
+        >>> symbolACK = Symbol([Field(ASCII("ACK")), Field(ASCII(nbChars=(1, 3)))], name="Symbol_ACK")
+        >>> symbolList = [symbolSYN, symbolACK]
+        >>> sessions = []
+        >>> for i in range(200):
+        ...    client = "C{0}".format(i)
+        ...    messages = [RawMessage("SYN", source=client, destination="S", date=i),
+        ...                RawMessage("ACK{0}".format(i), source="S", destination=client, date=i + 0.5),
+        ...                RawMessage("RST", source=client, destination="S", date=i + 0.7)]
+        ...    sessions.append(Session(messages))
+        >>> abstractSessions = Session.abstractSessions(sessions, symbolList, nbThread=2)
+        >>> for src, dst, sym in abstractSessions[42]:
+        ...    print str(src) + " - " + str(dst) + " : " + str(sym.name)
+        C42 - S : Symbol_SYN
+        S - C42 : Symbol_ACK
+        C42 - S : Unknown Symbol
+        >>> names = lambda abstractSessions: [[(src, dst, sym.name) for src, dst, sym in s] for s in abstractSessions]
+        >>> names(abstractSessions) == names([session.abstract(symbolList) for session in sessions])
+        True
+
+        :parameter sessions: the sessions to abstract
+        :type sessions: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.Session.Session`
+        :parameter symbolList: the symbols in which the messages are abstracted
+        :type symbolList: a :class:`list` of :class:`netzob.Common.Models.Vocabulary.Symbol.Symbol`
+        :keyword nbThread: the number of processes among which the payloads are abstracted (1 by default), all the available cpu if None
+        :type nbThread: :class:`int`
+        :return: for each session, a list of tuples (source, destination, symbol), the list is empty if the session is not a true session.
+        :rtype: a :class:`list`
+        """
+        if sessions is None:
+            raise TypeError("Sessions cannot be None")
+        if symbolList is None:
+            raise TypeError("Symbol list cannot be None")
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        # identify the distinct payloads of the messages
+        payloadIndexes = dict()
+        payloads = []
+        sessionsMessages = []
+        for session in sessions:
+            sessionMessages = []
+            if not session.isTrueSession():
+                session._logger.warn("The current session cannot be abstracted as it not a true session (i.e. it may contain inner true sessions).")
+            else:
+                for message in session.messages.values():
+                    digest = hashlib.sha1(message.data).digest()
+                    if digest not in payloadIndexes:
+                        payloadIndexes[digest] = len(payloads)
+                        payloads.append(message.data)
+                    sessionMessages.append((message, payloadIndexes[digest]))
+            sessionsMessages.append(sessionMessages)
+
+        # abstract the distinct payloads
+        nbThread = min(nbThread, len(payloads) / Session.MIN_PAYLOADS_PER_PROCESS)
+        if nbThread > 1:
+            chunkSize = (len(payloads) + nbThread * 4 - 1) / (nbThread * 4)
+            chunks = [payloads[i:i + chunkSize] for i in xrange(0, len(payloads), chunkSize)]
+            pool = multiprocessing.Pool(nbThread, initializer=_initAbstractionWorker, initargs=(symbolList,))
+            try:
+                positions = []
+                for chunkPositions in pool.map(_abstractPayloads, chunks):
+                    positions.extend(chunkPositions)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+            positions = _abstractPayloadsInSymbols(payloads, symbolList, SymbolIndex(symbolList))
+
+        from netzob.Common.Models.Vocabulary.UnknownSymbol import UnknownSymbol
+        from netzob.Common.Models.Vocabulary.Messages.RawMessage import RawMessage
+        abstractSessions = []
+        for sessionMessages in sessionsMessages:
+            abstractSession = []
+            for (message, payloadIndex) in sessionMessages:
+                position = positions[payloadIndex]
+                if position is None:
+                    symbol = UnknownSymbol(RawMessage(message.data))
+                else:
+                    symbol = symbolList[position]
+                abstractSession.append((message.source, message.destination, symbol))
+            abstractSessions.append(abstractSession)
+        return abstractSessions
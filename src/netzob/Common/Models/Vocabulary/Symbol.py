@@ -126,6 +126,40 @@ class Symbol(AbstractField):
         if spePath is not None:
             return TypeConverter.convert(spePath.generatedContent, BitArray, Raw)
 
+    @typeCheck(int, Memory, int)
+    def specializeMany(self, nbMessages, memory=None, seed=None, nbThread=1):
+        """Generates nbMessages messages following the fields definitions attached to the symbol.
+
+        Contrary to successive calls to :meth:`specialize`, the generation plan of the symbol is
+        compiled once: the fields with a constant value are specialized once and only the
+        other ones are specialized for each message.
+
+        >>> from netzob.all import *
+        >>> f1 = Field(domain=ASCII(nbChars=5))
+        >>> f0 = Field(domain=Size(f1))
+        >>> s = Symbol(fields=[Field("hello"), f0, f1])
+        >>> messages = s.specializeMany(1000, seed=42)
+        >>> print len(messages), len(set(messages)) > 1
+        1000 True
+        >>> print set([m[:6] for m in messages])
+        set(['hello\\x05'])
+        >>> messages == s.specializeMany(1000, seed=42)
+        True
+
+        :parameter nbMessages: the number of messages to generate
+        :type nbMessages: :class:`int`
+        :keyword memory: if set, the memory shared by the successive messages, otherwise each message is generated with a new memory
+        :type memory: :class:`netzob.Common.Models.Vocabulary.Domain.Variables.Memory.Memory`
+        :keyword seed: if set, the random generator is seeded with it so the generation can be reproduced
+        :type seed: :class:`int`
+        :keyword nbThread: the number of processes among which the generation is distributed, all the available cpu if None
+        :type nbThread: :class:`int`
+        :return: the generated messages represented as Raw
+        :rtype: a :class:`list` of :class:`str`
+        """
+        from netzob.Common.Models.Vocabulary.Domain.Specializer.SpecializingPlan import SpecializingPlan
+        return SpecializingPlan(self, memory=memory).specializeMany(nbMessages, seed=seed, nbThread=nbThread)
+
     def clearMessages(self):
         """Delete all the messages attached to the current symbol"""
         while(len(self.__messages) > 0):
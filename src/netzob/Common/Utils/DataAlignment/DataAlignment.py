@@ -107,9 +107,19 @@ class DataAlignment(threading.Thread):
     'hello' | 'GET' | 'tototo'   | 'PA' | ''         
     'hello' | 'PUT' | 'totototo' | 'PA' | 'dqs4qsd33'
 
+    The strategy used to parse the data can be specified, its counters are accumulated over the data
+
+    >>> strategy = DepthFirstParsingStrategy()
+    >>> print DataAlignment.align(messages, symbol, parsingStrategy=strategy)
+    'hello' | 'PUT' | 'toto'     | 'PA' | '343'      
+    'hello' | 'GET' | 'tototo'   | 'PA' | ''         
+    'hello' | 'PUT' | 'totototo' | 'PA' | 'dqs4qsd33'
+    >>> print strategy.nbExploredPaths, strategy.nbPrunedPaths
+    26 16
+
     """
 
-    def __init__(self, data, field, depth=None, encoded=True, styled=False):
+    def __init__(self, data, field, depth=None, encoded=True, styled=False, parsingPlan=None, parsingStrategy=None):
         """Constructor.
 
         :param data: the list of data that will be aligned, data must be encoded in HexaString
@@ -122,6 +132,10 @@ class DataAlignment(threading.Thread):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword parsingPlan: the parsing plan of the leaf fields of the root of the field, computed if not specified
+        :type parsingPlan: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan.ParsingPlan`
+        :keyword parsingStrategy: the strategy used to parse the data, the default strategy of the parser if None
+        :type parsingStrategy: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy.ParsingStrategy`
 
         """
         self.data = data
@@ -129,6 +143,8 @@ class DataAlignment(threading.Thread):
         self.depth = depth
         self.encoded = encoded
         self.styled = styled
+        self.parsingPlan = parsingPlan
+        self.parsingStrategy = parsingStrategy
 
     def execute(self):
         """Execute the alignment of data following specified field
@@ -148,12 +164,19 @@ class DataAlignment(threading.Thread):
         #     targetedFieldLeafFields = self.field._getLeafFields(depth=self.depth)
         # else:
         targetedFieldLeafFields = rootLeafFields
+        fieldLeafFields = self.field._getLeafFields(depth=self.depth)
+
+        # the parsing plan is computed once for all the data (unless a plan of these fields is provided)
+        from netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser import MessageParser
+        from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+        parsingPlan = self.parsingPlan
+        if parsingPlan is None or parsingPlan.fields != targetedFieldLeafFields:
+            parsingPlan = ParsingPlan(targetedFieldLeafFields)
 
         for d in self.data:
-            from netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser import MessageParser
-            mp = MessageParser()
+            mp = MessageParser(parsingStrategy=self.parsingStrategy)
             # alignedMsg = mp.parseRaw(TypeConverter.convert(d, HexaString, Raw), targetedFieldLeafFields)
-            alignedMsg = mp.parseRaw(d, targetedFieldLeafFields)            
+            alignedMsg = mp.parseRaw(d, targetedFieldLeafFields, parsingPlan=parsingPlan)
 
             alignedEncodedMsg = []
             for ifield, currentField in enumerate(targetedFieldLeafFields):
@@ -167,7 +190,7 @@ class DataAlignment(threading.Thread):
                 else:
                     fieldValue = TypeConverter.convert(fieldValue, BitArray, Raw)
 
-                if currentField in self.field._getLeafFields(depth=self.depth):
+                if currentField in fieldLeafFields:
                     alignedEncodedMsg.append(fieldValue)
 
             result.append(alignedEncodedMsg)
@@ -230,7 +253,7 @@ class DataAlignment(threading.Thread):
     # Static method
     @staticmethod
     @typeCheck(str, AbstractField, int)
-    def align(data, field, depth=None, encoded=True):
+    def align(data, field, depth=None, encoded=True, parsingPlan=None, parsingStrategy=None):
         """Execute an alignment of specified data with provided field.
         Data must be provided as a list of hexastring.
 
@@ -242,11 +265,15 @@ class DataAlignment(threading.Thread):
         :type depth: :class:`int`.
         :keyword encoded: set to True if you want the returned result to follow the encoding functions
         :type encoded: :class:`boolean`
+        :keyword parsingPlan: the parsing plan of the leaf fields of the root of the field, computed if not specified
+        :type parsingPlan: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan.ParsingPlan`
+        :keyword parsingStrategy: the strategy used to parse the data, the default strategy of the parser if None
+        :type parsingStrategy: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy.ParsingStrategy`
         :return: the aligned data
         :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
         """
         
-        dAlignment = DataAlignment(data, field, depth, encoded=encoded)
+        dAlignment = DataAlignment(data, field, depth, encoded=encoded, parsingPlan=parsingPlan, parsingStrategy=parsingStrategy)
         return dAlignment.execute()
 
     # Properties
@@ -322,3 +349,30 @@ class DataAlignment(threading.Thread):
             raise ValueError("Styled cannot be None")
 
         self.__styled = styled
+
+    @property
+    def parsingPlan(self):
+        """The parsing plan of the leaf fields of the root of the field, it is
+        computed when the data are aligned if None or if it was computed for other fields.
+
+        :type: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan.ParsingPlan`
+        """
+        return self.__parsingPlan
+
+    @parsingPlan.setter
+    def parsingPlan(self, parsingPlan):
+        self.__parsingPlan = parsingPlan
+
+    @property
+    def parsingStrategy(self):
+        """The strategy used to explore the parsing paths of the data, the
+        default strategy of the :class:`netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser.MessageParser` if None.
+        The same strategy is used for all the data, so its counters are accumulated over them.
+
+        :type: :class:`netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy.ParsingStrategy`
+        """
+        return self.__parsingStrategy
+
+    @parsingStrategy.setter
+    def parsingStrategy(self, parsingStrategy):
+        self.__parsingStrategy = parsingStrategy
@@ -29,6 +29,8 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 import errno
+import collections
+import multiprocessing
 from gettext import gettext as _
 
 #+---------------------------------------------------------------------------+
@@ -53,6 +55,23 @@ from netzob.Common.Models.Vocabulary.Messages.L3NetworkMessage import L3NetworkM
 from netzob.Common.Models.Vocabulary.Messages.L4NetworkMessage import L4NetworkMessage
 
 
+# importer used by a decoding process
+_decodingImporter = None
+
+
+def _initDecodingWorker(datalink, importLayer):
+    """Initializes a decoding process with an importer dedicated to the pcap being read."""
+    global _decodingImporter
+    _decodingImporter = PCAPImporter()
+    _decodingImporter.datalink = datalink
+    _decodingImporter.importLayer = importLayer
+
+
+def _decodePackets(packets):
+    """Decodes a batch of packets in a decoding process."""
+    return _decodingImporter._decodePackets(packets)
+
+
 @NetzobLogger
 class PCAPImporter(object):
     """PCAP importer to read pcaps and extract messages out of them.
@@ -90,12 +109,102 @@ class PCAPImporter(object):
         pcapy.DLT_SLIP: "DLT_SLIP",
     }
 
-    def __init__(self):
-        pass
+    # number of packets sent at once to a decoding process
+    DECODING_BATCH_SIZE = 1000
+
+    def __init__(self, nbThread=1):
+        """Constructor.
+
+        :keyword nbThread: the number of processes that decode the packets, None means the number of cpus
+        :type nbThread: :class:`int`
+        """
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+        if nbThread < 1:
+            raise ValueError("At least one process is required to decode packets.")
+        self.nbThread = nbThread
+        # decoders are created once and reused for every packet
+        self.__decoders = dict()
 
     @typeCheck(str, str, int)
     def __readMessagesFromFile(self, filePath, bpfFilter, nbPackets):
         """Internal methods to read all messages from a given PCAP file."""
+        for message in self.__iterMessagesFromFile(filePath, bpfFilter, nbPackets):
+            self.messages.add(message)
+
+    def __iterMessagesFromFile(self, filePath, bpfFilter, nbPackets):
+        """Internal generator that yields the messages of a given PCAP file
+        as its packets are decoded."""
+        packetReader = self.__openFile(filePath, bpfFilter, nbPackets)
+        packets = self.__iterPackets(packetReader, nbPackets)
+
+        if self.nbThread == 1:
+            for (epoch, payload) in packets:
+                message = self.__decodePacket(epoch, payload)
+                if message is not None:
+                    yield message
+            return
+
+        # the packets are read by batches which are decoded by a pool of processes,
+        # decoded messages are merged following the order of the packets
+        pool = multiprocessing.Pool(self.nbThread, initializer=_initDecodingWorker, initargs=(self.datalink, self.importLayer))
+        try:
+            pendingBatches = collections.deque()
+            batch = []
+            for packet in packets:
+                batch.append(packet)
+                if len(batch) < PCAPImporter.DECODING_BATCH_SIZE:
+                    continue
+                pendingBatches.append(pool.apply_async(_decodePackets, (batch, )))
+                batch = []
+                # limits the number of packets read in advance
+                if len(pendingBatches) >= 2 * self.nbThread:
+                    for message in pendingBatches.popleft().get():
+                        yield message
+            if len(batch) > 0:
+                pendingBatches.append(pool.apply_async(_decodePackets, (batch, )))
+            while len(pendingBatches) > 0:
+                for message in pendingBatches.popleft().get():
+                    yield message
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def __iterPackets(self, packetReader, nbPackets):
+        """Internal generator that yields the (epoch, payload) of the packets read by the specified reader."""
+        nbReadPackets = 0
+        while nbPackets == 0 or nbReadPackets < nbPackets:
+            try:
+                (header, payload) = packetReader.next()
+            except pcapy.PcapError:
+                # raised by some versions of pcapy at the end of the file
+                break
+            if header is None:
+                break
+            nbReadPackets += 1
+
+            (secs, usecs) = header.getts()
+            yield (secs + (usecs / 1000000.0), payload)
+
+    def _decodePackets(self, packets):
+        """Decodes the specified list of (epoch, payload) and returns the built messages."""
+        messages = []
+        for (epoch, payload) in packets:
+            message = self.__decodePacket(epoch, payload)
+            if message is not None:
+                messages.append(message)
+        return messages
+
+    def __getDecoder(self, decoderClass):
+        """Returns the decoder of the specified class, it is only instanciated once."""
+        decoder = self.__decoders.get(decoderClass)
+        if decoder is None:
+            decoder = decoderClass()
+            self.__decoders[decoderClass] = decoder
+        return decoder
+
+    def __openFile(self, filePath, bpfFilter, nbPackets):
+        """Internal method that opens the specified PCAP file and returns the pcapy reader."""
         if (filePath is None):
             raise TypeError("filePath cannot be None")
         if (nbPackets < 0):
@@ -127,77 +236,76 @@ class PCAPImporter(object):
             errorMessage = _("This pcap cannot be imported since the "
                              + "layer 2 is not supported ({0})").format(str(self.datalink))
             raise NetzobImportException("PCAP", errorMessage, self.INVALID_LAYER2)
-        else:
-            packetReader.loop(nbPackets, self.__packetHandler)
 
-    def __packetHandler(self, header, payload):
-        """Internal callback executed on each packet when parsing the pcap"""
-        (secs, usecs) = header.getts()
-        epoch = secs + (usecs / 1000000.0)
+        return packetReader
+
+    def __decodePacket(self, epoch, payload):
+        """Internal method executed on each packet when parsing the pcap.
+        It returns the message built from the packet or None if the packet is ignored."""
 
         if self.importLayer == 1 or self.importLayer == 2:
             try:
-                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(header, payload)
+                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(payload)
             except NetzobImportException, e:
                 self._logger.warn("An error occured while decoding layer2 of a packet: {0}".format(e))
-                return
+                return None
             if len(l2Payload) == 0:
-                return
+                return None
 
             # Build the L2NetworkMessage
             l2Message = L2NetworkMessage(payload, epoch, l2Proto, l2SrcAddr, l2DstAddr)
 
-            self.messages.add(l2Message)
+            return l2Message
 
         elif self.importLayer == 3:
             try:
-                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(header, payload)
+                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload, ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
             except NetzobImportException, e:
                 self._logger.warn("An error occured while decoding layer2 and layer3 of a packet: {0}".format(e))
-                return
+                return None
 
             if len(l3Payload) == 0:
-                return
+                return None
 
             # Build the L3NetworkMessage
             l3Message = L3NetworkMessage(l2Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto, l3SrcAddr, l3DstAddr)
-            self.messages.add(l3Message)
+            return l3Message
 
         elif self.importLayer == 4:
             try:
-                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(header, payload)
+                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload, ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
                 (l4Proto, l4SrcPort, l4DstPort, l4Payload) = self.__decodeLayer4(ipProtocolNum, l3Payload)
             except NetzobImportException, e:
                 self._logger.warn("An error occured while decoding layer2, layer3 or layer4 of a packet: {0}".format(e))
-                return
+                return None
             if len(l4Payload) == 0:
-                return
+                return None
 
             # Build the L4NetworkMessage
             l4Message = L4NetworkMessage(l3Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr,
                                          l3Proto, l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
 
-            self.messages.add(l4Message)
+            return l4Message
 
         else:
             try:
-                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(header, payload)
+                (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload, ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
                 (l4Proto, l4SrcPort, l4DstPort, l4Payload) = self.__decodeLayer4(ipProtocolNum, l3Payload)
             except NetzobImportException, e:
                 self._logger.warn("An error occured while decoding layer2, layer3, layer4 or layer5 of a packet: {0}".format(e))
-                return
+                return None
             if len(l4Payload) == 0:
-                return
+                return None
 
             l5Message = L4NetworkMessage(l4Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr,
                                          l3Proto, l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
 
-            self.messages.add(l5Message)
+            return l5Message
 
-    def __decodeLayer2(self, header, payload):
+    def __decodeLayer2(self, payload):
         """Internal method that parses the specified header and extracts
         layer2 related proprieties."""
 
@@ -206,7 +314,7 @@ class PCAPImporter(object):
                 hex(b)[2:]) for b in arrayMac.tolist())
 
         if self.datalink == pcapy.DLT_EN10MB:
-            l2Decoder = Decoders.EthDecoder()
+            l2Decoder = self.__getDecoder(Decoders.EthDecoder)
             l2Proto = "Ethernet"
             layer2 = l2Decoder.decode(payload)
             l2SrcAddr = formatMacAddress(layer2.get_ether_shost())
@@ -214,7 +322,7 @@ class PCAPImporter(object):
             l2Payload = payload[layer2.get_header_size():]
             etherType = layer2.get_ether_type()
         elif self.datalink == pcapy.DLT_LINUX_SLL:
-            l2Decoder = Decoders.LinuxSLLDecoder()
+            l2Decoder = self.__getDecoder(Decoders.LinuxSLLDecoder)
             l2Proto = "Linux SLL"
             layer2 = l2Decoder.decode(payload)
             l2SrcAddr = layer2.get_addr()
@@ -239,7 +347,7 @@ class PCAPImporter(object):
         layer3 related proprieties."""
         if etherType == Packets.IP.ethertype:
             l3Proto = "IP"
-            l3Decoder = Decoders.IPDecoder()
+            l3Decoder = self.__getDecoder(Decoders.IPDecoder)
             layer3 = l3Decoder.decode(l2Payload)
             paddingSize = len(l2Payload) - layer3.get_ip_len()
 
@@ -263,7 +371,7 @@ class PCAPImporter(object):
         layer4 related proprieties."""
         if ipProtocolNum == Packets.UDP.protocol:
             l4Proto = "UDP"
-            l4Decoder = Decoders.UDPDecoder()
+            l4Decoder = self.__getDecoder(Decoders.UDPDecoder)
             layer4 = l4Decoder.decode(l3Payload)
             l4SrcPort = layer4.get_uh_sport()
             l4DstPort = layer4.get_uh_dport()
@@ -271,7 +379,7 @@ class PCAPImporter(object):
             return (l4Proto, l4SrcPort, l4DstPort, l4Payload)
         elif ipProtocolNum == Packets.TCP.protocol:
             l4Proto = "TCP"
-            l4Decoder = Decoders.TCPDecoder()
+            l4Decoder = self.__getDecoder(Decoders.TCPDecoder)
             layer4 = l4Decoder.decode(l3Payload)
             l4SrcPort = layer4.get_th_sport()
             l4DstPort = layer4.get_th_dport()
@@ -308,6 +416,58 @@ class PCAPImporter(object):
         :rtype: a list of :class:`netzob.Common.Models.Vocabulary.Messages.AbstractMessage`
         """
 
+        self.__checkParameters(filePathList, importLayer)
+
+        # Call the method that does the import job for each PCAP file
+        self.messages = SortedTypedList(AbstractMessage)
+        for filePath in filePathList:
+            self.__readMessagesFromFile(filePath, bpfFilter, nbPackets)
+        return self.messages
+
+    @typeCheck(list, str, int, int, int)
+    def iterMessages(self, filePathList, bpfFilter="", importLayer=5, nbPackets=0, batchSize=0):
+        """Iterates over the messages of a list of PCAP files. Contrary to :meth:`readMessages`,
+        messages are yielded as soon as their packets are decoded, following their order in the files,
+        and are not kept by the importer. Thus, huge captures can be processed with a bounded memory.
+
+        The parameters are the same than the ones of :meth:`readMessages`.
+        If a batchSize is specified, lists of (at most) batchSize messages are yielded instead of messages.
+        The importer then holds at most batchSize messages.
+
+        :param filePathList: a list of pcap files to read
+        :type filePathList: a list of :class:`str`
+        :param bpfFilter: a string representing a BPF filter.
+        :type bpfFilter: :class:`str`
+        :param importLayer: an integer representing the protocol layer to start importing.
+        :type importLayer: :class:`int`
+        :param nbPackets: the number of packets to import in each file
+        :type nbPackets: :class:`int`
+        :param batchSize: the number of messages per yielded batch, 0 to yield the messages one by one
+        :type batchSize: :class:`int`
+        :return: a generator of captured messages (or of lists of captured messages)
+        :rtype: a generator of :class:`netzob.Common.Models.Vocabulary.Messages.AbstractMessage`
+        """
+        if batchSize < 0:
+            raise ValueError("A positive (or null) value is required for the size of the batches.")
+
+        self.__checkParameters(filePathList, importLayer)
+
+        batch = []
+        for filePath in filePathList:
+            for message in self.__iterMessagesFromFile(filePath, bpfFilter, nbPackets):
+                if batchSize == 0:
+                    yield message
+                    continue
+                batch.append(message)
+                if len(batch) >= batchSize:
+                    yield batch
+                    batch = []
+        if len(batch) > 0:
+            yield batch
+
+    def __checkParameters(self, filePathList, importLayer):
+        """Internal method that verifies the files can be read and the import layer is valid."""
+
         # Verify the existence of input files
         errorMessageList = []
         for filePath in filePathList:
@@ -333,15 +493,9 @@ class PCAPImporter(object):
             raise Exception("Only layers level {0} are available.".format(availableLayers))
         self.importLayer = importLayer
 
-        # Call the method that does the import job for each PCAP file
-        self.messages = SortedTypedList(AbstractMessage)
-        for filePath in filePathList:
-            self.__readMessagesFromFile(filePath, bpfFilter, nbPackets)
-        return self.messages
-
     @staticmethod
-    @typeCheck(list, str, int, int)
-    def readFiles(filePathList, bpfFilter="", importLayer=5, nbPackets=0):
+    @typeCheck(list, str, int, int, int)
+    def readFiles(filePathList, bpfFilter="", importLayer=5, nbPackets=0, nbThread=1):
         """Read all messages from a list of PCAP files. A BPF filter
         can be set to limit the captured packets. The layer of import
         can also be specified:
@@ -359,16 +513,18 @@ class PCAPImporter(object):
         :type importLayer: :class:`int`
         :param nbPackets: the number of packets to import
         :type nbPackets: :class:`int`
+        :param nbThread: the number of processes that decode the packets
+        :type nbThread: :class:`int`
         :return: a list of captured messages
         :rtype: a list of :class:`netzob.Common.Models.Vocabulary.Messages.AbstractMessage`
         """
 
-        importer = PCAPImporter()
+        importer = PCAPImporter(nbThread)
         return importer.readMessages(filePathList, bpfFilter, importLayer, nbPackets)
 
     @staticmethod
-    @typeCheck(str, str, int, int)
-    def readFile(filePath, bpfFilter="", importLayer=5, nbPackets=0):
+    @typeCheck(str, str, int, int, int)
+    def readFile(filePath, bpfFilter="", importLayer=5, nbPackets=0, nbThread=1):
         """Read all messages from the specified PCAP file. A BPF filter
         can be set to limit the captured packets. The layer of import
         can also be specified:
@@ -386,12 +542,37 @@ class PCAPImporter(object):
         :type importLayer: :class:`int`
         :param nbPackets: the number of packets to import
         :type nbPackets: :class:`int`
+        :param nbThread: the number of processes that decode the packets
+        :type nbThread: :class:`int`
         :return: a list of captured messages
         :rtype: a list of :class:`netzob.Common.Models.Vocabulary.Messages.AbstractMessage`
         """
 
-        importer = PCAPImporter()
-        return importer.readFiles([filePath], bpfFilter, importLayer, nbPackets)
+        return PCAPImporter.readFiles([filePath], bpfFilter, importLayer, nbPackets, nbThread)
+
+    @staticmethod
+    @typeCheck(str, str, int, int, int, int)
+    def iterFile(filePath, bpfFilter="", importLayer=5, nbPackets=0, batchSize=0, nbThread=1):
+        """Iterates over the messages of the specified PCAP file, see :meth:`iterMessages`.
+
+        :param filePath: the pcap path
+        :type filePath: :class:`str`
+        :param bpfFilter: a string representing a BPF filter.
+        :type bpfFilter: :class:`str`
+        :param importLayer: an integer representing the protocol layer to start importing.
+        :type importLayer: :class:`int`
+        :param nbPackets: the number of packets to import
+        :type nbPackets: :class:`int`
+        :param batchSize: the number of messages per yielded batch, 0 to yield the messages one by one
+        :type batchSize: :class:`int`
+        :param nbThread: the number of processes that decode the packets
+        :type nbThread: :class:`int`
+        :return: a generator of captured messages (or of lists of captured messages)
+        :rtype: a generator of :class:`netzob.Common.Models.Vocabulary.Messages.AbstractMessage`
+        """
+
+        importer = PCAPImporter(nbThread)
+        return importer.iterMessages([filePath], bpfFilter, importLayer, nbPackets, batchSize)
 
     @staticmethod
     @typeCheck(L2NetworkMessage)
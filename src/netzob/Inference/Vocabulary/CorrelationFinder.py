@@ -31,6 +31,9 @@
 import errno
 import time
 import uuid
+import hashlib
+import multiprocessing
+import multiprocessing.sharedctypes
 from gettext import gettext as _
 
 #+---------------------------------------------------------------------------+
@@ -53,6 +56,27 @@ from netzob.Common.Models.Types.Decimal import Decimal
 from netzob.Inference.Vocabulary.RelationFinder import RelationFinder
 
 
+# attribute values shared with the processes computing the MIC scores
+_sharedAttributeValues = None
+
+
+def _initCorrelationWorker(sharedValues, shape):
+    """Initializes a process of the pool with the shared matrix of attribute values."""
+    global _sharedAttributeValues
+    _sharedAttributeValues = numpy.frombuffer(sharedValues).reshape(shape)
+
+
+def _computeMIC(pairs):
+    """Computes the MIC score of each pair (i, j) of rows of the shared
+    matrix of attribute values. Used by the pool of processes."""
+    results = []
+    for (i, j) in pairs:
+        mine = MINE(alpha=0.6, c=15)
+        mine.compute_score(_sharedAttributeValues[i], _sharedAttributeValues[j])
+        results.append((i, j, mine.mic()))
+    return results
+
+
 @NetzobLogger
 class CorrelationFinder(object):
     """Correlation identification based on MINE (Maximal
@@ -66,7 +90,27 @@ class CorrelationFinder(object):
     >>> Format.splitStatic(symbol)
     >>> rels = CorrelationFinder.find(symbol)
     >>> print len(rels)
-    64
+    65
+
+    The MIC scores can be computed by a pool of nbThread processes (one per cpu if None).
+    Pairs of attributes whose values are constant are not scored since they cannot be correlated.
+    A finder keeps the scores of the attributes of its last execution, thus executing it again
+    only computes the scores of the attributes which values changed. For instance, merging two fields
+    does not require new scores since the values of the merged field were already scored.
+
+    >>> cf = CorrelationFinder(nbThread=2)
+    >>> print len(cf.execute(symbol)), cf.nbComputedScores
+    65 66
+    >>> Format.mergeFields(symbol.fields[2], symbol.fields[3])
+    >>> print len(cf.execute(symbol)), cf.nbComputedScores
+    27 66
+
+    A minimum Pearson (or Spearman) correlation can be specified to screen pairs
+    of attributes before computing their MIC score.
+
+    >>> cf = CorrelationFinder(minPearson=0.9, nbThread=1)
+    >>> print len(cf.execute(symbol)), cf.nbComputedScores
+    13 13
     """
 
     # Field's attributes
@@ -104,8 +148,25 @@ class CorrelationFinder(object):
         cf = CorrelationFinder(minMic)
         return cf.execute(symbol)
 
-    def __init__(self, minMic=0.7):
+    def __init__(self, minMic=0.7, minPearson=None, nbThread=1):
+        """Constructor.
+
+        :keyword minMic: the minimum correlation score
+        :type minMic: :class:`float`
+        :keyword minPearson: if specified, pairs of attributes which absolute Pearson and Spearman correlations are below it are not scored
+        :type minPearson: :class:`float`
+        :keyword nbThread: the number of processes used to compute the scores (1 by default), None means the number of cpus
+        :type nbThread: :class:`int`
+        """
         self.minMic = minMic
+        self.minPearson = minPearson
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+        self.nbThread = nbThread
+        # MIC scores indexed by the digests of the values of the two attributes,
+        # only the scores of the attributes of the last execution are kept
+        self.__micScores = dict()
+        self.nbComputedScores = 0
 
     @typeCheck(AbstractField)
     def execute(self, symbol):
@@ -117,12 +178,41 @@ class CorrelationFinder(object):
         (attributeValues_headers, attributeValues) = self._generateAttributeValuesForSymbol(symbol)
         symbolResults = []
 
+        if len(attributeValues) == 0:
+            return symbolResults
+
+        attributeValues = numpy.array(attributeValues, dtype=numpy.float64)
+        digests = [hashlib.sha1(values.tostring()).digest() for values in attributeValues]
+        isConstant = (attributeValues == attributeValues[:, :1]).all(axis=1)
+        pearsons = self.__computePearsonScores(attributeValues, isConstant)
+
+        # selects the pairs of attributes to score
+        pairs = []
+        for i in xrange(len(attributeValues) - 1):
+            if isConstant[i]:
+                continue
+            for j in xrange(i + 1, len(attributeValues)):
+                if isConstant[j] or (digests[i], digests[j]) in self.__micScores:
+                    continue
+                if self.minPearson is not None and not self.__isScreened(attributeValues, pearsons, i, j):
+                    continue
+                pairs.append((i, j))
+
         # MINE computation of each field's combination
-        for i, values_x in enumerate(attributeValues[:-1]):
-            for j, values_y in enumerate(attributeValues[i+1:]):
-                mine = MINE(alpha=0.6, c=15)
-                mine.compute_score(numpy.array(values_x), numpy.array(values_y))
-                mic = round(mine.mic(), 2)
+        for (i, j, mic) in self.__computeMICScores(attributeValues, pairs):
+            self.__micScores[(digests[i], digests[j])] = mic
+        self.nbComputedScores += len(pairs)
+
+        # forgets the scores of the attributes which are no longer present
+        currentDigests = set(digests)
+        self.__micScores = dict(((x, y), mic) for ((x, y), mic) in self.__micScores.iteritems() if x in currentDigests and y in currentDigests)
+
+        for i in xrange(len(attributeValues) - 1):
+            for j in xrange(i + 1, len(attributeValues)):
+                mic = self.__micScores.get((digests[i], digests[j]))
+                if isConstant[i] or isConstant[j] or mic is None:
+                    continue
+                mic = round(mic, 2)
                 if mic > float(self.minMic):
                     # We add the relation to the results
                     (x_fields, x_attribute) = attributeValues_headers[i]
@@ -130,11 +220,10 @@ class CorrelationFinder(object):
                     # The relation should not apply on the same field
                     if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[0].id == y_fields[0].id:
                         continue
-                    pearson = numpy.corrcoef(values_x, values_y)[0, 1]
+                    pearson = pearsons[i, j]
                     if not numpy.isnan(pearson):
                         pearson = round(pearson, 2)
                     relation_type = self._findRelationType(x_attribute, y_attribute)
-                    self._debug_mine_stats(mine)
                     self._logger.debug("Correlation found between '" + str(x_fields) + ":" + x_attribute + "' and '" + str(y_fields) + ":" + y_attribute + "'")
                     self._logger.debug("  MIC score: " + str(mic))
                     self._logger.debug("  Pearson score: " + str(pearson))
@@ -149,6 +238,50 @@ class CorrelationFinder(object):
                                           'pearson': pearson})
         return symbolResults
 
+    def __computePearsonScores(self, attributeValues, isConstant):
+        """Computes the Pearson correlation of each pair of attributes (NaN for constant attributes)."""
+        pearsons = numpy.empty((len(attributeValues), len(attributeValues)))
+        pearsons.fill(numpy.nan)
+        variables = numpy.flatnonzero(~isConstant)
+        if len(variables) > 0 and attributeValues.shape[1] > 1:
+            pearsons[numpy.ix_(variables, variables)] = numpy.corrcoef(attributeValues[variables])
+        return pearsons
+
+    def __isScreened(self, attributeValues, pearsons, i, j):
+        """Returns True if the attributes i and j are linearly or monotonically correlated."""
+        if abs(pearsons[i, j]) >= self.minPearson:
+            return True
+        # Spearman correlation is the Pearson correlation of the ranks
+        ranks = [values.argsort().argsort() for values in (attributeValues[i], attributeValues[j])]
+        spearman = numpy.corrcoef(ranks[0], ranks[1])[0, 1]
+        return not numpy.isnan(spearman) and abs(spearman) >= self.minPearson
+
+    def __computeMICScores(self, attributeValues, pairs):
+        """Computes the MIC score of the specified pairs of attributes,
+        using a pool of processes sharing the matrix of attribute values."""
+        if len(pairs) == 0:
+            return []
+
+        sharedValues = multiprocessing.sharedctypes.RawArray('d', attributeValues.size)
+        numpy.frombuffer(sharedValues).reshape(attributeValues.shape)[:] = attributeValues
+
+        nbChunks = self.nbThread * 4
+        chunks = [pairs[i::nbChunks] for i in xrange(nbChunks)]
+
+        if self.nbThread <= 1 or len(pairs) < nbChunks:
+            _initCorrelationWorker(sharedValues, attributeValues.shape)
+            return _computeMIC(pairs)
+
+        pool = multiprocessing.Pool(self.nbThread, initializer=_initCorrelationWorker, initargs=(sharedValues, attributeValues.shape))
+        try:
+            results = []
+            for chunkResults in pool.map(_computeMIC, chunks):
+                results.extend(chunkResults)
+        finally:
+            pool.close()
+            pool.join()
+        return results
+
     def _debug_mine_stats(self, mine):
         self._logger.debug("MIC: " + str(mine.mic()))
         self._logger.debug("MAS: " + str(mine.mas()))
@@ -177,17 +310,23 @@ class CorrelationFinder(object):
 
         # Compute the table of concatenation of values
         for i in range(len(fields[:])):
+            # data values only depend on the first 8 bytes of the concatenation
+            prefixes = ["" for data in valuesTable[i]]
+            sizes = [0 for data in valuesTable[i]]
+            dataValues = None
             for j in range(i+1, len(fields)+1):
-                # We generate the data
-                concatCellsData = self._generateConcatData(valuesTable[i:j])
+                sizes = [size + len(data) for (size, data) in zip(sizes, valuesTable[j - 1])]
+                if dataValues is None or any([len(prefix) < 8 for prefix in prefixes]):
+                    prefixes = [(prefix + data)[:8] for (prefix, data) in zip(prefixes, valuesTable[j - 1])]
+                    dataValues = self._generateDataValues(prefixes)
 
                 # We generate lines and header for fields values
                 line_header.append((fields[i:j], self.ATTR_VALUE))
-                lines_data.append(self._generateDataValues(concatCellsData))
+                lines_data.append(dataValues)
 
-                # We generate lines and header for fields values
+                # We generate lines and header for fields sizes
                 line_header.append((fields[i:j], self.ATTR_SIZE))
-                lines_data.append(self._generateSizeValues(concatCellsData))
+                lines_data.append(sizes)
 
         # # # Now we generate values for fields sizes
         # # (multipleSize_Header, multipleSize_lines) = self._generateSizeFieldFromBeginingOfField(symbol)
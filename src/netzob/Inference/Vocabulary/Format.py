@@ -66,11 +66,11 @@ class Format(object):
 
     @staticmethod
     @typeCheck(AbstractField)
-    def splitAligned(field, useSemantic=True, doInternalSlick=False):
+    def splitAligned(field, useSemantic=True, doInternalSlick=False, guideTree=False, sampleSize=None):
         if field is None:
             raise TypeError("Field cannot be None")
 
-        fs = FieldSplitAligned(doInternalSlick=doInternalSlick)
+        fs = FieldSplitAligned(doInternalSlick=doInternalSlick, guideTree=guideTree, sampleSize=sampleSize)
         fs.execute(field, useSemantic)
 
     @staticmethod
@@ -290,14 +290,19 @@ class Format(object):
 
     @staticmethod
     @typeCheck(list)
-    def clusterByAlignment(messages, minEquivalence=50, internalSlick=True):
+    def clusterByAlignment(messages, minEquivalence=50, internalSlick=True, nbThread=None, preClustering=False, checkpointPath=None):
         """This clustering process regroups messages in groups that maximes
         their alignement. It provides the required methods to compute clustering
         between multiple symbols/messages using UPGMA algorithms (see U{http://en.wikipedia.org/wiki/UPGMA}).
         When processing, the matrix of scores is computed by the C extensions (L{_libScoreComputation}
         and used to regroup messages and symbols into equivalent cluster.
+        The similarity matrix is computed by nbThread threads (None means one per cpu).
+        If preClustering is set, messages are first distributed in buckets following cheap
+        signatures and only aligned with the messages of their bucket and cluster representatives.
+        If checkpointPath is set, the similarity matrix is saved in this file while computed
+        and the scores it already contains are reused.
         """
-        clustering = ClusterByAlignment(minEquivalence=minEquivalence, internalSlick=internalSlick)
+        clustering = ClusterByAlignment(minEquivalence=minEquivalence, internalSlick=internalSlick, nbThread=nbThread, preClustering=preClustering, checkpointPath=checkpointPath)
         return clustering.cluster(messages)
 
     @staticmethod
@@ -403,7 +408,7 @@ class Format(object):
 
     @staticmethod
     @typeCheck(AbstractField)
-    def findKeyFields(field):
+    def findKeyFields(field, nbThread=1):
         """Try to identify potential key fields in a symbol/field.
 
         # >>> import binascii
@@ -421,6 +426,8 @@ class Format(object):
 
         :param field: the field in which we want to identify key fields.
         :type field: :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField`
+        :keyword nbThread: the number of processes among which candidate key fields are evaluated (1 by default, None means one per cpu)
+        :type nbThread: :class:`int`
         :raise Exception if something bad happens
 
         """
@@ -428,7 +435,7 @@ class Format(object):
         if field is None:
             raise TypeError("'field' should not be None")
 
-        keyFieldsFinder = FindKeyFields()
+        keyFieldsFinder = FindKeyFields(nbThread=nbThread)
         return keyFieldsFinder.execute(field)
 
     @staticmethod
@@ -34,10 +34,15 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
+from collections import OrderedDict
+import hashlib
+import heapq
+import multiprocessing
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
 # +---------------------------------------------------------------------------+
+import numpy
 
 # +---------------------------------------------------------------------------+
 # | Local application imports                                                 |
@@ -46,6 +51,8 @@ from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Common.Models.Vocabulary.Symbol import Symbol
 from netzob.Common.Models.Vocabulary.Messages.AbstractMessage import AbstractMessage
 from netzob.Common.C_Extensions.WrapperArgsFactory import WrapperArgsFactory
+from netzob.Common.NetzobException import NetzobException
+from netzob.Inference.Vocabulary.FormatOperations.SimilarityMatrixCheckpoint import SimilarityMatrixCheckpoint
 
 # +---------------------------------------------------------------------------+
 # | C Imports
@@ -82,10 +89,10 @@ class ClusterByAlignment(object):
     '4d79206970206164647265737320697320' | ''       | '0a' | '7879d4'
 
     >>> print symbols[2]
-    'hello ' | 'ditrich' | ", what's up in " | 'Munich'    | ' ?'
-    'hello ' | 'ditrich' | ", what's up in " | 'Paris'     | ' ?'
     'hello ' | 'carlito' | ", what's up in " | 'Munich'    | ' ?'
     'hello ' | 'carlito' | ", what's up in " | 'Paris'     | ' ?'
+    'hello ' | 'ditrich' | ", what's up in " | 'Munich'    | ' ?'
+    'hello ' | 'ditrich' | ", what's up in " | 'Paris'     | ' ?'
     'hello ' | 'carlito' | ", what's up in " | 'Vienne'    | ' ?'
     'hello ' | 'ditrich' | ", what's up in " | 'Vienne'    | ' ?'
     'hello ' | 'toto'    | ", what's up in " | 'Paris'     | ' ?'
@@ -99,12 +106,64 @@ class ClusterByAlignment(object):
     'hello ' | 'toto'    | ", what's up in " | 'Barcelone' | ' ?'
     'hello ' | 'zoby'    | ", what's up in " | 'Barcelone' | ' ?'
 
+    The couples of messages of the similarity matrix are spread over
+    several threads (one per available cpu by default). The
+    clustering does not depend on the number of threads.
+
+    >>> singleSymbols = [Symbol(messages=[m]) for m in messages]
+    >>> scores = ClusterByAlignment(nbThread=1)._computeSimilarityMatrix(singleSymbols)
+    >>> scores == ClusterByAlignment(nbThread=4)._computeSimilarityMatrix(singleSymbols)
+    True
+
+    On large traces, messages can first be distributed in buckets
+    following cheap signatures (MinHash of their n-grams). Alignments
+    are then only computed between messages of the same bucket and
+    between representatives of the clusters found in each bucket.
+    The clustering is faster but not exactly the same.
+
+    >>> clustering = ClusterByAlignment(preClustering=True)
+    >>> symbols = clustering.cluster(messages)
+    >>> len(symbols)
+    3
+    >>> sorted(len(symbol.messages) for symbol in symbols)
+    [3, 16, 48]
+
+    The similarity matrix can be saved in a checkpoint file while
+    it is computed. A computation which has been cancelled (see cancel())
+    or interrupted can then be resumed, and a later clustering of some
+    of the same messages only computes the scores of the new ones.
+    As the score of two messages slightly depends on the order in which
+    they are aligned, saved scores are those of the first computation.
+
+    >>> import os, shutil, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> clustering = ClusterByAlignment(nbThread=1, checkpointPath=os.path.join(directory, "scores"))
+    >>> partialScores = clustering._computeSimilarityMatrix(singleSymbols[:40])
+    >>> scores = clustering._computeSimilarityMatrix(singleSymbols)
+    >>> scores == ClusterByAlignment(nbThread=1)._computeSimilarityMatrix(singleSymbols)
+    True
+    >>> shutil.rmtree(directory)
+
     """
 
-    def __init__(self, minEquivalence=50, internalSlick=True, recomputeMatrixThreshold=None):
+    # Size of the n-grams used to compute the signatures of the messages
+    PRECLUSTERING_NGRAM_SIZE = 3
+    # Number of LSH bands and of MinHash values per band
+    PRECLUSTERING_NB_BANDS = 8
+    PRECLUSTERING_BAND_SIZE = 2
+    # Modulus of the hash functions of MinHash (a Mersenne prime)
+    PRECLUSTERING_PRIME = (1 << 31) - 1
+    # Number of new messages whose scores are computed before each checkpoint
+    CHECKPOINT_NB_ROWS = 64
+
+    def __init__(self, minEquivalence=50, internalSlick=True, recomputeMatrixThreshold=None, nbThread=None, preClustering=False, checkpointPath=None):
         self.minEquivalence = minEquivalence
         self.internalSlick = internalSlick
         self.recomputeMatrixThreshold = recomputeMatrixThreshold
+        self.nbThread = nbThread
+        self.preClustering = preClustering
+        self.checkpointPath = checkpointPath
+        self.__cancelled = False
 
     @typeCheck(list)
     def cluster(self, messages):
@@ -118,9 +177,13 @@ class ClusterByAlignment(object):
                 raise TypeError("At least one message ({0}) is not an AbstractMessage.".format(str(m)))
 
         self._logger.debug("Identify similar messages following their alignment (min_equivalence={0})".format(self.minEquivalence))
+        self.__cancelled = False
 
         self._logger.debug("Initiating the clustering by alignment on {0} messages...".format(len(messages)))
-        symbols = self._processUPGMA(messages, self.recomputeMatrixThreshold)
+        if self.preClustering:
+            symbols = self._processPreClusteredUPGMA(messages, self.recomputeMatrixThreshold)
+        else:
+            symbols = self._processUPGMA(messages, self.recomputeMatrixThreshold)
         self._logger.debug("Clustering completed, computing final alignment.")
 
         # Retrieve the alignment of each symbol and the build the associated regular expression
@@ -143,16 +206,104 @@ class ClusterByAlignment(object):
             if not isinstance(m, AbstractMessage):
                 raise TypeError("At least one message ({0}) is not an AbstractMessage.".format(str(m)))
 
-        # We create one symbol for each message
-        initialSymbols = [Symbol(messages=[message]) for message in messages]
+        # We create one symbol for each distinct payload. Identical payloads
+        # would be merged first (their score is maximal), here their number
+        # weights the scores of their symbol when merging clusters.
+        payloads = OrderedDict()
+        for message in messages:
+            payloads.setdefault(message.data, []).append(message)
+        initialSymbols = [Symbol(messages=payloadMessages) for payloadMessages in payloads.values()]
+        self._logger.debug("{0} distinct payloads among the {1} messages".format(len(initialSymbols), len(messages)))
 
         self._logger.debug("Computing the associated matrix")
 
         # Compute initial similarity matrix
-        self.scores = self._computeSimilarityMatrix(initialSymbols)
+        scores = self._computeSimilarityMatrix(initialSymbols)
 
         # Reduce the UPGMA matrix (merge symbols by similarity)
-        return self._computePhylogenicTree(initialSymbols, recomputeMatrixThreshold)
+        return self._computePhylogenicTree(initialSymbols, scores, recomputeMatrixThreshold)
+
+    @typeCheck(list)
+    def _processPreClusteredUPGMA(self, messages, recomputeMatrixThreshold=None):
+        """Distributes the messages in buckets following their signatures,
+        clusters the messages of each bucket and then clusters the
+        resulting symbols. Since the C extension aligns the first message
+        of each symbol, this message is the representative of its symbol
+        in the last step."""
+        buckets = self._computeBuckets(messages)
+        self._logger.debug("Messages distributed in {0} buckets".format(len(buckets)))
+
+        symbols = []
+        for bucket in buckets:
+            symbols.extend(self._processUPGMA(bucket, recomputeMatrixThreshold))
+        if len(symbols) < 2:
+            return symbols
+
+        self._logger.debug("Clustering the {0} symbols found in the buckets".format(len(symbols)))
+        scores = self._computeSimilarityMatrix(symbols)
+        return self._computePhylogenicTree(symbols, scores, recomputeMatrixThreshold)
+
+    @typeCheck(list)
+    def _computeBuckets(self, messages):
+        """Regroups messages sharing at least one band of their MinHash
+        signature (LSH). Buckets are the connected components of this
+        relation and preserve the order of the messages.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage("hello john !"), RawMessage("\\x00\\x01\\x02\\x03"), RawMessage("hello jack !"), RawMessage("\\x00\\x01\\x02\\x04")]
+        >>> buckets = ClusterByAlignment()._computeBuckets(messages)
+        >>> [[m.data for m in bucket] for bucket in buckets]
+        [['hello john !', 'hello jack !'], ['\\x00\\x01\\x02\\x03', '\\x00\\x01\\x02\\x04']]
+
+        """
+        nbHashes = self.PRECLUSTERING_NB_BANDS * self.PRECLUSTERING_BAND_SIZE
+        random = numpy.random.RandomState(0)
+        coefA = random.randint(1, self.PRECLUSTERING_PRIME, size=(nbHashes, 1)).astype(numpy.int64)
+        coefB = random.randint(0, self.PRECLUSTERING_PRIME, size=(nbHashes, 1)).astype(numpy.int64)
+
+        # Union-find over the messages, linked as soon as one of their bands is equal
+        parents = range(len(messages))
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        bands = dict()
+        for (iMessage, message) in enumerate(messages):
+            signature = self._computeSignature(message.data, coefA, coefB)
+            for iBand in xrange(self.PRECLUSTERING_NB_BANDS):
+                band = (iBand, signature[iBand * self.PRECLUSTERING_BAND_SIZE:(iBand + 1) * self.PRECLUSTERING_BAND_SIZE].tostring())
+                if band in bands:
+                    (root1, root2) = (find(bands[band]), find(iMessage))
+                    if root1 != root2:
+                        parents[max(root1, root2)] = min(root1, root2)
+                else:
+                    bands[band] = iMessage
+
+        buckets = []
+        bucketIndexes = dict()
+        for iMessage in xrange(len(messages)):
+            root = find(iMessage)
+            if root not in bucketIndexes:
+                bucketIndexes[root] = len(buckets)
+                buckets.append([])
+            buckets[bucketIndexes[root]].append(messages[iMessage])
+        return buckets
+
+    def _computeSignature(self, data, coefA, coefB):
+        """Computes the MinHash signature of the n-grams of data
+        with the hash functions (a * x + b) mod p."""
+        ngramSize = self.PRECLUSTERING_NGRAM_SIZE
+        values = numpy.fromstring(data, dtype=numpy.uint8).astype(numpy.int64)
+        if len(values) < ngramSize:
+            values = numpy.concatenate((values, numpy.zeros(ngramSize - len(values), dtype=numpy.int64)))
+        ngrams = numpy.zeros(len(values) - ngramSize + 1, dtype=numpy.int64)
+        for i in xrange(ngramSize):
+            ngrams = (ngrams << 8) | values[i:len(values) - ngramSize + 1 + i]
+        ngrams = numpy.unique(ngrams)
+        return ((coefA * ngrams + coefB) % self.PRECLUSTERING_PRIME).min(axis=1)
 
     @typeCheck(list)
     def _computeSimilarityMatrix(self, symbols):
@@ -162,13 +313,10 @@ class ClusterByAlignment(object):
             if not isinstance(symbol, Symbol):
                 raise TypeError("At least one specified symbol is not a valid symbol")
 
-        # Execute the Clustering part in C
-        debug = False
-        wrapper = WrapperArgsFactory("_libScoreComputation.computeSimilarityMatrix")
-        wrapper.typeList[wrapper.function](symbols)
-        self._logger.debug("wrapper = {0}".format(wrapper))
+        if self.checkpointPath is not None:
+            return self._computeCheckpointedSimilarityMatrix(symbols)
 
-        (listScores) = _libScoreComputation.computeSimilarityMatrix(self.internalSlick, self._cb_executionStatus, self._isFinish, debug, wrapper)
+        listScores = self._computeScores(symbols)
         # Retrieve the scores for each association of symbols
         scores = {}
         for (iuid, juid, score) in listScores:
@@ -181,101 +329,228 @@ class ClusterByAlignment(object):
                 scores[juid][iuid] = score
         return scores
 
-    def _computePhylogenicTree(self, symbols, recomputeMatrixThreshold):
-        """Compute the phylogenic tree
-        @var max_i: uid of i_maximum
-        @var max_j: uid of j_maximum
-        @var maxScore: the highest global score"""
-        maxScore = 0
-        status = 0
-        step = (float(100) - float(self.minEquivalence)) / float(100)
-        self.lastScore = None
-
-        if len(self.scores) > 1:
-            max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-            max_j = max(self.scores[max_i], key=lambda y: self.scores[max_i][y])
-            maxScore = self.scores[max_i][max_j]
-        while len(self.scores) > 1 and maxScore >= self.minEquivalence:
-
-            symbols_uid = [str(s.id) for s in symbols]  # List of the UID in of symbols
-            (i_maximum, j_maximum) = (symbols_uid.index(max_i), symbols_uid.index(max_j))
-            size_i = len(symbols[i_maximum].messages)
-            size_j = len(symbols[j_maximum].messages)
-
-            self._logger.debug("Clustering {0} with {1} (score = {2})".format(str(i_maximum), str(j_maximum), str(maxScore)))
-
-            newuid = self._mergeEffectiveRowCol(symbols, i_maximum, j_maximum)
-            self._updateScore(symbols, max_i, max_j, newuid, size_i, size_j, recomputeMatrixThreshold)
-#            self.log.debug("Score après: {0}".format(str(self.scores)))
-            if len(self.scores) > 1:
-                max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-                max_j = max(self.scores[max_i], key=lambda y: self.scores[max_i][y])
-                maxScore = self.scores[max_i][max_j]
-        return symbols
-
-    def _mergeEffectiveRowCol(self, symbols, i_maximum, j_maximum):
-        """Merge the symbols i and j in the "symbols" structure
-        @param i_maximum: id of the first symbol to merge
-        @param j_maximum: id of the second symbol to merge
-        @return the newly created symbol result of the merged process"""
-        # Extract symbols i and j
-        if i_maximum > j_maximum:
-            symbol1 = symbols.pop(i_maximum)
-            symbol2 = symbols.pop(j_maximum)
-        else:
-            symbol1 = symbols.pop(j_maximum)
-            symbol2 = symbols.pop(i_maximum)
-
-        # Merge the symbols i and j
-        messages = []
-        messages.extend(symbol1.messages)
-        messages.extend(symbol2.messages)
-
-        newSymbol = Symbol(messages=messages)
-
-        # Append th new symbol to the "symbols" structure
-        symbols.append(newSymbol)
-
-        return str(newSymbol.id)
-
-    def _updateScore(self, symbols, iuid, juid, newuid, size_i, size_j, recomputeMatrixThreshold=None):
-        """Update the score of two merged clusters.
-        @param iuid: id of the first cluster merged
-        @param juid: id of the second cluster merged
-        @param newuid: new id of the merged cluster
-        @param size_i: size of the first cluster
-        @param size_j: size of the second cluster"""
+    def _computeScores(self, symbols, nbKnownSymbols=0):
+        """Computes (in C) the scores of the couples of symbols, except those
+        of couples among the nbKnownSymbols first symbols.
 
-        self._logger.debug("Update score (recompte matrix : {0})".format(recomputeMatrixThreshold))
-
-        currentScore = self.scores[iuid][juid]
-
-        # Delete row and col
-        del self.scores[iuid]
-        del self.scores[juid]
-        # Create a new col
-        self.scores[newuid] = {}
+        :return: a list of (uid1, uid2, score)
+        :raise: NetzobException if the computation has been cancelled
+        """
+        # Execute the Clustering part in C
+        debug = False
+        wrapper = WrapperArgsFactory("_libScoreComputation.computeSimilarityMatrix")
+        wrapper.typeList[wrapper.function](symbols)
+        self._logger.debug("wrapper = {0}".format(wrapper))
 
-        # Should we recompute
-        if self.lastScore is None:
-            self.lastScore = currentScore
+        listScores = _libScoreComputation.computeSimilarityMatrix(self.internalSlick, self._cb_executionStatus, self._isFinish, debug, wrapper, self.nbThread, nbKnownSymbols)
+        if self._isFinish():
+            raise NetzobException("The computation of the similarity matrix has been cancelled")
+        return listScores
+
+    def _computeCheckpointedSimilarityMatrix(self, symbols):
+        """Computes the similarity matrix reusing the scores saved in the
+        checkpoint. Scores of the other symbols are computed by blocks of
+        CHECKPOINT_NB_ROWS symbols and saved after each block."""
+        checkpoint = SimilarityMatrixCheckpoint(self.checkpointPath)
+        digests = [self._computeDigest(symbol) for symbol in symbols]
+        indexes = [checkpoint.getIndex(digest) for digest in digests]
+
+        # Symbols whose scores are all saved (the first one of each digest)
+        knownSymbols = []
+        savedDigests = set()
+        for iSymbol in xrange(len(symbols)):
+            if indexes[iSymbol] is not None and digests[iSymbol] not in savedDigests:
+                knownSymbols.append(iSymbol)
+                savedDigests.add(digests[iSymbol])
+        knownScores = checkpoint.getScores([indexes[i] for i in knownSymbols])
+        numpy.fill_diagonal(knownScores, 0)
+        # Symbols saved by different computations may miss scores with each other
+        while numpy.isnan(knownScores).any():
+            worst = numpy.argmax(numpy.isnan(knownScores).sum(axis=0))
+            del knownSymbols[worst]
+            knownScores = numpy.delete(numpy.delete(knownScores, worst, axis=0), worst, axis=1)
+
+        matrix = numpy.zeros((len(symbols), len(symbols)), dtype=numpy.float32)
+        matrix[numpy.ix_(knownSymbols, knownSymbols)] = knownScores
+        self._logger.debug("{0} symbols among {1} are already known".format(len(knownSymbols), len(symbols)))
+
+        known = set(knownSymbols)
+        newSymbols = [iSymbol for iSymbol in xrange(len(symbols)) if iSymbol not in known]
+        positions = dict((str(symbol.id), iSymbol) for (iSymbol, symbol) in enumerate(symbols))
+        for iBlock in xrange(0, len(newSymbols), self.CHECKPOINT_NB_ROWS):
+            block = newSymbols[iBlock:iBlock + self.CHECKPOINT_NB_ROWS]
+            listScores = self._computeScores([symbols[i] for i in knownSymbols + block], len(knownSymbols))
+            for (iuid, juid, score) in listScores:
+                (i, j) = (positions[iuid], positions[juid])
+                matrix[i, j] = matrix[j, i] = score
+
+            # Save the scores of the block
+            for i in block:
+                if indexes[i] is None:
+                    indexes[i] = checkpoint.getIndex(digests[i])
+                if indexes[i] is None:
+                    indexes[i] = checkpoint.addDigest(digests[i])
+                for j in knownSymbols + block:
+                    if indexes[j] is not None and indexes[j] != indexes[i]:
+                        checkpoint.setScore(indexes[i], indexes[j], matrix[i, j])
+            checkpoint.flush()
+            knownSymbols.extend(block)
+
+        uids = [str(symbol.id) for symbol in symbols]
+        scores = dict((uid, {}) for uid in uids)
+        for i in xrange(len(symbols)):
+            for j in xrange(len(symbols)):
+                if i != j:
+                    scores[uids[i]][uids[j]] = float(matrix[i, j])
+        return scores
 
-        if recomputeMatrixThreshold is None or abs(currentScore - self.lastScore) <= recomputeMatrixThreshold:
-            self._logger.debug("Ok no need in recomputing the matrix")
+    def _computeDigest(self, symbol):
+        """Returns the digest identifying the first message of the symbol (and its
+        semantic tags) in the checkpoints."""
+        message = symbol.messages[0]
+        tags = sorted((pos, str(tag)) for (pos, tag) in message.semanticTags.items())
+        return hashlib.sha1(repr((self.internalSlick, message.data, tags))).hexdigest()
+
+    def _computePhylogenicTree(self, symbols, scores, recomputeMatrixThreshold):
+        """Compute the phylogenic tree by merging the two most similar
+        clusters until their score is below the minimum equivalence.
+
+        Scores are stored in a dense matrix indexed by slots. When two
+        clusters are merged, the new one takes the slot of the first
+        one and the slot of the second one is disabled. The best
+        candidate of each slot is kept in a heap with lazy deletion:
+        an entry is outdated as soon as one of its two slots has
+        changed and is then replaced by the current best candidate of
+        its slot. Since a merged score is an average of previous scores,
+        outdated entries overestimate the scores of their slot and the
+        first valid entry of the heap is the best pair of clusters.
+
+        :param symbols: the initial symbols (one per cluster)
+        :param scores: the similarity scores of the initial symbols indexed by their uids
+        :return: the list of symbols (unmerged ones first, then merged ones in their creation order)
+
+        Merges are recorded in mergeHistory as tuples (id1, id2, score)
+        where initial symbols are identified by their index and the k-th
+        merged symbol by len(symbols) + k.
+        """
+        maxScore = 0
+        self.lastScore = None
+        self.mergeHistory = []
 
-            total_size = size_i + size_j
+        clusters = list(symbols)
+        (matrix, sizes, orders, versions) = self._buildClustersMatrix(clusters, scores)
+        nextOrder = len(clusters)
+        heap = self._buildClustersHeap(matrix, versions)
 
-            for k in self.scores.keys():
-                if k != newuid:
-                    self.scores[k][newuid] = (size_i * self.scores[k][iuid] + size_j * self.scores[k][juid]) * 1.0 / total_size
-                    del self.scores[k][iuid]
-                    del self.scores[k][juid]
-                    self.scores[newuid][k] = self.scores[k][newuid]
-        else:
-            self._logger.debug("Merge and recompute matrix similarity threshold")
-            self.scores = self.computeSimilarityMatrix(symbols)
+        best = self._popBestClusters(matrix, versions, heap)
+        if best is not None:
+            (maxScore, i_maximum, j_maximum) = best
+        while best is not None and maxScore >= self.minEquivalence:
+            self._logger.debug("Clustering {0} with {1} (score = {2})".format(str(i_maximum), str(j_maximum), str(maxScore)))
 
-        self.lastScore = currentScore
+            # Merge the symbols, the most recent one being the first
+            if orders[i_maximum] > orders[j_maximum]:
+                (symbol1, symbol2) = (clusters[i_maximum], clusters[j_maximum])
+            else:
+                (symbol1, symbol2) = (clusters[j_maximum], clusters[i_maximum])
+            messages = []
+            messages.extend(symbol1.messages)
+            messages.extend(symbol2.messages)
+            newSymbol = Symbol(messages=messages)
+            self.mergeHistory.append((orders[i_maximum], orders[j_maximum], maxScore))
+
+            (size_i, size_j) = (sizes[i_maximum], sizes[j_maximum])
+            clusters[i_maximum] = newSymbol
+            clusters[j_maximum] = None
+            sizes[i_maximum] = size_i + size_j
+            orders[i_maximum] = nextOrder
+            nextOrder += 1
+            versions[i_maximum] += 1
+            versions[j_maximum] += 1
+
+            if self.lastScore is None:
+                self.lastScore = maxScore
+
+            if recomputeMatrixThreshold is None or abs(maxScore - self.lastScore) <= recomputeMatrixThreshold:
+                # Average score of the merged clusters
+                merged = (size_i * matrix[i_maximum] + size_j * matrix[j_maximum]) / (size_i + size_j)
+                matrix[i_maximum, :] = merged
+                matrix[:, i_maximum] = merged
+                matrix[i_maximum, i_maximum] = -numpy.inf
+                matrix[j_maximum, :] = -numpy.inf
+                matrix[:, j_maximum] = -numpy.inf
+                self._pushBestCluster(matrix, versions, heap, i_maximum)
+            else:
+                self._logger.debug("Merge and recompute matrix similarity threshold")
+                remainingOrders = sorted(orders[i] for i in xrange(len(clusters)) if clusters[i] is not None)
+                clusters = self._sortClusters(clusters, orders)
+                scores = self._computeSimilarityMatrix(clusters)
+                (matrix, sizes, orders, versions) = self._buildClustersMatrix(clusters, scores)
+                orders = remainingOrders
+                heap = self._buildClustersHeap(matrix, versions)
+
+            self.lastScore = maxScore
+
+            best = self._popBestClusters(matrix, versions, heap)
+            if best is not None:
+                (maxScore, i_maximum, j_maximum) = best
+
+        return self._sortClusters(clusters, orders)
+
+    def _sortClusters(self, clusters, orders):
+        """Return the remaining clusters following their creation order."""
+        return [clusters[i] for i in sorted(xrange(len(clusters)), key=lambda i: orders[i]) if clusters[i] is not None]
+
+    def _buildClustersMatrix(self, symbols, scores):
+        """Build the dense matrix of scores of the specified symbols.
+        Diagonal is set to -inf so that a cluster is never merged with itself.
+
+        :return: a tuple (matrix, sizes, orders, versions) indexed by slots
+        """
+        nbSymbols = len(symbols)
+        uids = [str(symbol.id) for symbol in symbols]
+        matrix = numpy.empty((nbSymbols, nbSymbols), dtype=numpy.float64)
+        for i in xrange(nbSymbols):
+            symbolScores = scores.get(uids[i], {})
+            matrix[i] = [symbolScores.get(uid, -numpy.inf) for uid in uids]
+            matrix[i, i] = -numpy.inf
+        sizes = [len(symbol.messages) for symbol in symbols]
+        orders = range(nbSymbols)
+        versions = [0] * nbSymbols
+        return (matrix, sizes, orders, versions)
+
+    def _buildClustersHeap(self, matrix, versions):
+        """Create the heap containing the best candidate of each slot."""
+        heap = []
+        for i in xrange(len(versions)):
+            self._pushBestCluster(matrix, versions, heap, i)
+        return heap
+
+    def _pushBestCluster(self, matrix, versions, heap, i):
+        """Push in the heap the slot having the best score with slot i."""
+        if len(versions) < 2:
+            return
+        j = int(numpy.argmax(matrix[i]))
+        score = matrix[i, j]
+        if score == -numpy.inf:
+            return
+        heapq.heappush(heap, (-score, i, j, versions[i], versions[j]))
+
+    def _popBestClusters(self, matrix, versions, heap):
+        """Pop the best pair of slots out of the heap.
+
+        :return: a tuple (score, i, j) or None if no pair is left
+        """
+        while len(heap) > 0:
+            (negScore, i, j, version_i, version_j) = heapq.heappop(heap)
+            if versions[i] != version_i:
+                continue
+            if versions[j] != version_j:
+                # The best candidate of i has changed
+                self._pushBestCluster(matrix, versions, heap, i)
+                continue
+            return (-negScore, i, j)
+        return None
 
     def _cb_executionStatus(self, stage, donePercent, currentMessage):
         """Callback function called by the C extension to provide info on status
@@ -284,10 +559,14 @@ class ClusterByAlignment(object):
         self._logger.debug("[UPGMA status]" + str(donePercent) + "% " + str(currentMessage))
 
     def _isFinish(self):
-        """Compute if we should finish the current clustering operation.
-        :todo: always returns False, it should be exposed to the user.
-        """
-        return False
+        """Compute if we should finish the current clustering operation."""
+        return self.__cancelled
+
+    def cancel(self):
+        """Stops the computation of the similarity matrix (for instance from
+        another thread). If a checkpoint is used, the computation can be
+        resumed later with the already computed scores."""
+        self.__cancelled = True
 
     @property
     def minEquivalence(self):
@@ -326,3 +605,58 @@ class ClusterByAlignment(object):
     @recomputeMatrixThreshold.setter
     def recomputeMatrixThreshold(self, recomputeMatrixThreshold):
         self.__recomputeMatrixThreshold = recomputeMatrixThreshold
+
+    @property
+    def nbThread(self):
+        """The number of threads among which the computation of the
+        similarity matrix is spread. The python interpreter lock is
+        released while they are running.
+
+        If set to None, the number of thread will be automaticaly set to the number
+        of available cpu.
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread < 1:
+            raise ValueError("NbThread cannot be <1, use None to specify you don't know.")
+
+        self.__nbThread = nbThread
+
+    @property
+    def preClustering(self):
+        """If active, messages are first distributed in buckets following
+        their MinHash signatures so that only messages of a same bucket and
+        the representatives of the clusters found in each bucket are aligned.
+
+        :type: :class:`bool`
+        """
+        return self.__preClustering
+
+    @preClustering.setter
+    @typeCheck(bool)
+    def preClustering(self, preClustering):
+        if preClustering is None:
+            raise TypeError("Pre clustering cannot be None")
+        self.__preClustering = preClustering
+
+    @property
+    def checkpointPath(self):
+        """The file in which the similarity matrix is saved while computed
+        (see :class:`SimilarityMatrixCheckpoint`), None to not save it.
+
+        :type: :class:`str`
+        """
+        return self.__checkpointPath
+
+    @checkpointPath.setter
+    @typeCheck(str)
+    def checkpointPath(self, checkpointPath):
+        self.__checkpointPath = checkpointPath
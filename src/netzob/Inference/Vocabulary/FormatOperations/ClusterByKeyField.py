@@ -34,6 +34,7 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
+from collections import OrderedDict
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
@@ -51,7 +52,31 @@ from netzob.Common.Models.Types.HexaString import HexaString
 from netzob.Common.Models.Types.ASCII import ASCII
 from netzob.Common.Models.Types.BitArray import BitArray
 from netzob.Common.Models.Types.Raw import Raw
-from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
+
+
+def _groupRowsByKey(keyColumn):
+    """Groups the rows of a column following their value. Values are converted
+    in ASCII if they all are printable and remain distinct, in HexaString otherwise.
+
+    :param keyColumn: the raw values of the key field (one per message)
+    :return: a tuple (keyFieldType, groups) where groups is a dict of the rows indexed by their converted value
+    """
+    rawGroups = OrderedDict()
+    for iRow, keyFieldValue in enumerate(keyColumn):
+        rawGroups.setdefault(keyFieldValue, []).append(iRow)
+
+    keyFieldType = ASCII
+    for keyFieldValue in rawGroups.keys():
+        if not ASCII().canParse(TypeConverter.convert(keyFieldValue, Raw, BitArray)):
+            keyFieldType = HexaString
+            break
+    if keyFieldType == ASCII and len(set(TypeConverter.convert(keyFieldValue, Raw, ASCII) for keyFieldValue in rawGroups.keys())) < len(rawGroups):
+        keyFieldType = HexaString
+
+    groups = {}
+    for keyFieldValue, rows in rawGroups.iteritems():
+        groups[TypeConverter.convert(keyFieldValue, Raw, keyFieldType)] = rows
+    return (keyFieldType, groups)
 
 
 @NetzobLogger
@@ -100,63 +125,42 @@ class ClusterByKeyField(object):
         if keyField not in field.fields:
             raise TypeError("'keyField' is not a child of 'field'")
 
+        (messages, columns) = self._computeColumns(field)
+        iKeyField = field.fields.index(keyField)
+        (keyFieldType, groups) = _groupRowsByKey(columns[iKeyField])
+
         newSymbols = {}
+        for newSymbolKeyValue, rows in groups.iteritems():
+            symbolName = "Symbol_{0}".format(newSymbolKeyValue)
+            newSymbol = Symbol(name=symbolName, messages=[messages[iRow] for iRow in rows])
 
-        keyFieldMessageValues = keyField.getMessageValues(encoded=False, styled=False)
-        newSymbolsSplittedMessages = {}
-
-        # we identify what would be the best type of the key field
-        keyFieldType = ASCII
-        for message, keyFieldValue in keyFieldMessageValues.iteritems():
-            if not ASCII().canParse(TypeConverter.convert(keyFieldValue, Raw, BitArray)):
-                keyFieldType = HexaString
-                break
-
-        # we create a symbol for each of these uniq values
-        for message, keyFieldValue in keyFieldMessageValues.iteritems():
-            keyFieldValue = TypeConverter.convert(keyFieldValue, Raw, keyFieldType)
-            if keyFieldValue not in newSymbols.keys():
-                symbolName = "Symbol_{0}".format(keyFieldValue)
-                newSymbols[keyFieldValue] = Symbol(name=symbolName, messages=[message])
-                splittedMessages = DataAlignment.align([message.data], field, encoded=False)
-                newSymbolsSplittedMessages[keyFieldValue] = [splittedMessages[0]]
-            else:
-                newSymbols[keyFieldValue].messages.append(message)
-                splittedMessages = DataAlignment.align([message.data], field, encoded=False)
-                newSymbolsSplittedMessages[keyFieldValue].append(splittedMessages[0])
-        for newSymbolKeyValue, newSymbol in newSymbols.iteritems():
             # we recreate the same fields in this new symbol as the fields that exist in the original symbol
+            # except the endless fields that accepts no values
+            lastFieldWithValue = 0
+            for i in xrange(len(field.fields)):
+                if any(columns[i][iRow] != '' for iRow in rows):
+                    lastFieldWithValue = i
             newSymbol.clearFields()
-            for i, f in enumerate(field.fields):
-                if f == keyField:
-                    newFieldDomain = TypeConverter.convert(newSymbolKeyValue, keyFieldType, Raw)
-                else:
-                    newFieldDomain = set()
-                    for j in range(len(newSymbolsSplittedMessages[newSymbolKeyValue])):
-                        newFieldDomain.add(newSymbolsSplittedMessages[newSymbolKeyValue][j][i])
-                    newFieldDomain = list(newFieldDomain)
-                newF = Field(name=f.name, domain=newFieldDomain)
-                newF.parent = newSymbol
-                newSymbol.fields.append(newF)
-
-            # we remove endless fields that accepts no values
-            cells = newSymbol.getCells()
-            max_i_cell_with_value = 0
-            for line in cells:
-                for i_cell, cell in enumerate(line):
-                    if cell != '' and max_i_cell_with_value < i_cell:
-                        max_i_cell_with_value = i_cell
-            newSymbol.clearFields()
-            for i, f in enumerate(field.fields[:max_i_cell_with_value + 1]):
+            for i, f in enumerate(field.fields[:lastFieldWithValue + 1]):
                 if f == keyField:
                     newFieldDomain = TypeConverter.convert(newSymbolKeyValue, keyFieldType, Raw)
                 else:
-                    newFieldDomain = set()
-                    for j in range(len(newSymbolsSplittedMessages[newSymbolKeyValue])):
-                        newFieldDomain.add(newSymbolsSplittedMessages[newSymbolKeyValue][j][i])
-                    newFieldDomain = list(newFieldDomain)
+                    newFieldDomain = list(set(columns[i][iRow] for iRow in rows))
                 newF = Field(name=f.name, domain=newFieldDomain)
                 newF.parent = newSymbol
                 newSymbol.fields.append(newF)
+            newSymbols[newSymbolKeyValue] = newSymbol
 
         return newSymbols
+
+    def _computeColumns(self, field):
+        """Returns a read-only snapshot of the alignment of the messages
+        with the fields, column by column.
+
+        :return: a tuple (messages, columns) where columns[i][j] is the raw value of the i-th field in the j-th message
+        """
+        messages = tuple(field.messages)
+        if len(messages) == 0:
+            return (messages, tuple(tuple() for f in field.fields))
+        cells = field.getCells(encoded=False, styled=False, transposed=False)
+        return (messages, tuple(zip(*cells)))
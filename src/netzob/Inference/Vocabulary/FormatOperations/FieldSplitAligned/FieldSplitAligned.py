@@ -35,6 +35,8 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports
 #+---------------------------------------------------------------------------+
+from collections import OrderedDict
+import multiprocessing
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
@@ -48,10 +50,32 @@ from netzob.Common.Models.Types.HexaString import HexaString
 from netzob.Common.Models.Types.Raw import Raw
 from netzob.Common.Models.Vocabulary.Field import Field
 from netzob.Common.Models.Vocabulary.Messages.AbstractMessage import AbstractMessage
+from netzob.Common.Models.Vocabulary.Messages.RawMessage import RawMessage
+from netzob.Common.Models.Vocabulary.Symbol import Symbol
+from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
 from netzob.Inference.Vocabulary.Search.SearchEngine import SearchEngine
+from netzob.Inference.Vocabulary.FormatOperations.ClusterByAlignment import ClusterByAlignment
 from netzob import _libNeedleman
 
 
+def _ignoreExecutionStatus(stage, donePercent, currentMessage):
+    pass
+
+
+def _alignProfiles(args):
+    """Aligns a list of values or of previously computed alignments
+    (executed in the processes of the pool).
+
+    :param args: a tuple (doInternalSlick, profiles) where profiles is a list of
+                 (data, tags) or (alignment, tags, mask)
+    :return: the result of _libNeedleman.alignMessages
+    """
+    (doInternalSlick, profiles) = args
+    wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
+    wrapper.typeList[wrapper.function](profiles)
+    return _libNeedleman.alignMessages(doInternalSlick, _ignoreExecutionStatus, False, wrapper)
+
+
 @NetzobLogger
 class FieldSplitAligned(object):
     """This class align the data attached to a specified field
@@ -139,15 +163,66 @@ class FieldSplitAligned(object):
     'Mathieu' | '-0' | '90' | '8' | '070605' | '-' | '31 rue de Paris, 75000 Paris, France'           | '-' | 'mat@yahoo.fr'            
     'Olivia'  | '-0' | '34' | '8' | '234556' | '-' | '7 allee des peupliers, 13000 Marseille, France' | '-' | 'olivia.tortue@hotmail.fr'
 
+    By default, values are folded one after another in a single
+    alignment. With a guide tree, values are aligned following the
+    UPGMA tree of their similarities: the most similar values are
+    aligned first and the alignments of the subtrees are then aligned
+    together (in parallel on nbThread processes).
+
+    >>> samples = ["hello toto, what's up in France ?", "hello netzob, what's up in UK ?", "hello sygus, what's up in Germany ?", "hello toto, what's up in Spain ?"]
+    >>> messages = [RawMessage(data=sample) for sample in samples]
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(guideTree=True, nbThread=2)
+    >>> fs.execute(symbol, useSemantic=False)
+    >>> print symbol
+    'hello ' | 'toto'   | ", what's up in " | 'France'  | ' ?'
+    'hello ' | 'netzob' | ", what's up in " | 'UK'      | ' ?'
+    'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?'
+    'hello ' | 'toto'   | ", what's up in " | 'Spain'   | ' ?'
+
+    On large fields, a sample of sampleSize distinct values can be
+    aligned instead of all the values. Values that cannot be parsed
+    by the fields built from the sample are then added to the
+    alignment.
+
+    >>> messages = [RawMessage(data="hello {0}, what's up in {1} ?".format(pseudo, city)) for pseudo in ["zoby", "ditrich", "toto", "carlito"] for city in ["Paris", "Munich", "Barcelone", "Vienne"]]
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(sampleSize=4)
+    >>> fs.execute(symbol, useSemantic=False)
+    >>> len(symbol.fields)
+    5
+    >>> len(symbol.getCells())
+    16
+
+    Identical values can be aligned only once. The alignment is faster on redundant
+    values but can differ from the alignment of all the values.
+
+    >>> messages = [RawMessage(data=data) for data in ["hello netzob", "hello zoby", "hello netzob", "hello netzob"]]
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(deduplicate=True)
+    >>> fs.execute(symbol, useSemantic=False)
+    >>> print symbol
+    'hello ' | 'net' | 'zob' | '' 
+    'hello ' | ''    | 'zob' | 'y'
+    'hello ' | 'net' | 'zob' | '' 
+    'hello ' | 'net' | 'zob' | '' 
 
     """
 
-    def __init__(self, unitSize=AbstractType.UNITSIZE_8, doInternalSlick=False):
+    def __init__(self, unitSize=AbstractType.UNITSIZE_8, doInternalSlick=False, guideTree=False, sampleSize=None, nbThread=None, deduplicate=False):
         """Constructor.
 
+        :keyword nbThread: the number of processes among which the alignments of the subtrees of the guide tree are spread, all the available cpu if None
+        :type nbThread: :class:`int`
+        :keyword deduplicate: if True, identical values are only aligned once
+        :type deduplicate: :class:`bool`
         """
         self.doInternalSlick = doInternalSlick
         self.unitSize = unitSize
+        self.guideTree = guideTree
+        self.sampleSize = sampleSize
+        self.nbThread = nbThread
+        self.deduplicate = deduplicate
 
     @typeCheck(AbstractField, bool)
     def execute(self, field, useSemantic=True):
@@ -178,7 +253,10 @@ class FieldSplitAligned(object):
             return
 
         # Execute the alignement
-        (alignment, semanticTags, score) = self._alignData(messageValues.values(), semanticTags)
+        if self.sampleSize is not None and len(set(messageValues.values())) > self.sampleSize:
+            (alignment, semanticTags, score) = self._alignSampledData(field, messageValues.values(), semanticTags)
+        else:
+            (alignment, semanticTags, score) = self._alignData(messageValues.values(), semanticTags)
 
         # Check the results
         if alignment is None:
@@ -355,12 +433,28 @@ class FieldSplitAligned(object):
 
         # Prepare the argument to send to the C wrapper
         toSend = [(''.join(values[iValue]), semanticTags[iValue]) for iValue in xrange(len(values))]
+        if self.deduplicate:
+            # Identical values (with identical tags) are only sent once: this
+            # approximates the alignment of all the values as duplicates
+            # weight the tie-breaks between equivalent alignments.
+            distinctValues = []
+            alreadySent = set()
+            for (value, tags) in toSend:
+                key = (value, tuple(sorted(tags.items())))
+                if key not in alreadySent:
+                    alreadySent.add(key)
+                    distinctValues.append((value, tags))
+            self._logger.debug("{0} distinct values to align among {1}".format(len(distinctValues), len(toSend)))
+            toSend = distinctValues
+
+        if self.guideTree and len(toSend) > 2:
+            (score1, score2, score3, regex, mask, semanticTags) = self._alignWithGuideTree(toSend)
+        else:
+            wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
+            wrapper.typeList[wrapper.function](toSend)
 
-        wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
-        wrapper.typeList[wrapper.function](toSend)
-
-        debug = False
-        (score1, score2, score3, regex, mask, semanticTags) = _libNeedleman.alignMessages(self.doInternalSlick, self._cb_executionStatus, debug, wrapper)
+            debug = False
+            (score1, score2, score3, regex, mask, semanticTags) = _libNeedleman.alignMessages(self.doInternalSlick, self._cb_executionStatus, debug, wrapper)
         scores = (score1, score2, score3)
 
         # Deserialize returned info
@@ -369,6 +463,111 @@ class FieldSplitAligned(object):
 
         return (alignment, semanticTags, scores)
 
+    def _alignWithGuideTree(self, values):
+        """Progressive alignment of the values following the UPGMA tree
+        computed over their similarity scores. Alignments of independent
+        subtrees are computed in parallel.
+
+        :param values: a list of tuples (data, tags)
+        :return: the result of _libNeedleman.alignMessages for the root of the tree
+        """
+        # Build the guide tree
+        symbols = []
+        for (data, tags) in values:
+            message = RawMessage(data=data)
+            for pos, tag in tags.items():
+                message.addSemanticTag(pos, tag)
+            symbols.append(Symbol(messages=[message]))
+        clustering = ClusterByAlignment(minEquivalence=0, nbThread=self.nbThread)
+        scores = clustering._computeSimilarityMatrix(symbols)
+        clustering._computePhylogenicTree(symbols, scores, None)
+
+        # Profiles of the nodes of the tree, leaves being the values
+        profiles = dict(enumerate(values))
+        results = dict()
+        pendingMerges = [(len(values) + iMerge, id1, id2) for (iMerge, (id1, id2, score)) in enumerate(clustering.mergeHistory)]
+
+        pool = None
+        if self.nbThread > 1:
+            pool = multiprocessing.Pool(self.nbThread)
+        try:
+            while len(pendingMerges) > 0:
+                # Merges whose two subtrees are already aligned
+                readyMerges = [merge for merge in pendingMerges if merge[1] in profiles and merge[2] in profiles]
+                pendingMerges = [merge for merge in pendingMerges if merge not in readyMerges]
+                jobs = [(self.doInternalSlick, [profiles[id1], profiles[id2]]) for (nodeId, id1, id2) in readyMerges]
+                if pool is not None and len(jobs) > 1:
+                    alignments = pool.map(_alignProfiles, jobs)
+                else:
+                    alignments = [_alignProfiles(job) for job in jobs]
+
+                for ((nodeId, id1, id2), result) in zip(readyMerges, alignments):
+                    del profiles[id1]
+                    del profiles[id2]
+                    profiles[nodeId] = self._toProfile(result)
+                    results[nodeId] = result
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        return results[max(results.keys())]
+
+    def _toProfile(self, result):
+        """Converts an alignment returned by _libNeedleman.alignMessages
+        in a tuple (alignment, tags, mask) that can be aligned again."""
+        (score1, score2, score3, alignment, mask, semanticTags) = result
+        tags = dict()
+        for (iTag, tag) in enumerate(semanticTags.split(';')[:len(alignment)]):
+            if tag != "None":
+                tags[iTag * 2] = tag
+        return (alignment, tags, mask)
+
+    def _alignSampledData(self, field, values, semanticTags=None):
+        """Aligns a sample of sampleSize distinct values evenly spread over
+        the values. Values that cannot be parsed with the fields created
+        following this alignment are added to the sample, until all the
+        values are parsed.
+
+        :return: the alignment, its score and the semantic tags
+        :rtype: a tupple (alignement, semanticTags, score)
+        """
+        if semanticTags is None:
+            semanticTags = [dict() for v in values]
+
+        distinctValues = OrderedDict()
+        for (value, tags) in zip(values, semanticTags):
+            distinctValues.setdefault(''.join(value), tags)
+        allValues = distinctValues.keys()
+
+        step = float(len(allValues)) / self.sampleSize
+        sampleIndexes = set(int(i * step) for i in xrange(self.sampleSize))
+        sample = [allValues[i] for i in sorted(sampleIndexes)]
+        remainingValues = [allValues[i] for i in xrange(len(allValues)) if i not in sampleIndexes]
+
+        while True:
+            self._logger.debug("Align a sample of {0} values among {1}".format(len(sample), len(allValues)))
+            result = self._alignData(sample, [distinctValues[value] for value in sample])
+            if len(remainingValues) == 0:
+                return result
+
+            # Map the other values on the fields built from the alignment
+            self._updateFieldsFromAlignment(field, result[0], result[1])
+            unmappedValues = [value for value in remainingValues if not self.__isParsable(field, value)]
+            if len(unmappedValues) == 0:
+                return result
+            sample.extend(unmappedValues)
+            unmappedValues = set(unmappedValues)
+            remainingValues = [value for value in remainingValues if value not in unmappedValues]
+
+    def __isParsable(self, field, value):
+        """Returns True if the value can be parsed by the field."""
+        try:
+            DataAlignment.align([value], field, encoded=False)
+        except Exception:
+            return False
+        return True
+
     @typeCheck(AbstractMessage)
     def __searchApplicativeDataInMessage(self, message):
         """This internal method search any applicative data that could be identified
@@ -656,3 +855,79 @@ class FieldSplitAligned(object):
         if unitSize not in AbstractType.supportedUnitSizes():
             raise TypeError("Specified unitsize is not supported, refers to AbstractType.supportedUnitSizes() for the list.")
         self.__unitSize = unitSize
+
+    @property
+    def guideTree(self):
+        """If True, values are aligned following the UPGMA tree of their similarity
+        instead of being folded one after another.
+
+        :type: :class:`bool`
+        """
+        return self.__guideTree
+
+    @guideTree.setter
+    @typeCheck(bool)
+    def guideTree(self, guideTree):
+        if guideTree is None:
+            raise TypeError("guideTree cannot be None")
+        self.__guideTree = guideTree
+
+    @property
+    def sampleSize(self):
+        """The number of distinct values to align, None to align all of them.
+        The other values are mapped on the fields built from the alignment.
+
+        :type: :class:`int`
+        """
+        return self.__sampleSize
+
+    @sampleSize.setter
+    @typeCheck(int)
+    def sampleSize(self, sampleSize):
+        if sampleSize is not None and sampleSize < 2:
+            raise ValueError("sampleSize cannot be <2, use None to align all the values.")
+        self.__sampleSize = sampleSize
+
+    @property
+    def deduplicate(self):
+        """If True, identical values (with identical semantic tags) are only aligned once.
+        It speeds up the alignment of redundant values but the resulting alignment
+        can differ from the alignment of all the values.
+
+        :type: :class:`bool`
+        """
+        return self.__deduplicate
+
+    @deduplicate.setter
+    @typeCheck(bool)
+    def deduplicate(self, deduplicate):
+        if deduplicate is None:
+            raise TypeError("Deduplicate cannot be None")
+        self.__deduplicate = deduplicate
+
+    @property
+    def nbThread(self):
+        """The number of processes among which the alignments of the subtrees
+        of the guide tree are spread.
+
+        If set to None, the number of processes will be automaticaly set to the number
+        of available cpu.
+
+        >>> import multiprocessing
+        >>> FieldSplitAligned(nbThread=None).nbThread == multiprocessing.cpu_count()
+        True
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread < 1:
+            raise ValueError("NbThread cannot be <1, use None to specify you don't know.")
+
+        self.__nbThread = nbThread
@@ -203,7 +203,7 @@ class FieldSplitStatic(object):
 
         if field is None:
             raise TypeError("The field cannot be None")
-        fieldValues = [TypeConverter.convert(data, Raw, HexaString) for data in field.getValues(encoded=False)]
+        fieldValues = TypeConverter.convertMany(field.getValues(encoded=False), Raw, HexaString)
 
         if len(fieldValues) == 0:
             raise Exception("No value found in the field.")
@@ -34,6 +34,7 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
+import multiprocessing
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
@@ -45,14 +46,35 @@
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Common.Models.Vocabulary.AbstractField import AbstractField
 from netzob.Common.Utils.NetzobRegex import NetzobStaticRegex
+from netzob.Inference.Vocabulary.FormatOperations.ClusterByKeyField import ClusterByKeyField, _groupRowsByKey
+
+
+def _computeKeyDistribution(keyColumn):
+    """Computes the clusters a key field would create given its values
+    (executed in the processes of the pool).
+
+    :return: a tuple (nbClusters, distribution)
+    """
+    (keyFieldType, groups) = _groupRowsByKey(keyColumn)
+    return (len(groups), [len(rows) for rows in groups.values()])
 
 
 @NetzobLogger
 class FindKeyFields(object):
     """This class provides methods to identify potential key fields in
     symbols/fields.
+
+    Messages are aligned once with the fields and the candidate key
+    fields are evaluated on the resulting columns, in parallel on
+    nbThread processes if more than one is specified.
     """
 
+    # Minimum number of candidate key fields to evaluate them in parallel
+    MIN_CANDIDATES_PER_POOL = 4
+
+    def __init__(self, nbThread=1):
+        self.nbThread = nbThread
+
     @typeCheck(AbstractField)
     def execute(self, field):
         """Try to identify potential key fields in a symbol/field.
@@ -82,6 +104,8 @@ class FindKeyFields(object):
         Field name: Field-1, number of clusters: 5, distribution: [2, 1, 2, 2, 1]
         Field name: Field-2, number of clusters: 1, distribution: [8]
         Field name: Field-3, number of clusters: 2, distribution: [1, 7]
+        >>> FindKeyFields(nbThread=2).execute(symbol) == FindKeyFields(nbThread=1).execute(symbol)
+        True
 
         :param field: the field in which we want to identify key fields.
         :type field: :class:`netzob.Common.Models.Vocabulary.AbstractField.AbstractField`
@@ -95,8 +119,7 @@ class FindKeyFields(object):
             return []
 
         results = []
-        cells = field.getCells(encoded=False, styled=False, transposed=False)
-        columns = zip(*cells)
+        (messages, columns) = ClusterByKeyField()._computeColumns(field)
 
         # Retrieve dynamic fields with fixed size
         for (i, f) in enumerate(field.fields):
@@ -111,13 +134,42 @@ class FindKeyFields(object):
                     results.append({"keyField": f})
 
         # Compute clusters according to each key field found
-        from netzob.Inference.Vocabulary.Format import Format
-        for result in results:
-            tmpClusters = Format.clusterByKeyField(field, result["keyField"])
-            result["nbClusters"] = len(tmpClusters)
-            distrib = []  # Compute clusters distribution
-            for cluster in tmpClusters.values():
-                distrib.append(len(cluster.messages))
-            result["distribution"] = distrib
+        keyColumns = [columns[field.fields.index(result["keyField"])] for result in results]
+        if self.nbThread > 1 and len(keyColumns) >= self.MIN_CANDIDATES_PER_POOL:
+            pool = multiprocessing.Pool(min(self.nbThread, len(keyColumns)))
+            try:
+                distributions = pool.map(_computeKeyDistribution, keyColumns)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            distributions = [_computeKeyDistribution(keyColumn) for keyColumn in keyColumns]
+
+        for (result, (nbClusters, distribution)) in zip(results, distributions):
+            result["nbClusters"] = nbClusters
+            result["distribution"] = distribution
 
         return results
+
+    @property
+    def nbThread(self):
+        """The number of processes among which the candidate key fields are
+        evaluated (1 by default).
+
+        If set to None, the number of processes will be automaticaly set to the number
+        of available cpu.
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread < 1:
+            raise ValueError("NbThread cannot be <1, use None to specify you don't know.")
+
+        self.__nbThread = nbThread
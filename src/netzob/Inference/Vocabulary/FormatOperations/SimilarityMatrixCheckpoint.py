@@ -0,0 +1,152 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2014 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+import os
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+import numpy
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+
+
+@NetzobLogger
+class SimilarityMatrixCheckpoint(object):
+    """Similarity scores between messages saved on disk so that an
+    interrupted computation can be resumed and that a later computation
+    over some of the same messages can reuse them.
+
+    Messages are identified by a digest. Scores are stored in a memory-mapped
+    matrix (a numpy file at path) whose rows follow the digests listed in
+    the file path + ".digests". Unknown scores are NaN. Scores are written on disk
+    with flush(), digests being written after the scores they refer to.
+
+    >>> import os, shutil, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> checkpoint = SimilarityMatrixCheckpoint(os.path.join(directory, "scores"))
+    >>> [checkpoint.addDigest(digest) for digest in ["a", "b", "c"]]
+    [0, 1, 2]
+    >>> checkpoint.setScore(0, 1, 75.0)
+    >>> checkpoint.setScore(1, 2, 50.0)
+    >>> checkpoint.flush()
+    >>> checkpoint = SimilarityMatrixCheckpoint(os.path.join(directory, "scores"))
+    >>> checkpoint.getIndex("b"), checkpoint.getIndex("d")
+    (1, None)
+    >>> checkpoint.getScores([1, 0, 2]).tolist()
+    [[nan, 75.0, 50.0], [75.0, nan, nan], [50.0, nan, nan]]
+    >>> shutil.rmtree(directory)
+
+    """
+
+    # Number of rows of a new matrix, it is doubled when full
+    INITIAL_CAPACITY = 64
+
+    @typeCheck(str)
+    def __init__(self, path):
+        self.path = path
+        self.digestsPath = path + ".digests"
+        self.__digests = []
+        self.__indexes = dict()
+        self.__nbSavedDigests = 0
+
+        if os.path.exists(self.path) and os.path.exists(self.digestsPath):
+            self.__matrix = numpy.load(self.path, mmap_mode='r+')
+            with open(self.digestsPath, 'r') as digestsFile:
+                digests = [line.strip() for line in digestsFile if len(line.strip()) > 0]
+            for digest in digests[:self.__matrix.shape[0]]:
+                self.__indexes[digest] = len(self.__digests)
+                self.__digests.append(digest)
+            self.__nbSavedDigests = len(self.__digests)
+            self._logger.debug("Resume from {0} known messages".format(len(self.__digests)))
+        else:
+            self.__matrix = self.__createMatrix(self.path, self.INITIAL_CAPACITY)
+            open(self.digestsPath, 'w').close()
+
+    def getIndex(self, digest):
+        """Returns the index of the digest in the matrix or None if it is unknown."""
+        return self.__indexes.get(digest)
+
+    def addDigest(self, digest):
+        """Registers a new digest and returns its index in the matrix.
+        Its scores are unknown."""
+        if digest in self.__indexes:
+            raise ValueError("Digest {0} is already registered".format(digest))
+        index = len(self.__digests)
+        if index >= self.__matrix.shape[0]:
+            self.__grow(2 * self.__matrix.shape[0])
+        # clear scores possibly written before an interruption
+        self.__matrix[index, :] = numpy.nan
+        self.__matrix[:, index] = numpy.nan
+        self.__indexes[digest] = index
+        self.__digests.append(digest)
+        return index
+
+    def getScores(self, indexes):
+        """Returns the matrix of the scores between the specified indexes."""
+        return numpy.array(self.__matrix[numpy.ix_(indexes, indexes)])
+
+    def setScore(self, i, j, score):
+        self.__matrix[i, j] = score
+        self.__matrix[j, i] = score
+
+    def flush(self):
+        """Writes the scores and then the new digests on disk."""
+        self.__matrix.flush()
+        with open(self.digestsPath, 'a') as digestsFile:
+            for digest in self.__digests[self.__nbSavedDigests:]:
+                digestsFile.write(digest + "\n")
+        self.__nbSavedDigests = len(self.__digests)
+
+    def __createMatrix(self, path, capacity):
+        matrix = numpy.lib.format.open_memmap(path, mode='w+', dtype=numpy.float32, shape=(capacity, capacity))
+        matrix[:] = numpy.nan
+        return matrix
+
+    def __grow(self, capacity):
+        self._logger.debug("Grow the similarity matrix to {0} rows".format(capacity))
+        tmpPath = self.path + ".tmp"
+        size = self.__matrix.shape[0]
+        matrix = self.__createMatrix(tmpPath, capacity)
+        matrix[:size, :size] = self.__matrix
+        matrix.flush()
+        del matrix
+        del self.__matrix
+        os.rename(tmpPath, self.path)
+        self.__matrix = numpy.load(self.path, mmap_mode='r+')
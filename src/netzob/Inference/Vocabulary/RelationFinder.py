@@ -31,6 +31,11 @@
 import uuid
 import math
 
+#+----------------------------------------------
+#| Related third party imports
+#+----------------------------------------------
+import numpy
+
 #+----------------------------------------------
 #| Local Imports
 #+----------------------------------------------
@@ -137,44 +142,72 @@ class RelationFinder(object):
     @typeCheck(AbstractField)
     def executeOnSymbol(self, symbol):
         """Find exact relations between fields of the provided symbol.
+
+        Rows of attribute values are grouped by hashing their content: only the rows
+        of a same group are equal and thus related.
+
+        >>> import binascii
+        >>> from netzob.all import *
+        >>> samples = ["0007ff2f000000000000", "0011ffaaaaaaaaaaaaaabbcc0010000000000000", "0012ffddddddddddddddddddddfe1f000000000000"]
+        >>> messages = [RawMessage(data=binascii.unhexlify(sample)) for sample in samples]
+        >>> symbol = Symbol(messages=messages)
+        >>> Format.splitStatic(symbol)
+        >>> rels = RelationFinder.findOnSymbol(symbol)
+        >>> for rel in rels:
+        ...     print rel["relation_type"] + " between " + ",".join([f.name for f in rel["x_fields"]]) + ":" + rel["x_attribute"] + \
+                " and " + ",".join([f.name for f in rel["y_fields"]]) + ":" + rel["y_attribute"]
+        SizeRelation between Field-0,Field-1:value and Field-3:size
+        SizeRelation between Field-1:value and Field-3:size
         """
 
         (attributeValues_headers, attributeValues) = self._generateAttributeValuesForSymbol(symbol)
         results = []
 
-        for i, x_values in enumerate(attributeValues[:-1]):
-            for j, y_values in enumerate(attributeValues[:]):
-                if j <= i:
-                    continue
-                isRelation = True
-                for k in range(len(x_values)):
-                    if not (x_values[k] == y_values[k]):
-                        isRelation = False
-                        break
-                if isRelation:
-                    # Do no keep relations where a field's values does not change
-                    if len(set(x_values)) == 1 or len(set(y_values)) == 1:
-                        continue
-                    (x_fields, x_attribute) = attributeValues_headers[i]
-                    (y_fields, y_attribute) = attributeValues_headers[j]
-                    # The relation should not apply on the same field
-                    if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[0].id == y_fields[0].id:
-                        continue
-                    relation_type = self._findRelationType(x_attribute, y_attribute)
-                    # We do not consider unqualified relation (for example, the size of a field is linked to the size of another field)
-                    if relation_type == self.REL_UNKNOWN:
-                        continue
-                    # DataRelation should produce an empty intersection between related fields
-                    if relation_type == self.REL_DATA and len(set(x_fields).intersection(set(y_fields))) > 0:
-                        continue
-                    self._logger.debug("Relation found between '" + str(x_fields) + ":" + x_attribute + "' and '" + str(y_fields) + ":" + y_attribute + "'")
-                    id_relation = str(uuid.uuid4())
-                    results.append({'id': id_relation,
-                                    "relation_type": relation_type,
-                                    'x_fields': x_fields,
-                                    'x_attribute': x_attribute,
-                                    'y_fields': y_fields,
-                                    'y_attribute': y_attribute})
+        if len(attributeValues) == 0:
+            return results
+
+        # Do no keep relations where a field's values does not change
+        isConstant = (attributeValues == attributeValues[:, :1]).all(axis=1)
+
+        # group equal rows of values
+        groups = dict()
+        for i in xrange(len(attributeValues)):
+            if isConstant[i]:
+                continue
+            if attributeValues.dtype == object:
+                key = tuple(attributeValues[i])
+            else:
+                key = attributeValues[i].tostring()
+            groups.setdefault(key, []).append(i)
+
+        candidates = []
+        for rows in groups.values():
+            for (k, i) in enumerate(rows):
+                for j in rows[k + 1:]:
+                    candidates.append((i, j))
+        candidates.sort()
+
+        for (i, j) in candidates:
+            (x_fields, x_attribute) = attributeValues_headers[i]
+            (y_fields, y_attribute) = attributeValues_headers[j]
+            # The relation should not apply on the same field
+            if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[0].id == y_fields[0].id:
+                continue
+            relation_type = self._findRelationType(x_attribute, y_attribute)
+            # We do not consider unqualified relation (for example, the size of a field is linked to the size of another field)
+            if relation_type == self.REL_UNKNOWN:
+                continue
+            # DataRelation should produce an empty intersection between related fields
+            if relation_type == self.REL_DATA and len(set(x_fields).intersection(set(y_fields))) > 0:
+                continue
+            self._logger.debug("Relation found between '" + str(x_fields) + ":" + x_attribute + "' and '" + str(y_fields) + ":" + y_attribute + "'")
+            id_relation = str(uuid.uuid4())
+            results.append({'id': id_relation,
+                            "relation_type": relation_type,
+                            'x_fields': x_fields,
+                            'x_attribute': x_attribute,
+                            'y_fields': y_fields,
+                            'y_attribute': y_attribute})
         return results
 
     @typeCheck(AbstractField, AbstractField, str, str)
@@ -264,41 +297,61 @@ class RelationFinder(object):
             return False
 
     def _generateAttributeValuesForSymbol(self, symbol):
-        # First we compute the possible list of payloads
-        lines_data = []
+        """Computes a matrix of attribute values: each row contains the values (or the sizes)
+        of the concatenation of consecutive fields in each message.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage("\\x02ab"), RawMessage("\\x03abc")]
+        >>> symbol = Symbol([Field(Raw(nbBytes=1)), Field(Raw(nbBytes=(2, 3)))], messages=messages)
+        >>> (headers, values) = RelationFinder()._generateAttributeValuesForSymbol(symbol)
+        >>> for ((fields, attribute), row) in zip(headers, values):
+        ...     print len(fields), attribute, list(row)
+        1 value [2, 3]
+        1 size [1, 1]
+        2 value [0, 56713827]
+        2 size [3, 4]
+        1 value [24930, 0]
+        1 size [2, 3]
+
+        :return: the list of (fields, attribute) describing each row and the matrix of values
+        :rtype: a tuple (list, :class:`numpy.ndarray`)
+        """
         line_header = []
+        lines_data = []
 
         # Compute the list of values for each field
         (fields, fieldsValues) = self._getAllFieldsValues(symbol)
+        if len(fieldsValues) == 0:
+            return (line_header, numpy.array(lines_data))
+
+        # cumulated sizes of the fields in each message
+        sizes = numpy.array([[len(data) for data in fieldValues] for fieldValues in fieldsValues], dtype=numpy.int64)
+        cumulatedSizes = numpy.vstack([numpy.zeros((1, sizes.shape[1]), dtype=numpy.int64), numpy.cumsum(sizes, axis=0)])
 
         # Compute the table of concatenation of values
         for i in range(len(fieldsValues[:])):
+            # data values only depend on the first 8 bytes of the concatenation
+            prefixes = ["" for data in fieldsValues[i]]
+            dataValues = None
             for j in range(i+1, len(fieldsValues)+1):
-                # We generate the data
-                concatCellsData = self._generateConcatData(fieldsValues[i:j])
+                if dataValues is None or any([len(prefix) < 8 for prefix in prefixes]):
+                    prefixes = [(prefix + data)[:8] for (prefix, data) in zip(prefixes, fieldsValues[j - 1])]
+                    dataValues = self._generateDataValues(prefixes)
 
                 # We generate lines and header for fields values
                 line_header.append((fields[i:j], self.ATTR_VALUE))
-                lines_data.append(self._generateDataValues(concatCellsData))
+                lines_data.append(dataValues)
 
-                # We generate lines and header for fields values
+                # We generate lines and header for fields sizes
                 line_header.append((fields[i:j], self.ATTR_SIZE))
-                lines_data.append(self._generateSizeValues(concatCellsData))
-
-        # # # Now we generate values for fields sizes
-        # # (multipleSize_Header, multipleSize_lines) = self._generateSizeFieldFromBeginingOfField(symbol)
-        # # line_header.extend(multipleSize_Header)
-        # # for i_line in range(0, len(lines)):
-        # #     lines[i_line] = lines[i_line] + "," + multipleSize_lines[i_line]
-
-        # # # Now we generate values for CRC32
-        # # (crc32Header, crc32Lines) = self._generateCRC32(symbol)
-        # # line_header.extend(crc32Header)
-        # # for i_line in range(0, len(lines)):
-        # #     line = lines[i_line]
-        # #     lines[i_line] = line + "," + crc32Lines[i_line]
-
-        return (line_header, lines_data)
+                lines_data.append(cumulatedSizes[j] - cumulatedSizes[i])
+
+        try:
+            matrix = numpy.array(lines_data, dtype=numpy.int64)
+        except OverflowError:
+            matrix = numpy.array(lines_data, dtype=object)
+
+        return (line_header, matrix)
 
     def _getAllFieldsValues(self, field):
         # This recursive function returns a tuple containing
@@ -48,9 +48,11 @@ from netzob.Inference.Vocabulary.FormatOperations.FieldSplitStatic import FieldS
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByKeyField
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByApplicativeData
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByAlignment
+from netzob.Inference.Vocabulary.FormatOperations import SimilarityMatrixCheckpoint
 from netzob.Inference.Vocabulary.FormatOperations import ClusterBySize
 from netzob.Inference.Vocabulary.FormatOperations import FindKeyFields
 from netzob.Common.Utils import SortedTypedList
+from netzob.Common.C_Extensions import WrapperArgsFactory
 
 from netzob.Inference.Vocabulary.Search import SearchTask
 from netzob.Inference.Vocabulary.Search import SearchResult
@@ -63,7 +65,12 @@ from netzob.Common.Models.Vocabulary.Domain.Specializer.VariableSpecializer impo
 from netzob.Common.Models.Vocabulary.Domain.Variables.SVAS import SVAS
 
 from netzob.Common.Models.Vocabulary.Domain.Parser.MessageParser import MessageParser
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+from netzob.Common.Models.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+from netzob.Common.Models.Vocabulary.Domain.Parser.ParsingStrategy import ParsingStrategy
 from netzob.Common.Models.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
+from netzob.Common.Models.Vocabulary.Domain.Specializer.SpecializingPlan import SpecializingPlan
 
 from netzob.Inference.Grammar.AutomataFactories.ChainedStatesAutomataFactory import ChainedStatesAutomataFactory
 
@@ -121,6 +128,8 @@ def getSuite():
         SearchResult,
         ClusterByApplicativeData,
         ClusterByAlignment,
+        SimilarityMatrixCheckpoint,
+        WrapperArgsFactory,
         ClusterBySize,
         NetzobRegex,
         AbstractType.__module__,
@@ -136,7 +145,12 @@ def getSuite():
         SVAS.__module__,
 
         MessageParser.__module__,
+        ParsingPlan.__module__,
+        SymbolIndex.__module__,
+        ParsingPath.__module__,
+        ParsingStrategy.__module__,
         MessageSpecializer.__module__,
+        SpecializingPlan.__module__,
 
 
         # Modules related to the grammatical inference
@@ -77,3 +77,32 @@ class test_ImportPCAP(NetzobTestCase):
         messages = PCAPImporter.readFile(pcapFile, bpfFilter="tcp src port 6667")
         logging.debug(messages)
         self.assertTrue(len(messages) == 9)
+
+    def test_iterPCAPApplicativeLayer(self):
+        """Test (and illustrates) how to iterate over the messages
+        of a pcap without storing all of them in memory.
+
+        """
+        logging.debug("Test : Iterate over messages from the applicative layer of a PCAP.")
+
+        pcapFile = os.path.join("test", "resources", "pcaps", "botnet_irc_bot.pcap")
+        nbMessages = 0
+        for message in PCAPImporter.iterFile(pcapFile):
+            nbMessages += 1
+        self.assertTrue(nbMessages == 17)
+
+        batches = list(PCAPImporter.iterFile(pcapFile, batchSize=10))
+        self.assertTrue([len(batch) for batch in batches] == [10, 7])
+
+    def test_importPCAPWithMultipleProcesses(self):
+        """Test (and illustrates) how to decode the packets
+        of a pcap with multiple processes.
+
+        """
+        logging.debug("Test : Import messages from a PCAP with multiple processes.")
+
+        pcapFile = os.path.join("test", "resources", "pcaps", "botnet_irc_bot.pcap")
+        messages = [message.data for message in PCAPImporter.iterFile(pcapFile)]
+        parallelMessages = [message.data for message in PCAPImporter.iterFile(pcapFile, nbThread=2)]
+        self.assertTrue(messages == parallelMessages)
+        self.assertTrue(len(PCAPImporter.readFile(pcapFile, nbThread=2)) == 17)